@@ -212,6 +212,155 @@ function M.load()
   return tips
 end
 
+-- Content hashes of data files read this session (path -> {size, sec, nsec, sha256}),
+-- so the generated artifacts checked at startup don't each read all of data/ again
+local file_hashes = {}
+
+---sha256 of a file's content, reused while its size and mtime are unchanged
+---@param path string File path
+---@param stat table Result of vim.loop.fs_stat(path)
+---@return string|nil sha256 Hex digest, or nil if the file can't be read
+local function file_sha256(path, stat)
+  local known = file_hashes[path]
+  if known and known.size == stat.size and known.sec == stat.mtime.sec and known.nsec == stat.mtime.nsec then
+    return known.sha256
+  end
+
+  local fd = io.open(path, "rb")
+  if not fd then
+    return nil
+  end
+  local content = fd:read("*a")
+  fd:close()
+
+  local sha256 = vim.fn.sha256(content)
+  file_hashes[path] = { size = stat.size, sec = stat.mtime.sec, nsec = stat.mtime.nsec, sha256 = sha256 }
+  return sha256
+end
+
+---Check that a builtin directory still matches the data files a generated
+---artifact was built from (name -> {size, sha256}, as recorded by scripts/*.py)
+---Sizes are compared first, so most edits are caught without reading a file;
+---the content hash catches edits that keep the length. Each file is hashed
+---once per session unless its size or mtime changes
+---@param builtin_dir string Path to builtin tips directory
+---@param files table<string, {size: integer, sha256: string}> Recorded file stamps
+---@return boolean matches True if the same files exist with the same contents
+function M.matches_data_files(builtin_dir, files)
+  if type(files) ~= "table" then
+    return false
+  end
+
+  local handle = vim.loop.fs_scandir(builtin_dir)
+  if not handle then
+    return false
+  end
+
+  -- Every data file must be listed with the same size, and no file may be missing
+  local paths = {}
+  while true do
+    local name, kind = vim.loop.fs_scandir_next(handle)
+    if not name then break end
+
+    if kind == "file" and name:match("%.md$") then
+      local path = builtin_dir .. "/" .. name
+      local stat = vim.loop.fs_stat(path)
+      local recorded = files[name]
+      if not stat or type(recorded) ~= "table" or recorded.size ~= stat.size then
+        return false
+      end
+      paths[path] = { stat = stat, sha256 = recorded.sha256 }
+    end
+  end
+
+  if vim.tbl_count(paths) ~= vim.tbl_count(files) then
+    return false
+  end
+
+  for path, expected in pairs(paths) do
+    if file_sha256(path, expected.stat) ~= expected.sha256 then
+      return false
+    end
+  end
+
+  return true
+end
+
+---Load precompiled builtin tips generated by scripts/build_plugin_cache.py
+---Only used when the builtin directory still matches the recorded data files
+---@param builtin_dir string Path to builtin tips directory
+---@param precompiled_file string Path to generated Lua chunk
+---@return Tip[]|nil tips Array of builtin tips, or nil if missing or stale
+function M.load_precompiled(builtin_dir, precompiled_file)
+  if not precompiled_file or vim.fn.filereadable(precompiled_file) == 0 then
+    return nil
+  end
+
+  local ok, chunk = pcall(dofile, precompiled_file)
+  if not ok or type(chunk) ~= "table" or chunk.version ~= 1 then
+    return nil
+  end
+
+  if not M.matches_data_files(builtin_dir, chunk.files) then
+    return nil
+  end
+
+  return chunk.tips
+end
+
+---Load the bundle manifest generated by scripts/build_bundles.py
+---Tips come without a description; it is read from the shard on first use
+---(see M.read_description)
+---@param builtin_dir string Path to builtin tips directory
+---@param bundle_dir string Path to bundle directory
+---@return Tip[]|nil tips Array of builtin tips, or nil if missing or stale
+function M.load_manifest(builtin_dir, bundle_dir)
+  local manifest_path = bundle_dir and bundle_dir .. "/manifest.lua"
+  if not manifest_path or vim.fn.filereadable(manifest_path) == 0 then
+    return nil
+  end
+
+  local ok, manifest = pcall(dofile, manifest_path)
+  if not ok or type(manifest) ~= "table" or manifest.version ~= 1 then
+    return nil
+  end
+
+  if not M.matches_data_files(builtin_dir, manifest.files) then
+    return nil
+  end
+
+  -- Resolve shard indexes to paths once; identical strings are shared
+  local shard_paths = {}
+  for i, name in ipairs(manifest.shards) do
+    shard_paths[i] = bundle_dir .. "/" .. name
+  end
+  for _, tip in ipairs(manifest.tips) do
+    tip.shard = shard_paths[tip.shard]
+  end
+
+  return manifest.tips
+end
+
+---Read a bundled tip's description from its shard
+---@param tip Tip Tip loaded from the bundle manifest
+---@return string|nil description Tip description, or nil if it can't be read
+function M.read_description(tip)
+  if not tip.shard then
+    return nil
+  end
+
+  local fd = io.open(tip.shard, "rb")
+  if not fd then
+    utils.warn("Failed to read tip shard: " .. tip.shard)
+    return nil
+  end
+
+  fd:seek("set", tip.offset)
+  local description = fd:read(tip.length)
+  fd:close()
+  return description or ""
+end
+
 ---Clear cache files
 ---@return nil
 function M.clear()
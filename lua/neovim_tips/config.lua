@@ -14,6 +14,10 @@ local guthub_issues = github_root .. "/issues/new"
 ---@field bookmark_symbol string Symbol to display for bookmarked tips
 ---@field use_cache boolean Enable caching of parsed tips for faster loading
 ---@field builtin_dir string Internal: path to builtin tips data directory
+---@field precompiled_file string Internal: path to precompiled builtin tips (scripts/build_plugin_cache.py)
+---@field search_index_file string Internal: path to prebuilt search index (scripts/build_search_index.py)
+---@field bundle_dir string Internal: path to lazily loaded tip shards (scripts/build_bundles.py)
+---@field related_file string Internal: path to precomputed related tips (scripts/build_related_tips.py)
 ---@field user_tips_tag string Internal: tag for user tips identification
 ---@field github table Internal: various github urls
 ---@field messages table Internal: various messages
@@ -30,6 +34,10 @@ M.options = {
   --             for internal use only             --
   ---------------------------------------------------
   builtin_dir = debug.getinfo(1, "S").source:sub(2):gsub("config.lua", "../../data"),
+  precompiled_file = debug.getinfo(1, "S").source:sub(2):gsub("config.lua", "builtin_tips.lua"),
+  search_index_file = debug.getinfo(1, "S").source:sub(2):gsub("config.lua", "search_index.json"),
+  bundle_dir = debug.getinfo(1, "S").source:sub(2):gsub("config.lua", "bundles"),
+  related_file = debug.getinfo(1, "S").source:sub(2):gsub("config.lua", "related_tips.lua"),
   user_tips_tag = "user",
   github = {
     home = github_root,
@@ -86,17 +86,26 @@ local function read_tips_from_directory(dir_path, is_user_tips)
     return all_tips
   end
 
+  local names = {}
   while true do
     ---@diagnostic disable-next-line: undefined-field
     local name, type = vim.loop.fs_scandir_next(handle)
     if not name then break end
     if type == "file" and name:match("%.md$") then
-      local file_path = dir_path .. "/" .. name
-      local moreTips = read_tip_file(file_path, is_user_tips)
-      vim.list_extend(all_tips, moreTips)
+      table.insert(names, name)
     end
   end
 
+  -- Duplicate titles keep the first tip seen, so read files in a fixed order
+  -- (byte order under LuaJIT, as scripts/tip_corpus.py sorts them) rather than
+  -- whatever order the filesystem lists them in
+  table.sort(names)
+  for _, name in ipairs(names) do
+    local file_path = dir_path .. "/" .. name
+    local moreTips = read_tip_file(file_path, is_user_tips)
+    vim.list_extend(all_tips, moreTips)
+  end
+
   return all_tips
 end
 
@@ -127,8 +136,18 @@ function M.load()
       end
     end
 
-    -- Cache miss, invalid, or disabled - parse markdown files
-    local builtin_tips = read_tips_from_directory(builtin_dir, false)
+    -- Cache miss, invalid, or disabled - use the lazy bundle manifest or the
+    -- precompiled builtin tips if they match the data directory, otherwise
+    -- parse markdown files
+    local builtin_tips = cache.load_manifest(builtin_dir, config.options.bundle_dir)
+      or cache.load_precompiled(builtin_dir, config.options.precompiled_file)
+    if builtin_tips then
+      for _, tip in ipairs(builtin_tips) do
+        titles_seen[tip.title] = true
+      end
+    else
+      builtin_tips = read_tips_from_directory(builtin_dir, false)
+    end
     local user_tips = read_tip_file(user_file, true)
     all_tips = {}
     vim.list_extend(all_tips, builtin_tips)
@@ -156,6 +175,7 @@ end
 function M.reload()
   titles_seen = {}
   cache.clear()
+  require("neovim_tips.tips_picker.search_index").clear()
   return M.load()
 end
 
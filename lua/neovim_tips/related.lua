@@ -0,0 +1,57 @@
+---@class NeovimTipsRelated
+---Precomputed related tips (scripts/build_related_tips.py)
+local M = {}
+
+local config = require("neovim_tips.config")
+local cache = require("neovim_tips.cache")
+
+---@type table|false|nil Loaded chunk, false if unavailable or stale
+local chunk = nil
+---@type table<string, integer> Position of each title in chunk.titles
+local positions = {}
+
+---Load the generated chunk once, validating it against the builtin data directory
+---@return table|nil chunk Related tips chunk, or nil if missing or stale
+local function get_chunk()
+  if chunk == nil then
+    chunk = false
+    local path = config.options.related_file
+    if path and vim.fn.filereadable(path) == 1 then
+      local ok, data = pcall(dofile, path)
+      if ok and type(data) == "table" and data.version == 1 and
+          cache.matches_data_files(config.options.builtin_dir, data.files) then
+        chunk = data
+        for i, title in ipairs(chunk.titles) do
+          positions[title] = i
+        end
+      end
+    end
+  end
+  return chunk or nil
+end
+
+---Titles of the tips most similar to a tip, most similar first
+---@param title string Tip title
+---@return string[]|nil titles Related titles, or nil if the tip has none or no chunk is available
+function M.get(title)
+  local data = get_chunk()
+  local position = data and positions[title]
+  if not position then
+    return nil
+  end
+
+  local titles = {}
+  for _, neighbour in ipairs(data.related[position]) do
+    table.insert(titles, data.titles[neighbour])
+  end
+  return titles
+end
+
+---Forget the loaded chunk (e.g. after regenerating it)
+---@return nil
+function M.reset()
+  chunk = nil
+  positions = {}
+end
+
+return M
@@ -3,12 +3,17 @@
 local M = {}
 
 local md_supported = require("neovim_tips.renderer").renderer_available()
+local cache = require("neovim_tips.cache")
+local related = require("neovim_tips.related")
 
 ---@class Tip
 ---@field title string The tip title
 ---@field category string|nil The tip category
 ---@field tags string[]|nil List of tags for the tip
----@field description string The tip description/content
+---@field description string|nil The tip description/content (nil until read for bundled tips)
+---@field shard string|nil Bundle shard holding the description (bundled tips only)
+---@field offset integer|nil Byte offset of the description in the shard
+---@field length integer|nil Byte length of the description in the shard
 
 local tips = {}
 local titles = {}
@@ -97,6 +102,10 @@ end
 function M.get_description(title)
   if (not descriptions_map[title]) then
     local tip = tips_map[title]
+    -- Bundled tips keep their description in a shard until first preview
+    if tip.description == nil then
+      tip.description = cache.read_description(tip) or ""
+    end
     local description = {}
     table.insert(description, "# " .. tip.title)
     if tip.category and #tip.category > 0 then
@@ -106,6 +115,18 @@ function M.get_description(title)
       table.insert(description, "## Tags: " .. table.concat(tip.tags, ", "))
     end
     table.insert(description, tip.description)
+    local related_titles = related.get(title)
+    if related_titles and #related_titles > 0 then
+      local lines = { "## Related" }
+      for _, related_title in ipairs(related_titles) do
+        if tips_map[related_title] then
+          table.insert(lines, "- " .. related_title)
+        end
+      end
+      if #lines > 1 then
+        table.insert(description, table.concat(lines, "\n"))
+      end
+    end
     if not md_supported then
       table.insert(description, "NOTE: Consider installing render-markdown plugin for proper formatting.")
     end
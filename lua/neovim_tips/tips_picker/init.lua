@@ -4,6 +4,7 @@ local M = {}
 
 -- Import components
 local search_parser = require("neovim_tips.tips_picker.search_parser")
+local search_index = require("neovim_tips.tips_picker.search_index")
 local help_picker = require("neovim_tips.tips_picker.help_picker")
 local layout = require("neovim_tips.tips_picker.tips_picker_layout")
 local events = require("neovim_tips.tips_picker.events")
@@ -80,7 +81,10 @@ function NuiPicker:filter_titles()
     self.filtered_titles = {}
     self.active_query = search_parser.parse_search_query(self.search_text)
 
-    for _, title in ipairs(self.all_titles) do
+    -- Narrow to index candidates when a prebuilt search index is available
+    local titles_to_check = search_index.candidate_titles(self.active_query, self.all_titles) or self.all_titles
+
+    for _, title in ipairs(titles_to_check) do
       local tip = tips.get_tip_by_title(title)
       if not tip then goto continue end
 
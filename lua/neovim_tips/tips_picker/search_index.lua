@@ -0,0 +1,193 @@
+---@class NeovimTipsSearchIndex
+---Prebuilt inverted index (scripts/build_search_index.py) for narrowing picker searches
+local M = {}
+
+local config = require("neovim_tips.config")
+local cache = require("neovim_tips.cache")
+
+---@type table|false|nil Decoded index, false if unavailable or stale
+local index = nil
+---@type table<string, integer[]> Decoded posting lists by "<section>:<key>"
+local postings_cache = {}
+---@type table|nil Titles list the unindexed/known sets were computed for
+local titles_source = nil
+local known_titles = {}
+local unindexed_titles = {}
+
+---Load the index once, validating it against the builtin data directory
+---@return table|nil index Decoded index, or nil if missing or stale
+local function get_index()
+  if index == nil then
+    index = false
+    local path = config.options.search_index_file
+    local fd = path and io.open(path, "r")
+    if fd then
+      local content = fd:read("*a")
+      fd:close()
+      local ok, data = pcall(vim.json.decode, content)
+      if ok and type(data) == "table" and data.version == 1 and
+          cache.matches_data_files(config.options.builtin_dir, data.files) then
+        index = data
+      end
+    end
+  end
+  return index or nil
+end
+
+---Decode a gap-encoded posting list into sorted tip ids (0-based)
+---@param section string Index section (categories, tags, trigrams)
+---@param key string Posting list key
+---@return integer[] ids Sorted tip ids
+local function postings(section, key)
+  local cache_key = section .. ":" .. key
+  local ids = postings_cache[cache_key]
+  if not ids then
+    ids = {}
+    local gaps = index[section][key]
+    if gaps then
+      local total = 0
+      for i, gap in ipairs(gaps) do
+        total = total + gap
+        ids[i] = total
+      end
+    end
+    postings_cache[cache_key] = ids
+  end
+  return ids
+end
+
+---Union of posting lists whose key contains any filter (search_parser semantics)
+---@param section string Index section (categories or tags)
+---@param filters string[] Lowercase filters
+---@return table<integer, boolean> ids Set of matching tip ids
+local function vocabulary_union(section, filters)
+  local ids = {}
+  for key in pairs(index[section]) do
+    for _, filter in ipairs(filters) do
+      if string.find(key, filter, 1, true) then
+        for _, id in ipairs(postings(section, key)) do
+          ids[id] = true
+        end
+        break
+      end
+    end
+  end
+  return ids
+end
+
+---Tip ids containing every ASCII trigram of a title word
+---@param word string Lowercase title word
+---@return table<integer, boolean>|nil ids Set of candidate ids, nil if word has no usable trigrams
+local function trigram_candidates(word)
+  local lists = {}
+  for i = 1, #word - 2 do
+    local gram = word:sub(i, i + 2)
+    if not gram:find("[\128-\255]") then
+      table.insert(lists, postings("trigrams", gram))
+    end
+  end
+  if #lists == 0 then
+    return nil
+  end
+
+  table.sort(lists, function(a, b) return #a < #b end)
+  local ids = {}
+  for _, id in ipairs(lists[1]) do
+    ids[id] = true
+  end
+  for i = 2, #lists do
+    local next_ids = {}
+    for _, id in ipairs(lists[i]) do
+      if ids[id] then
+        next_ids[id] = true
+      end
+    end
+    ids = next_ids
+  end
+  return ids
+end
+
+---Track which picker titles are covered by the index (user tips are not)
+---@param all_titles string[] Titles shown by the picker
+---@return nil
+local function refresh_title_sets(all_titles)
+  if titles_source == all_titles then
+    return
+  end
+  titles_source = all_titles
+  known_titles = {}
+  unindexed_titles = {}
+
+  local indexed = {}
+  for _, title in ipairs(index.titles) do
+    indexed[title] = true
+  end
+  for _, title in ipairs(all_titles) do
+    known_titles[title] = true
+    if not indexed[title] then
+      table.insert(unindexed_titles, title)
+    end
+  end
+end
+
+---Narrow the titles a query has to be checked against using the index
+---Returned titles are a superset of the matches; the picker still applies the
+---search_parser checks to them. Titles not in the index are always included.
+---@param query SearchQuery Parsed search query
+---@param all_titles string[] Titles shown by the picker
+---@return string[]|nil titles Candidate titles in picker order, or nil to scan everything
+function M.candidate_titles(query, all_titles)
+  if not get_index() then
+    return nil
+  end
+
+  local constraints = {}
+  if #query.categories > 0 then
+    table.insert(constraints, vocabulary_union("categories", query.categories))
+  end
+  if #query.tags > 0 then
+    table.insert(constraints, vocabulary_union("tags", query.tags))
+  end
+  for _, word in ipairs(query.title_words) do
+    local ids = trigram_candidates(word)
+    if ids then
+      table.insert(constraints, ids)
+    end
+  end
+  if #constraints == 0 then
+    return nil
+  end
+
+  refresh_title_sets(all_titles)
+
+  local candidates = {}
+  for id in pairs(constraints[1]) do
+    local keep = true
+    for i = 2, #constraints do
+      if not constraints[i][id] then
+        keep = false
+        break
+      end
+    end
+    local title = keep and index.titles[id + 1]
+    if title and known_titles[title] then
+      table.insert(candidates, title)
+    end
+  end
+  vim.list_extend(candidates, unindexed_titles)
+
+  table.sort(candidates, function(t1, t2) return t1:lower() < t2:lower() end)
+  return candidates
+end
+
+---Drop the loaded index (e.g. after tips are reloaded)
+---@return nil
+function M.clear()
+  index = nil
+  postings_cache = {}
+  titles_source = nil
+  known_titles = {}
+  unindexed_titles = {}
+end
+
+return M
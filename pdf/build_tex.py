@@ -1,55 +1,51 @@
 #!python3
 
 import os
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from typing import List
 
 
-class LatexUtil:
-  @staticmethod
-  def escape_special_chars(text: str) -> str:
-    """Escapes LaTeX special characters in a string."""
-    latex_special_chars = {
-      '\\': r'\textbackslash{}',
-      '{': r'\{',
-      '}': r'\}',
-      '$': r'\$',
-      '&': r'\&',
-      '%': r'\%',
-      '#': r'\#',
-      '_': r'\_',
-      '~': r'\textasciitilde{}',
-      '^': r'\textasciicircum{}'
-    }
+LATEX_SPECIAL_CHARS = {
+  '\\': r'\textbackslash{}',
+  '{': r'\{',
+  '}': r'\}',
+  '$': r'\$',
+  '&': r'\&',
+  '%': r'\%',
+  '#': r'\#',
+  '_': r'\_',
+  '~': r'\textasciitilde{}',
+  '^': r'\textasciicircum{}'
+}
 
-    result = []
-    for char in text:
-      if char in latex_special_chars:
-        result.append(latex_special_chars[char])
-      else:
-        result.append(char)
-    return ''.join(result)
 
-  @staticmethod
-  def getLatex(text: str) -> str:
-    """Escapes LaTeX special characters outside of code blocks and processes markdown formatting."""
-    latex_special_chars = {
-      '\\': r'\textbackslash{}',
-      '{': r'\{',
-      '}': r'\}',
-      '$': r'\$',
-      '&': r'\&',
-      '%': r'\%',
-      '#': r'\#',
-      '_': r'\_',
-      '~': r'\textasciitilde{}',
-      '^': r'\textasciicircum{}'
-    }
+def code_label(language: str) -> str:
+  """Example label for a code block's language ('' when unlabeled)."""
+  if language in ['vim', 'viml', 'vimscript']:
+    return 'Vim'
+  if language in ['lua', 'neovim']:
+    return 'Neovim'
+  return ''
+
+
+class MarkdownFormat(ABC):
+  """Walks tip markdown and emits each construct through abstract methods.
+
+  The LaTeX book (LatexFormat) and the HTML site (scripts/build_site.py) share
+  this walk, so both recognize exactly the same code blocks, inline code,
+  emphasis and links.
+  """
 
+  # Titles have no code blocks, only inline markup
+  code_blocks = True
+
+  def convert(self, text: str) -> str:
     result = []
     i = 0
     while i < len(text):
       # Check for multi-line code block
-      if text[i:i+3] == '```':
+      if self.code_blocks and text[i:i+3] == '```':
         # Find the end of the first line (after ```)
         first_line_end = text.find('\n', i)
         if first_line_end == -1:
@@ -58,28 +54,12 @@ class LatexUtil:
         # Extract language identifier
         language = text[i+3:first_line_end].strip().lower()
 
-        # Determine label based on language
-        if language in ['vim', 'viml', 'vimscript']:
-          label = 'Vim'
-        elif language in ['lua', 'neovim']:
-          label = 'Neovim'
-        else:
-          label = ''
-
         # Find the closing ```
         end = text.find('```', i + 3)
         if end != -1:
           # Extract the code content (between first newline and closing ```)
           code_start = first_line_end + 1 if first_line_end > i + 3 else i + 3
-          code_content = text[code_start:end].rstrip('\n')
-
-          # Replace with LaTeX verbatim environment (using Verbatim from fvextra)
-          result.append(r'\begin{Exa*}{' + label + '}' + '\n')
-          result.append(r'\begin{Verbatim}[fontsize=\footnotesize, breaklines, breakanywhere]' + '\n')
-          result.append(code_content + '\n')
-          result.append(r'\end{Verbatim}' + '\n')
-          result.append(r'\end{Exa*}')
-
+          result.append(self.code_block(language, text[code_start:end].rstrip('\n')))
           i = end + 3
           continue
 
@@ -88,8 +68,7 @@ class LatexUtil:
         # Look for closing double backticks
         end = text.find('``', i + 2)
         if end != -1:
-          code_content = text[i+2:end].strip()  # Strip spaces for double backticks
-          result.append(r'{\footnotesize \Verb§' + code_content + '§}')
+          result.append(self.inline_code(text[i+2:end].strip()))  # Strip spaces for double backticks
           i = end + 2
           continue
 
@@ -97,28 +76,15 @@ class LatexUtil:
       if text[i] == '`':
         end = text.find('`', i + 1)
         if end != -1:
-          code_content = text[i+1:end]
-          result.append(r'{\footnotesize \Verb§' + code_content + '§}')
+          result.append(self.inline_code(text[i+1:end]))
           i = end + 1
           continue
 
-      # Check for bold **text**
-      if text[i:i+2] == '**':
-        end = text.find('**', i + 2)
-        if end != -1:
-          content = text[i+2:end]
-          escaped = LatexUtil.escape_special_chars(content)
-          result.append(r'\textbf{' + escaped + '}')
-          i = end + 2
-          continue
-
-      # Check for bold __text__
-      if text[i:i+2] == '__':
-        end = text.find('__', i + 2)
+      # Check for bold **text** or __text__
+      if text[i:i+2] in ('**', '__'):
+        end = text.find(text[i:i+2], i + 2)
         if end != -1:
-          content = text[i+2:end]
-          escaped = LatexUtil.escape_special_chars(content)
-          result.append(r'\textbf{' + escaped + '}')
+          result.append(self.bold(text[i+2:end]))
           i = end + 2
           continue
 
@@ -128,13 +94,7 @@ class LatexUtil:
         if bracket_end != -1 and bracket_end + 1 < len(text) and text[bracket_end + 1] == '(':
           paren_end = text.find(')', bracket_end + 2)
           if paren_end != -1:
-            link_text = text[i+1:bracket_end]
-            link_url = text[bracket_end+2:paren_end]
-            escaped_text = LatexUtil.escape_special_chars(link_text)
-            # URLs should not have special chars escaped (except those that break LaTeX)
-            # For simplicity, we'll escape % and # which can break URLs in LaTeX
-            escaped_url = link_url.replace('%', r'\%').replace('#', r'\#')
-            result.append(r'\href{' + escaped_url + '}{' + escaped_text + '}')
+            result.append(self.link(text[i+1:bracket_end], text[bracket_end+2:paren_end]))
             i = paren_end + 1
             continue
 
@@ -155,8 +115,7 @@ class LatexUtil:
             is_reasonable_length = len(content) > 0 and len(content) < 100
 
             if is_valid_close and has_no_internal_asterisks and is_reasonable_length:
-              escaped = LatexUtil.escape_special_chars(content)
-              result.append(r'\textit{' + escaped + '}')
+              result.append(self.italic(content))
               i = end + 1
               continue
 
@@ -176,152 +135,110 @@ class LatexUtil:
             has_no_internal_underscores = '_' not in content
 
             if is_valid_close and has_no_internal_underscores:
-              escaped = LatexUtil.escape_special_chars(content)
-              result.append(r'\textit{' + escaped + '}')
+              result.append(self.italic(content))
               i = end + 1
               continue
 
-      # Escape special LaTeX characters
-      if text[i] in latex_special_chars:
-        result.append(latex_special_chars[text[i]])
-      else:
-        result.append(text[i])
-
+      result.append(self.char(text[i]))
       i += 1
 
     return ''.join(result)
 
-  @staticmethod
-  def getLatexForTitle(text: str) -> str:
-    """Escapes LaTeX for use in section/chapter titles (cannot use \\verb)."""
-    latex_special_chars = {
-      '\\': r'\textbackslash{}',
-      '{': r'\{',
-      '}': r'\}',
-      '$': r'\$',
-      '&': r'\&',
-      '%': r'\%',
-      '#': r'\#',
-      '_': r'\_',
-      '~': r'\textasciitilde{}',
-      '^': r'\textasciicircum{}'
-    }
+  @abstractmethod
+  def code_block(self, language: str, code: str) -> str:
+    """A fenced code block; language is lowercased and may be empty."""
 
-    result = []
-    i = 0
-    while i < len(text):
-      # Check for inline code block - handle double backticks first
-      if text[i:i+2] == '``':
-        end = text.find('``', i + 2)
-        if end != -1:
-          code_content = text[i+2:end].strip()
-          # Escape special chars in code content
-          escaped_code = code_content
-          for char, replacement in latex_special_chars.items():
-            escaped_code = escaped_code.replace(char, replacement)
-          result.append(r'\texttt{' + escaped_code + '}')
-          i = end + 2
-          continue
+  @abstractmethod
+  def inline_code(self, code: str) -> str:
+    """Text between single or double backticks."""
 
-      # Check for single backtick inline code
-      if text[i] == '`':
-        end = text.find('`', i + 1)
-        if end != -1:
-          code_content = text[i+1:end]
-          # Escape special chars in code content
-          escaped_code = code_content
-          for char, replacement in latex_special_chars.items():
-            escaped_code = escaped_code.replace(char, replacement)
-          result.append(r'\texttt{' + escaped_code + '}')
-          i = end + 1
-          continue
+  @abstractmethod
+  def bold(self, text: str) -> str:
+    """Text between ** or __."""
 
-      # Check for bold **text**
-      if text[i:i+2] == '**':
-        end = text.find('**', i + 2)
-        if end != -1:
-          content = text[i+2:end]
-          escaped = LatexUtil.escape_special_chars(content)
-          result.append(r'\textbf{' + escaped + '}')
-          i = end + 2
-          continue
+  @abstractmethod
+  def italic(self, text: str) -> str:
+    """Text between single * or _ at word boundaries."""
 
-      # Check for bold __text__
-      if text[i:i+2] == '__':
-        end = text.find('__', i + 2)
-        if end != -1:
-          content = text[i+2:end]
-          escaped = LatexUtil.escape_special_chars(content)
-          result.append(r'\textbf{' + escaped + '}')
-          i = end + 2
-          continue
+  @abstractmethod
+  def link(self, text: str, url: str) -> str:
+    """A [text](url) link."""
 
-      # Check for links [text](url) - in titles, we just show the text
-      if text[i] == '[':
-        bracket_end = text.find(']', i + 1)
-        if bracket_end != -1 and bracket_end + 1 < len(text) and text[bracket_end + 1] == '(':
-          paren_end = text.find(')', bracket_end + 2)
-          if paren_end != -1:
-            link_text = text[i+1:bracket_end]
-            # For titles, just use the link text (no hyperlink)
-            escaped_text = LatexUtil.escape_special_chars(link_text)
-            result.append(escaped_text)
-            i = paren_end + 1
-            continue
+  @abstractmethod
+  def char(self, char: str) -> str:
+    """Any other character, one at a time."""
 
-      # Check for italic *text* (single asterisk)
-      # Only treat as italic if preceded by space/start and followed by space/punctuation
-      if text[i] == '*':
-        # Check if this looks like markdown italic (word boundary before)
-        is_markdown_italic = (i == 0 or text[i-1] in ' \t\n.,;:!?-')
 
-        if is_markdown_italic:
-          end = text.find('*', i + 1)
-          if end != -1:
-            # Check if closing asterisk is followed by word boundary
-            is_valid_close = (end + 1 >= len(text) or text[end + 1] in ' \t\n.,;:!?-')
-            content = text[i+1:end]
-            # Check that content doesn't have nested asterisks and is reasonable length
-            has_no_internal_asterisks = '*' not in content
-            is_reasonable_length = len(content) > 0 and len(content) < 100
+class LatexFormat(MarkdownFormat):
+  """Tip markdown as LaTeX for the book body."""
 
-            if is_valid_close and has_no_internal_asterisks and is_reasonable_length:
-              escaped = LatexUtil.escape_special_chars(content)
-              result.append(r'\textit{' + escaped + '}')
-              i = end + 1
-              continue
+  def code_block(self, language: str, code: str) -> str:
+    # Replace with LaTeX verbatim environment (using Verbatim from fvextra)
+    return (r'\begin{Exa*}{' + code_label(language) + '}' + '\n'
+            + r'\begin{Verbatim}[fontsize=\footnotesize, breaklines, breakanywhere]' + '\n'
+            + code + '\n'
+            + r'\end{Verbatim}' + '\n'
+            + r'\end{Exa*}')
 
-      # Check for italic _text_ (single underscore)
-      # Only treat as italic if preceded by space/start and followed by space/punctuation
-      if text[i] == '_':
-        # Check if this looks like markdown italic (word boundary before)
-        is_markdown_italic = (i == 0 or text[i-1] in ' \t\n.,;:!?-')
+  def inline_code(self, code: str) -> str:
+    return r'{\footnotesize \Verb§' + code + '§}'
 
-        if is_markdown_italic:
-          end = text.find('_', i + 1)
-          if end != -1:
-            # Check if closing underscore is followed by word boundary
-            is_valid_close = (end + 1 >= len(text) or text[end + 1] in ' \t\n.,;:!?-')
-            # Also check that content doesn't contain spaces (markdown italic is usually one word)
-            content = text[i+1:end]
-            has_no_internal_underscores = '_' not in content
+  def bold(self, text: str) -> str:
+    return r'\textbf{' + LatexUtil.escape_special_chars(text) + '}'
 
-            if is_valid_close and has_no_internal_underscores:
-              escaped = LatexUtil.escape_special_chars(content)
-              result.append(r'\textit{' + escaped + '}')
-              i = end + 1
-              continue
+  def italic(self, text: str) -> str:
+    return r'\textit{' + LatexUtil.escape_special_chars(text) + '}'
 
-      # Escape special LaTeX characters
-      if text[i] in latex_special_chars:
-        result.append(latex_special_chars[text[i]])
-      else:
-        result.append(text[i])
+  def link(self, text: str, url: str) -> str:
+    # URLs should not have special chars escaped (except those that break LaTeX)
+    # For simplicity, we'll escape % and # which can break URLs in LaTeX
+    escaped_url = url.replace('%', r'\%').replace('#', r'\#')
+    return r'\href{' + escaped_url + '}{' + LatexUtil.escape_special_chars(text) + '}'
 
-      i += 1
+  def char(self, char: str) -> str:
+    # Escape special LaTeX characters
+    return LATEX_SPECIAL_CHARS.get(char, char)
+
+
+class LatexTitleFormat(LatexFormat):
+  """Tip markdown as LaTeX for section/chapter titles (cannot use \\verb)."""
+
+  code_blocks = False
+
+  def inline_code(self, code: str) -> str:
+    # Escape special chars in code content
+    escaped_code = code
+    for char, replacement in LATEX_SPECIAL_CHARS.items():
+      escaped_code = escaped_code.replace(char, replacement)
+    return r'\texttt{' + escaped_code + '}'
+
+  def link(self, text: str, url: str) -> str:
+    # For titles, just use the link text (no hyperlink)
+    return LatexUtil.escape_special_chars(text)
 
+
+class LatexUtil:
+  @staticmethod
+  def escape_special_chars(text: str) -> str:
+    """Escapes LaTeX special characters in a string."""
+    result = []
+    for char in text:
+      if char in LATEX_SPECIAL_CHARS:
+        result.append(LATEX_SPECIAL_CHARS[char])
+      else:
+        result.append(char)
     return ''.join(result)
 
+  @staticmethod
+  def getLatex(text: str) -> str:
+    """Escapes LaTeX special characters outside of code blocks and processes markdown formatting."""
+    return LatexFormat().convert(text)
+
+  @staticmethod
+  def getLatexForTitle(text: str) -> str:
+    """Escapes LaTeX for use in section/chapter titles (cannot use \\verb)."""
+    return LatexTitleFormat().convert(text)
+
 
 class Tip:
   def __init__(self, content: str) -> None:
@@ -446,10 +363,16 @@ class TipsParser:
 
 
 class BookWriter:
-  def __init__(self, source_directory: str, source_extension: str, output_tex_file: str) -> None:
+  def __init__(self, source_directory: str, source_extension: str, output_tex_file: str, metrics=None) -> None:
     self.source_directory = source_directory
     self.source_extension = source_extension
     self.output_tex_file = output_tex_file
+    # Optional collector from scripts/metrics.py (anything with stage() and count())
+    self.metrics = metrics
+
+  def _stage(self, name: str):
+    """Times a named stage when a metrics collector is attached."""
+    return self.metrics.stage(name) if self.metrics is not None else nullcontext()
 
   def write(self) -> None:
     """Writes LaTeX output from all source files to the output file."""
@@ -466,8 +389,9 @@ class BookWriter:
       raise ValueError(f"Output directory does not exist: {output_dir}")
 
     # Get list of source files
-    file_lister = FileList(self.source_directory)
-    source_files = file_lister.get_files_by_extension(self.source_extension)
+    with self._stage('list'):
+      file_lister = FileList(self.source_directory)
+      source_files = file_lister.get_files_by_extension(self.source_extension)
 
     if not source_files:
       raise ValueError(f"No files found with extension '{self.source_extension}' in {self.source_directory}")
@@ -477,15 +401,34 @@ class BookWriter:
       with open(self.output_tex_file, 'w') as output:
         # Process each source file
         for source_file in source_files:
-          parser = TipsParser(source_file)
-          latex_content = parser.toLatex()
-          output.write(latex_content)
+          with self._stage('latex'):
+            parser = TipsParser(source_file)
+            latex_content = parser.toLatex()
+          with self._stage('write'):
+            output.write(latex_content)
+          if self.metrics is not None:
+            self.metrics.count('files')
+            self.metrics.count('latex_bytes', len(latex_content))
     except IOError as e:
       raise IOError(f"Failed to write to output file {self.output_tex_file}: {e}")
 
 
 if __name__ == "__main__":
+  import argparse
+  import sys
+
+  # Shared instrumentation lives with the other scripts
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+  from metrics import Metrics, add_arguments
+
+  parser = argparse.ArgumentParser(description='Convert markdown tips to the LaTeX book content')
+  add_arguments(parser)
+  args = parser.parse_args()
+  metrics = Metrics.from_args('build_tex', args)
+
   # Example usage: Convert markdown tips to LaTeX book
-  writer = BookWriter("../data", ".md", "Tmp/Content.tex")
-  writer.write()
+  writer = BookWriter("../data", ".md", "Tmp/Content.tex", metrics)
+  with metrics.stage('write_book'):
+    writer.write()
+  metrics.write()
   print("Book created")
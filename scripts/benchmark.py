@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the hot paths of the tip tooling.
+
+Runs each benchmark on a copy of data/ (or a synthetic 10x/100x corpus from
+synthetic_corpus.py) and reports the best and median time over several
+rounds. --save writes the results as a baseline; --baseline compares a run
+against one and exits non-zero if any benchmark got slower than the
+threshold allows.
+
+    python scripts/benchmark.py --scale 10 --save scripts/bench_baseline.json
+    python scripts/benchmark.py --scale 10 --baseline scripts/bench_baseline.json --threshold 0.15
+
+Similarity uses a deterministic bag-of-words fake embedder, so pair
+finding is measured without loading a model. Benchmarks that rewrite files
+(remove_duplicates and the fixers) get a fresh copy of the corpus each round,
+made outside the timed section.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'pdf'))
+
+from build_tex import LatexUtil, Tip as BookTip, TipsParser  # noqa: E402
+from code_fingerprints import FingerprintIndex  # noqa: E402
+from dedup_across_files import parse_tips_from_file, remove_duplicates  # noqa: E402
+from dedup_hybrid import HybridDeduplicator, TipParser  # noqa: E402
+from fix_community_sources import fix_community_sources  # noqa: E402
+from fix_source_links import fix_source_links  # noqa: E402
+from synthetic_corpus import LAYOUTS, generate_corpus  # noqa: E402
+from tip_corpus import load_corpus, tip_files  # noqa: E402
+
+
+class FakeEmbedder:
+    """Deterministic hashed bag-of-words vectors, standing in for the model"""
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, word: str) -> int:
+        bucket = self._buckets.get(word)
+        if bucket is None:
+            digest = hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest()
+            bucket = self._buckets[word] = int.from_bytes(digest, 'little') % self.dimensions
+        return bucket
+
+    def generate_embeddings(self, tips):
+        import numpy as np
+        matrix = np.zeros((len(tips), self.dimensions), dtype=np.float32)
+        for row, tip in enumerate(tips):
+            for word in tip.get_text_for_embedding().lower().split():
+                matrix[row, self._bucket(word)] += 1.0
+        return matrix
+
+    def close(self):
+        pass
+
+
+class Corpus:
+    """A benchmark corpus on disk plus the parsed inputs benchmarks share"""
+
+    def __init__(self, directory: Path, stats: Dict[str, int]):
+        self.directory = directory
+        self.stats = stats
+        self.paths = tip_files(directory)
+        self.contents = [p.read_text(encoding='utf-8') for p in self.paths]
+        self.sections = [BookTip(s.strip()) for c in self.contents for s in c.split('***') if s.strip()]
+        self.scored_tips = [t for p in self.paths for t in parse_tips_from_file(p)]
+        self.file_tips = [TipParser.parse_content(c) for c in self.contents]
+
+    def fresh_copy(self, scratch: Path) -> Path:
+        """A writable copy of the corpus for benchmarks that rewrite files"""
+        target = scratch / 'round'
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(self.directory, target)
+        return target
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[Corpus, Any], Any]
+    # Untimed per-round setup; its result is passed to run()
+    prepare: Optional[Callable[[Corpus, Path], Any]] = None
+    requires: Optional[str] = None
+
+
+def _find_pairs(corpus: Corpus, _):
+    deduplicator = HybridDeduplicator(similarity_threshold=0.7)
+    deduplicator._embedding_gen = FakeEmbedder()
+    for tips in corpus.file_tips:
+        if len(tips) >= 2:
+            deduplicator.find_similar_pairs(tips)
+
+
+def _shared_code(corpus: Corpus, _):
+    blocks = ((i, [('vim', tip.vimscript), ('lua', tip.lua)])
+              for i, tip in enumerate(tip for tips in corpus.file_tips for tip in tips))
+    FingerprintIndex.build(blocks).shared_code()
+
+
+def _copy(corpus: Corpus, scratch: Path) -> Path:
+    return corpus.fresh_copy(scratch)
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark('parse.tip_corpus', lambda c, _: load_corpus(c.directory)),
+    Benchmark('parse.dedup_hybrid', lambda c, _: [TipParser.parse_content(text) for text in c.contents]),
+    Benchmark('parse.dedup_across_files', lambda c, _: [parse_tips_from_file(p) for p in c.paths]),
+    Benchmark('parse.build_tex', lambda c, _: [TipsParser(str(p)).get_tips() for p in c.paths]),
+    Benchmark('latex.getLatex', lambda c, _: [LatexUtil.getLatex(t.get_body()) for t in c.sections]),
+    Benchmark('latex.getLatexForTitle', lambda c, _: [LatexUtil.getLatexForTitle(t.get_title()) for t in c.sections]),
+    Benchmark('score.get_score', lambda c, _: [t.get_score() for t in c.scored_tips]),
+    Benchmark('pairs.find_similar_pairs', _find_pairs, requires='numpy'),
+    Benchmark('pairs.shared_code', _shared_code),
+    Benchmark('rewrite.remove_duplicates', lambda c, d: remove_duplicates(d), prepare=_copy),
+    Benchmark('fix.source_links', lambda c, d: fix_source_links(d), prepare=_copy),
+    Benchmark('fix.community_sources', lambda c, d: fix_community_sources(d), prepare=_copy),
+]
+
+
+def run_benchmark(benchmark: Benchmark, corpus: Corpus, scratch: Path, rounds: int) -> Dict[str, float]:
+    """Best, median and mean seconds over `rounds` timed runs (after one warm-up)"""
+    times = []
+    for round_index in range(rounds + 1):
+        state = benchmark.prepare(corpus, scratch) if benchmark.prepare else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            benchmark.run(corpus, state)
+            elapsed = time.perf_counter() - start
+        if round_index > 0:
+            times.append(elapsed)
+    return {
+        'min': round(min(times), 6),
+        'median': round(statistics.median(times), 6),
+        'mean': round(statistics.fmean(times), 6),
+        'rounds': rounds,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print a comparison against a baseline and return the regressed benchmark names"""
+    regressions = []
+    if (baseline.get('scale'), baseline.get('layout')) != (results['scale'], results['layout']):
+        print(f"⚠️  Baseline corpus (scale {baseline.get('scale')}, {baseline.get('layout')}) differs "
+              f"from this run (scale {results['scale']}, {results['layout']})")
+
+    print(f"\n{'Benchmark':<28} {'Baseline':>10} {'Current':>10} {'Change':>8}")
+    for name, current in results['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if before is None:
+            print(f"{name:<28} {'-':>10} {current['min']:>9.4f}s {'new':>8}")
+            continue
+        change = current['min'] / before['min'] - 1 if before['min'] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  ✗ REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  ✓ faster'
+        print(f"{name:<28} {before['min']:>9.4f}s {current['min']:>9.4f}s {change:>+7.1%}{flag}")
+    return regressions
+
+
+def _available(module: str) -> bool:
+    import importlib.util
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark parsers, LaTeX conversion, scoring, pair finding and fixers')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Synthetic corpus size as a multiple of data/ (1 = data/ as is)')
+    parser.add_argument('--layout', choices=LAYOUTS, default='files',
+                        help='How the synthetic corpus grows: more files, or more tips per file')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='Timed rounds per benchmark')
+    parser.add_argument('--only', action='append', default=None, metavar='PATTERN',
+                        help='Run benchmarks whose name contains PATTERN (repeatable)')
+    parser.add_argument('--save', type=Path, default=None,
+                        help='Write results to this JSON file (e.g. as a new baseline)')
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help='Compare against a saved baseline and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown of the best time before a benchmark counts as regressed')
+
+    args = parser.parse_args()
+
+    selected = [b for b in BENCHMARKS if not args.only or any(p in b.name for p in args.only)]
+
+    with tempfile.TemporaryDirectory(prefix='tips-bench-') as tmp:
+        scratch = Path(tmp)
+        stats = generate_corpus(args.data_dir, scratch / 'corpus', max(1, args.scale), args.layout)
+        corpus = Corpus(scratch / 'corpus', stats)
+        print(f"Corpus: {stats['files']} files, {stats['tips']:,} tips, {stats['bytes']:,} bytes "
+              f"(scale {args.scale}, {args.layout})\n")
+
+        results = {
+            'scale': args.scale,
+            'layout': args.layout,
+            'corpus': stats,
+            'python': platform.python_version(),
+            'benchmarks': {},
+        }
+        print(f"{'Benchmark':<28} {'Best':>10} {'Median':>10}")
+        for benchmark in selected:
+            if benchmark.requires and not _available(benchmark.requires):
+                print(f"{benchmark.name:<28} skipped ({benchmark.requires} not installed)")
+                continue
+            timing = run_benchmark(benchmark, corpus, scratch, max(1, args.rounds))
+            results['benchmarks'][benchmark.name] = timing
+            print(f"{benchmark.name:<28} {timing['min']:>9.4f}s {timing['median']:>9.4f}s")
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+        print(f"\n✓ Results saved to {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: "
+                  f"{', '.join(regressions)}")
+            return 1
+        print(f"\n✓ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
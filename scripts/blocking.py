@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Blocking keys: compare only tips that could plausibly be duplicates.
+
+Each tip gets a set of keys:
+- tag:<tag>: tags lowercased, with separators and plural -s normalized
+- category:<category>
+- ex:<command>: ex commands (:g, :%s, :normal), with the common
+  abbreviations expanded, so :g and :global share a block
+- api:<name>: Neovim API functions, as nvim_buf_set_lines from
+  vim.api.nvim_buf_set_lines or a bare nvim_* call, and other vim.* Lua
+  modules such as vim.lsp.buf.format
+- opt:<option>: options set with :set or vim.opt/vim.o/vim.wo/vim.bo
+- key:<notation>: key notation, lowercased (<C-r> and <c-R> match)
+
+Tips sharing at least one key form a candidate pair (standard blocking from
+entity resolution). Keys shared by a large share of the tips, such as a
+file-wide category or `ex:set`, carry no signal and are purged. Tips left
+without any key are compared with every tip, so they are never silently lost.
+"""
+
+import re
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Abbreviations of frequent ex commands; anything else is keyed as written
+EX_ABBREVIATIONS = {
+    'g': 'global', 'gl': 'global', 'glo': 'global', 'v': 'vglobal', 'vg': 'vglobal',
+    's': 'substitute', 'su': 'substitute', 'norm': 'normal', 'e': 'edit', 'w': 'write',
+    'sp': 'split', 'vs': 'vsplit', 'vsp': 'vsplit', 'bd': 'bdelete', 'b': 'buffer',
+    'r': 'read', 'm': 'move', 't': 'copy', 'co': 'copy', 'd': 'delete', 'y': 'yank',
+    'se': 'set', 'au': 'autocmd', 'com': 'command', 'exe': 'execute', 'reg': 'registers',
+    'nn': 'nnoremap', 'nno': 'nnoremap', 'ino': 'inoremap', 'vn': 'vnoremap', 'tabe': 'tabedit',
+    'cw': 'cwindow', 'lw': 'lwindow', 'cn': 'cnext', 'cp': 'cprevious', 'vert': 'vertical',
+}
+
+_EX_RE = re.compile(r"(?<![\w:/.]):(?:[%.$\d,]|'[a-z<>])*([a-zA-Z]+)")
+_SET_RE = re.compile(r'(?<![\w:]):?set(?:local)?\s+(?:no|inv)?([a-z]+)')
+_LUA_OPTION_RE = re.compile(r'\bvim\.(?:opt|opt_local|o|wo|bo|go)\.([a-z]+)')
+_API_RE = re.compile(r'\b(?:vim\.api\.)?(nvim_\w+)|\bvim\.((?:lsp|treesitter|diagnostic|fs|ui|keymap|highlight)'
+                     r'(?:\.\w+)+)')
+_KEY_RE = re.compile(r'<(?:[CMASDcmasd]-[^\s>]+|[A-Za-z][\w-]+)>')
+_TAG_SEPARATOR_RE = re.compile(r'[\s_]+')
+
+
+def normalize_tag(tag: str) -> str:
+    tag = _TAG_SEPARATOR_RE.sub('-', tag.strip().lower())
+    if len(tag) > 4 and tag.endswith('ies'):
+        tag = tag[:-3] + 'y'
+    elif len(tag) > 4 and tag.endswith('s') and not tag.endswith(('ss', 'us', 'is')):
+        tag = tag[:-1]
+    return tag
+
+
+def blocking_keys(category: str, tags: Iterable[str], text: str) -> Set[str]:
+    """Keys of a tip from its category, tags and text (prose and code)"""
+    keys = {'tag:' + normalize_tag(tag) for tag in tags if tag.strip()}
+    if category.strip():
+        keys.add('category:' + category.strip().lower())
+    for match in _EX_RE.finditer(text):
+        command = match.group(1).lower()
+        keys.add('ex:' + EX_ABBREVIATIONS.get(command, command))
+    keys.update('opt:' + option for option in _SET_RE.findall(text))
+    keys.update('opt:' + option for option in _LUA_OPTION_RE.findall(text))
+    for api, module in _API_RE.findall(text):
+        keys.add('api:' + (api or 'vim.' + module))
+    keys.update('key:' + key.lower() for key in _KEY_RE.findall(text))
+    return keys
+
+
+class BlockIndex:
+    """Blocking key -> tip indexes, with oversized blocks purged"""
+
+    def __init__(self, keys: List[Set[str]], max_share: float = 0.1, min_block: int = 20):
+        """
+        Blocks with more than max(min_block, max_share * tips) tips are purged,
+        so small files are compared in full.
+        """
+        self.size = len(keys)
+        limit = max(min_block, max_share * self.size)
+        blocks: Dict[str, List[int]] = defaultdict(list)
+        for i, tip_keys in enumerate(keys):
+            for key in tip_keys:
+                blocks[key].append(i)
+        self.blocks = {key: tips for key, tips in blocks.items() if 1 < len(tips) <= limit}
+        self.purged = sorted(key for key, tips in blocks.items() if len(tips) > limit)
+        # Tips in no block whose keys were too common (or missing) to tell anything
+        kept = {i for tips in self.blocks.values() for i in tips}
+        purged = set(self.purged)
+        self.unblocked = [i for i, tip_keys in enumerate(keys)
+                          if i not in kept and (not tip_keys or tip_keys & purged)]
+
+    def candidate_pairs(self, rows: Optional[Iterable[int]] = None) -> Set[Tuple[int, int]]:
+        """Index pairs (i < j) sharing a block; with `rows`, only pairs involving one of them"""
+        row_set = None if rows is None else set(rows)
+        pairs: Set[Tuple[int, int]] = set()
+        for tips in self.blocks.values():
+            for i, j in combinations(tips, 2):
+                if row_set is None or i in row_set or j in row_set:
+                    pairs.add((i, j))
+        for i in self.unblocked:
+            for j in range(self.size):
+                if j != i and (row_set is None or i in row_set or j in row_set):
+                    pairs.add((min(i, j), max(i, j)))
+        return pairs
+
+    def all_pairs(self, rows: Optional[Iterable[int]] = None) -> int:
+        """Number of pairs an unblocked comparison of `rows` would compute"""
+        n = self.size
+        if rows is None:
+            return n * (n - 1) // 2
+        changed = len(set(rows))
+        return changed * (n - changed) + changed * (changed - 1) // 2
+
+
+if __name__ == '__main__':
+    import argparse
+    from collections import Counter
+    from pathlib import Path
+
+    from tip_corpus import load_corpus
+
+    parser = argparse.ArgumentParser(description='Show blocking keys and block sizes per file')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--max-share', type=float, default=0.1,
+                        help='Purge blocks holding more than this share of a file\'s tips')
+
+    args = parser.parse_args()
+
+    by_file: Dict[str, List] = defaultdict(list)
+    for tip in load_corpus(args.data_dir):
+        by_file[tip.file].append(tip)
+
+    total = candidates = 0
+    key_counts: Counter = Counter()
+    for name, tips in sorted(by_file.items()):
+        keys = [blocking_keys(tip.category, tip.tags, tip.title + '\n' + tip.description) for tip in tips]
+        for tip_keys in keys:
+            key_counts.update(key.split(':', 1)[0] for key in tip_keys)
+        index = BlockIndex(keys, args.max_share)
+        total += index.all_pairs()
+        candidates += len(index.candidate_pairs())
+
+    print(f"✓ {candidates:,} of {total:,} within-file pairs share a block "
+          f"(reduction {1 - candidates / total if total else 0:.1%})")
+    print("  Keys per kind: " + ', '.join(f'{kind} {count:,}' for kind, count in key_counts.most_common()))
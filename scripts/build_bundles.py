@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Bundle the tip corpus into per-file shards for lazy loading.
+
+Writes, into the bundle directory:
+- one shard per data file, holding the pre-parsed tip descriptions back to
+  back as UTF-8. Data files are not categories: most mix several, and
+  community_tips.md alone has 14. Sharding by file keeps an edit to one
+  file to one shard, which the incremental rebuild in watch_corpus.py
+  relies on.
+- manifest.lua, returning titles, categories, tags and each tip's shard,
+  byte offset and length
+
+The plugin builds the picker list from the manifest alone and reads a tip's
+description from its shard the first time it is previewed.
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+from build_plugin_cache import StringTable, lua_file_stamps, lua_string
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import CorpusTip, data_file_stamps, load_corpus
+
+FORMAT_VERSION = 1
+
+
+def shard_layout(tips: List[CorpusTip]) -> Dict[str, List[tuple]]:
+    """(tip, offset, length) per shard, one shard per source file"""
+    layout: Dict[str, List[tuple]] = {}
+    offsets: Dict[str, int] = {}
+    for tip in sorted(tips, key=lambda t: t.file):
+        shard_name = Path(tip.file).stem + '.txt'
+        length = len(tip.description.encode('utf-8'))
+        offset = offsets.get(shard_name, 0)
+        layout.setdefault(shard_name, []).append((tip, offset, length))
+        offsets[shard_name] = offset + length
+    return layout
+
+
+def write_shard(bundle_dir: Path, shard_name: str, entries: List[tuple]):
+    (bundle_dir / shard_name).write_bytes(b''.join(tip.description.encode('utf-8') for tip, _, _ in entries))
+
+
+def write_shards(tips: List[CorpusTip], bundle_dir: Path) -> Dict[str, List[tuple]]:
+    """Write one shard per source file, returning (tip, offset, length) per shard"""
+    layout = shard_layout(tips)
+    for shard_name, entries in layout.items():
+        write_shard(bundle_dir, shard_name, entries)
+    return layout
+
+
+def render_manifest(layout: Dict[str, List[tuple]], file_stamps: Dict[str, Dict]) -> str:
+    """Render the manifest as a Lua chunk returning {version, files, shards, tips}"""
+    strings = StringTable()
+    shard_names = list(layout)
+    tip_lines = []
+
+    for shard_index, shard_name in enumerate(shard_names, 1):
+        for tip, offset, length in layout[shard_name]:
+            fields = [f'title={lua_string(tip.title)}']
+            if tip.category is not None:
+                fields.append(f'category={strings.ref(tip.category)}')
+            if tip.tags is not None:
+                fields.append('tags={' + ','.join(strings.ref(t) for t in tip.tags) + '}')
+            fields.append(f'shard={shard_index},offset={offset},length={length}')
+            fields.append('is_user_tip=false')
+            tip_lines.append('{' + ','.join(fields) + '},')
+
+    out = [
+        '-- Generated by scripts/build_bundles.py from data/*.md. Do not edit.',
+        'local s={',
+    ]
+    out.extend(lua_string(text) + ',' for text in strings.strings)
+    out.append('}')
+    out.append('return {')
+    out.append(f'version={FORMAT_VERSION},')
+    out.append(lua_file_stamps(file_stamps))
+    out.append('shards={' + ','.join(lua_string(name) for name in shard_names) + '},')
+    out.append('tips={')
+    out.extend(tip_lines)
+    out.append('},')
+    out.append('}')
+    return '\n'.join(out) + '\n'
+
+
+def build_bundles(data_dir: Path, bundle_dir: Path) -> Dict[str, List[tuple]]:
+    """Write shards and manifest, removing shards of files that no longer exist"""
+    tips = load_corpus(data_dir)
+    file_stamps = data_file_stamps(data_dir)
+
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    layout = write_shards(tips, bundle_dir)
+    for stale in bundle_dir.glob('*.txt'):
+        if stale.name not in layout:
+            stale.unlink()
+
+    (bundle_dir / 'manifest.lua').write_text(render_manifest(layout, file_stamps), encoding='utf-8')
+    return layout
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bundle tips into per-data-file shards for lazy loading')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--bundle-dir', type=Path, default=Path('lua/neovim_tips/bundles'),
+                        help='Output directory for shards and manifest')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('build_bundles', args)
+
+    with metrics.stage('build'):
+        layout = build_bundles(args.data_dir, args.bundle_dir)
+    manifest = args.bundle_dir / 'manifest.lua'
+    tip_count = sum(len(entries) for entries in layout.values())
+    shard_bytes = sum((args.bundle_dir / name).stat().st_size for name in layout)
+    print(f"✓ Wrote {len(layout)} shards ({shard_bytes:,} bytes) with {tip_count} tips")
+    print(f"✓ Manifest: {manifest} ({manifest.stat().st_size:,} bytes)")
+    metrics.count('tips', tip_count)
+    metrics.count('shards', len(layout))
+    metrics.gauge('shard_bytes', shard_bytes)
+    metrics.gauge('manifest_bytes', manifest.stat().st_size)
+    metrics.write()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Generate the precompiled builtin tips chunk for the Neovim plugin.
+
+Parses data/*.md once (same rules as lua/neovim_tips/loader.lua) and writes
+a Lua file that returns the tips table in the exact shape the loader builds,
+so the editor can dofile() it instead of parsing markdown on a fresh install
+or after a cache invalidation.
+
+Categories and tags repeat across thousands of tips, so they are stored once
+in a string table and referenced by index.
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import CorpusTip, data_file_stamps, load_corpus
+
+FORMAT_VERSION = 1
+
+_LUA_ESCAPES = {
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+}
+
+
+def lua_string(text: str) -> str:
+    """Quote text as a Lua string literal"""
+    out = []
+    for char in text:
+        if char in _LUA_ESCAPES:
+            out.append(_LUA_ESCAPES[char])
+        elif ord(char) < 32 or ord(char) == 127:
+            out.append('\\%03d' % ord(char))
+        else:
+            out.append(char)
+    return '"' + ''.join(out) + '"'
+
+
+class StringTable:
+    """Deduplicated string constants referenced as s[i] in the chunk"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def ref(self, text: str) -> str:
+        if text not in self.index:
+            self.strings.append(text)
+            self.index[text] = len(self.strings)
+        return f's[{self.index[text]}]'
+
+
+def lua_file_stamps(stamps: Dict[str, Dict]) -> str:
+    """The files={...} field of a generated chunk (see tip_corpus.data_file_stamps)"""
+    return 'files={' + ','.join(f"[{lua_string(name)}]={{size={stamp['size']},sha256={lua_string(stamp['sha256'])}}}"
+                                for name, stamp in sorted(stamps.items())) + '},'
+
+
+def render_chunk(tips: List[CorpusTip], file_stamps: Dict[str, Dict]) -> str:
+    """Render tips as a Lua chunk returning {version, files, tips}"""
+    strings = StringTable()
+    tip_lines = []
+
+    for tip in tips:
+        fields = [f'title={lua_string(tip.title)}']
+        if tip.category is not None:
+            fields.append(f'category={strings.ref(tip.category)}')
+        if tip.tags is not None:
+            fields.append('tags={' + ','.join(strings.ref(t) for t in tip.tags) + '}')
+        fields.append(f'description={lua_string(tip.description)}')
+        fields.append('is_user_tip=false')
+        tip_lines.append('{' + ','.join(fields) + '},')
+
+    out = [
+        '-- Generated by scripts/build_plugin_cache.py from data/*.md. Do not edit.',
+        'local s={',
+    ]
+    out.extend(lua_string(text) + ',' for text in strings.strings)
+    out.append('}')
+    out.append('return {')
+    out.append(f'version={FORMAT_VERSION},')
+    out.append(lua_file_stamps(file_stamps))
+    out.append('tips={')
+    out.extend(tip_lines)
+    out.append('},')
+    out.append('}')
+    return '\n'.join(out) + '\n'
+
+
+def build_plugin_cache(data_dir: Path, output: Path) -> int:
+    """Write the precompiled chunk, returning the number of tips"""
+    duplicates: List[CorpusTip] = []
+    tips = load_corpus(data_dir, duplicates)
+    file_stamps = data_file_stamps(data_dir)
+
+    for dup in duplicates:
+        print(f"  ⚠️  Duplicate title skipped: {dup.title} ({dup.file}:{dup.line})")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(render_chunk(tips, file_stamps), encoding='utf-8')
+    return len(tips)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate precompiled tips chunk for the plugin')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--output', type=Path, default=Path('lua/neovim_tips/builtin_tips.lua'),
+                        help='Generated Lua file')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('build_plugin_cache', args)
+
+    with metrics.stage('build'):
+        count = build_plugin_cache(args.data_dir, args.output)
+    metrics.count('tips', count)
+    metrics.gauge('output_bytes', args.output.stat().st_size)
+    print(f"✓ Wrote {count} tips to {args.output} ({args.output.stat().st_size:,} bytes)")
+    metrics.write()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Precompute related-tips neighbour lists for the Neovim plugin.
+
+Embeds every tip with the dedup embedding machinery (EmbeddingGenerator
+from dedup_hybrid.py: sentence-transformers, or hashed term frequencies when
+no model is installed) and writes each tip's top-k most similar tips as a Lua chunk:
+
+    return {version=1, files={...}, titles={...}, related={{12,7,301},...}}
+
+related[i] holds the positions in `titles` of tip i's neighbours, most
+similar first. lua/neovim_tips/related.lua turns a title into its related
+titles with two table lookups and no similarity work in the editor.
+
+Rebuilds are incremental. A state file keeps each tip's neighbours and scores,
+keyed by the stable content-addressed tip id, plus the embeddings when a
+model is used. Only new or changed tips are embedded and compared against
+the corpus (O(changed x n)). An unchanged tip merges the changed tips into
+its old list, which gives the same top-k as a full rebuild. The exception is
+a tip that lost a neighbour to an edit or removal: its row is recomputed
+in full.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import dedup_hybrid
+from build_plugin_cache import lua_file_stamps, lua_string
+from dedup_hybrid import EmbeddingGenerator, is_sparse, lazy_import
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import CorpusTip, code_blocks, data_file_stamps, load_corpus, strip_code_blocks
+
+FORMAT_VERSION = 1
+STATE_VERSION = 1
+
+# Neighbour lists: tip id -> [(neighbour id, score)], most similar first
+Neighbours = Dict[str, List[Tuple[str, float]]]
+
+
+@dataclass
+class RelatedTip:
+    """A corpus tip in the shape EmbeddingGenerator expects"""
+    id: str
+    title: str
+    text: str
+
+    @classmethod
+    def from_corpus(cls, tip: CorpusTip) -> 'RelatedTip':
+        prose = strip_code_blocks(tip.description)
+        prose = '\n'.join(line for line in prose.split('\n') if not line.startswith('**Source:**'))
+        code = '\n'.join(code for _, code in code_blocks(tip.description))
+        return cls(tip.tip_id, tip.title, ' '.join([tip.title, prose.strip(), code[:400]]))
+
+    def get_text_for_embedding(self) -> str:
+        return self.text
+
+
+def ranked(candidates, k: int, min_similarity: float) -> List[Tuple[str, float]]:
+    """Top k (id, score) candidates at or above min_similarity; ties broken by id"""
+    kept = [(tip_id, score) for tip_id, score in candidates if score >= min_similarity]
+    kept.sort(key=lambda item: (-item[1], item[0]))
+    return kept[:k]
+
+
+def similarity_rows(matrix, rows: List[int]):
+    """Dense cosine similarities of `rows` against every tip (rows are L2-normalized)"""
+    block = matrix[rows] @ matrix.T
+    return block.toarray() if is_sparse(block) else block
+
+
+def embed(generator: EmbeddingGenerator, tips: List[RelatedTip], stored: Dict[str, 'object']):
+    """L2-normalized embedding matrix; model embeddings in `stored` are not recomputed"""
+    if generator.method == 'tfidf':
+        # Hashed term frequencies (L2-normalized, no IDF weighting) need no fit, so
+        # every vector is independent of the rest of the corpus and old neighbour
+        # scores stay valid. Without IDF, common words weigh as much as rare ones
+        return generator.generate_embeddings(tips)
+    np = lazy_import('numpy')
+    generator.cache.update(stored)
+    matrix = generator.generate_embeddings(tips).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def build_related(matrix, ids: List[str], k: int, min_similarity: float,
+                  previous: Neighbours, block_size: int = 512) -> Tuple[Neighbours, Dict[str, int]]:
+    """
+    Neighbour lists for every tip, reusing `previous` for unchanged tips.
+
+    Returns the lists and counts of rows computed in full and merged.
+    """
+    np = lazy_import('numpy')
+    position = {tip_id: i for i, tip_id in enumerate(ids)}
+    changed = [i for i, tip_id in enumerate(ids) if tip_id not in previous]
+    full = set(changed)
+    full.update(i for i, tip_id in enumerate(ids) if tip_id in previous and
+                any(neighbour not in position for neighbour, _ in previous[tip_id]))
+    full_rows = sorted(full)
+
+    neighbours: Neighbours = {}
+    for start in range(0, len(full_rows), block_size):
+        rows = full_rows[start:start + block_size]
+        scores = np.round(similarity_rows(matrix, rows), 4)
+        for row, i in zip(scores, rows):
+            row[i] = -np.inf
+            # Everything tied with the k-th score, so ties are broken by id as in ranked()
+            top = range(len(row))
+            if len(row) > k:
+                cut = np.partition(row, len(row) - k)[len(row) - k]
+                top = np.nonzero(row >= cut)[0]
+            neighbours[ids[i]] = ranked(((ids[j], float(row[j])) for j in top if j != i), k, min_similarity)
+
+    merged = [i for i in range(len(ids)) if i not in full]
+    if changed and merged:
+        columns = np.round(similarity_rows(matrix, changed), 4)
+        for i in merged:
+            candidates = previous[ids[i]] + [(ids[c], float(columns[n, i])) for n, c in enumerate(changed)]
+            neighbours[ids[i]] = ranked(candidates, k, min_similarity)
+    else:
+        for i in merged:
+            neighbours[ids[i]] = previous[ids[i]]
+
+    return neighbours, {'full_rows': len(full_rows), 'merged_rows': len(merged) if changed else 0,
+                        'changed': len(changed)}
+
+
+def load_state(state_path: Path, method: str, k: int, min_similarity: float) -> Tuple[Neighbours, Dict]:
+    """Previous neighbour lists and embeddings, if built with the same settings"""
+    if not state_path.exists():
+        return {}, {}
+    state = json.loads(state_path.read_text(encoding='utf-8'))
+    if (state.get('version'), state.get('method'), state.get('k'), state.get('min_similarity')) != \
+            (STATE_VERSION, method, k, min_similarity):
+        print("  Settings changed since the last build, rebuilding every list")
+        return {}, {}
+    neighbours = {tip_id: [tuple(item) for item in items] for tip_id, items in state['neighbours'].items()}
+
+    stored = {}
+    embeddings_path = state_path.with_suffix('.npz')
+    if method == 'local' and embeddings_path.exists():
+        np = lazy_import('numpy')
+        with np.load(embeddings_path) as data:
+            stored = dict(zip(data['ids'].tolist(), data['embeddings']))
+    return neighbours, stored
+
+
+def write_state(state_path: Path, method: str, k: int, min_similarity: float,
+                neighbours: Neighbours, generator: EmbeddingGenerator, ids: List[str]):
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state = {'version': STATE_VERSION, 'method': method, 'k': k, 'min_similarity': min_similarity,
+             'neighbours': neighbours}
+    state_path.write_text(json.dumps(state, separators=(',', ':')), encoding='utf-8')
+    if method == 'local':
+        np = lazy_import('numpy')
+        np.savez(state_path.with_suffix('.npz'), ids=np.array(ids),
+                 embeddings=np.stack([generator.cache[tip_id] for tip_id in ids]))
+
+
+def render_chunk(tips: List[CorpusTip], neighbours: Neighbours, file_stamps: Dict[str, Dict]) -> str:
+    """Render neighbour lists as a Lua chunk returning {version, files, titles, related}"""
+    position = {tip.tip_id: i + 1 for i, tip in enumerate(tips)}
+    out = [
+        '-- Generated by scripts/build_related_tips.py from data/*.md. Do not edit.',
+        'return {',
+        f'version={FORMAT_VERSION},',
+        lua_file_stamps(file_stamps),
+        'titles={',
+    ]
+    out.extend(lua_string(tip.title) + ',' for tip in tips)
+    out.append('},')
+    out.append('related={')
+    out.extend('{' + ','.join(str(position[n]) for n, _ in neighbours[tip.tip_id]) + '},' for tip in tips)
+    out.append('},')
+    out.append('}')
+    return '\n'.join(out) + '\n'
+
+
+def build_related_tips(data_dir: Path, output: Path, state_path: Path, k: int = 5,
+                       min_similarity: float = 0.2, full: bool = False, workers: int = 1,
+                       batch_size: int = 64, metrics: Optional[Metrics] = None,
+                       tips: Optional[List[CorpusTip]] = None,
+                       file_stamps: Optional[Dict[str, Dict[str, object]]] = None) -> Dict[str, int]:
+    """
+    Write the related-tips chunk, returning tip and row counts.
+
+    `tips` and `file_stamps` (load_corpus and data_file_stamps of data_dir)
+    may come from a caller that already holds the corpus in memory.
+    """
+    metrics = metrics or Metrics('build_related_tips')
+    # Embedding imports and model load are timed by dedup_hybrid's collector
+    dedup_hybrid.METRICS = metrics
+
+    with metrics.stage('load'):
+        if tips is None:
+            tips = load_corpus(data_dir)
+        if file_stamps is None:
+            file_stamps = data_file_stamps(data_dir)
+        related_tips = [RelatedTip.from_corpus(tip) for tip in tips]
+        ids = [tip.id for tip in related_tips]
+
+    generator = EmbeddingGenerator(workers=workers, batch_size=batch_size, tfidf_mode='hashing')
+    try:
+        previous, stored = ({}, {}) if full else load_state(state_path, generator.method, k, min_similarity)
+        with metrics.stage('embed'):
+            matrix = embed(generator, related_tips, stored)
+        with metrics.stage('neighbours'):
+            neighbours, stats = build_related(matrix, ids, k, min_similarity, previous)
+        with metrics.stage('write'):
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(render_chunk(tips, neighbours, file_stamps), encoding='utf-8')
+            write_state(state_path, generator.method, k, min_similarity, neighbours, generator, ids)
+    finally:
+        generator.close()
+
+    return {'tips': len(tips), **stats}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Precompute related tips for the plugin')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--output', type=Path, default=Path('lua/neovim_tips/related_tips.lua'),
+                        help='Generated Lua file')
+    parser.add_argument('--state', type=Path, default=Path('scripts/related_tips_state.json'),
+                        help='Neighbour lists (and embeddings, as .npz) kept for incremental rebuilds')
+    parser.add_argument('-k', type=int, default=5,
+                        help='Related tips per tip')
+    parser.add_argument('--min-similarity', type=float, default=0.2,
+                        help='Leave out neighbours less similar than this')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the state file and recompute every list')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Encoder processes for sentence-transformers')
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help='Texts per encoding batch')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('build_related_tips', args)
+
+    stats = build_related_tips(args.data_dir, args.output, args.state, args.k, args.min_similarity,
+                               args.full, args.workers, args.batch_size, metrics)
+    for name, value in stats.items():
+        metrics.count(name, value)
+    metrics.gauge('output_bytes', args.output.stat().st_size)
+    print(f"✓ {stats['tips']} tips: {stats['changed']} new or changed, {stats['full_rows']} lists "
+          f"computed in full, {stats['merged_rows']} updated")
+    print(f"✓ Wrote {args.output} ({args.output.stat().st_size:,} bytes)")
+    metrics.write()
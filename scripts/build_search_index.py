@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Build a prebuilt inverted search index for the tips picker.
+
+The picker (lua/neovim_tips/tips_picker) filters by scanning every tip with
+the substring checks in search_parser.lua. This script precomputes, for the
+whole corpus:
+
+- category and tag posting lists (filters match against the small vocabulary,
+  then the matching lists are unioned)
+- title trigram posting lists (a title word's trigrams are intersected to get
+  a candidate superset that is then verified with the same substring check)
+- title/body token posting lists for whole-word lookups
+
+Posting lists are sorted tip ids (positions in the index's title list, which
+uses the picker's ordering), stored as gaps to keep the file small.
+
+Also contains a Python reference implementation of the query and a benchmark
+against a linear scan.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import CorpusTip, data_file_stamps, load_corpus
+
+FORMAT_VERSION = 1
+
+_TOKEN_RE = re.compile(r'[a-z0-9_]{2,}')
+_LUA_WS = ' \t\n\r\f\v'
+
+
+def ascii_lower(text: str) -> str:
+    """string.lower() as Lua does it (ASCII only)"""
+    return ''.join(chr(ord(c) + 32) if 'A' <= c <= 'Z' else c for c in text)
+
+
+def trigrams(text: str) -> set:
+    """ASCII-only trigrams of text (others can't be matched byte-wise in Lua)"""
+    grams = set()
+    for i in range(len(text) - 2):
+        gram = text[i:i + 3]
+        if gram.isascii():
+            grams.add(gram)
+    return grams
+
+
+def encode_postings(ids: Iterable[int]) -> List[int]:
+    """Sorted ids -> first id followed by gaps"""
+    out, previous = [], 0
+    for tip_id in sorted(ids):
+        out.append(tip_id - previous)
+        previous = tip_id
+    return out
+
+
+def decode_postings(gaps: List[int]) -> List[int]:
+    """Inverse of encode_postings"""
+    out, total = [], 0
+    for gap in gaps:
+        total += gap
+        out.append(total)
+    return out
+
+
+def parse_search_query(search_text: str) -> Dict[str, List[str]]:
+    """Python port of search_parser.parse_search_query"""
+    query = {'categories': [], 'tags': [], 'title_words': [], 'bookmarks': []}
+    if not search_text:
+        return query
+
+    text = ascii_lower(search_text)
+    i, n = 0, len(text)
+    while i < n:
+        while i < n and text[i] in _LUA_WS:
+            i += 1
+        if i >= n:
+            break
+
+        token_start = i
+        prefix = ''
+        if i + 1 < n and text[i + 1] == ':' and text[i] in 'tcb':
+            prefix = text[i]
+            i += 2
+
+        token = ''
+        if i < n:
+            if text[i] == '"':
+                i += 1
+                value_start = i
+                while i < n and text[i] != '"':
+                    i += 1
+                token = text[value_start:i]
+                if i < n:
+                    i += 1
+            else:
+                value_start = i
+                while i < n and text[i] not in _LUA_WS:
+                    i += 1
+                token = text[value_start:i]
+
+        if prefix == 'b':
+            query['bookmarks'].append(token)
+        elif len(token) >= 2 or text[token_start] == '"':
+            if prefix == 't' and token:
+                query['tags'].append(token)
+            elif prefix == 'c' and token:
+                query['categories'].append(token)
+            elif not prefix and token:
+                query['title_words'].append(token)
+
+    return query
+
+
+def linear_search(tips: List[CorpusTip], query: Dict[str, List[str]]) -> List[str]:
+    """Reference full scan, equivalent to NuiPicker:filter_titles (minus bookmarks)"""
+    results = []
+    for tip in tips:
+        if query['categories']:
+            category = ascii_lower(tip.category or '')
+            if tip.category is None or not any(f in category for f in query['categories']):
+                continue
+        if query['tags']:
+            tags = [ascii_lower(t) for t in (tip.tags or [])]
+            if not any(f in tag for tag in tags for f in query['tags']):
+                continue
+        if query['title_words']:
+            title = ascii_lower(tip.title)
+            if not all(w in title for w in query['title_words']):
+                continue
+        results.append(tip.title)
+    return results
+
+
+class SearchIndex:
+    """Inverted index over titles, categories, tags and body tokens"""
+
+    def __init__(self, titles: List[str], categories: Dict[str, List[int]],
+                 tags: Dict[str, List[int]], trigrams: Dict[str, List[int]],
+                 tokens: Dict[str, List[int]], files: Optional[Dict[str, Dict]] = None):
+        self.titles = titles
+        self.categories = categories
+        self.tags = tags
+        self.trigrams = trigrams
+        self.tokens = tokens
+        self.files = files or {}
+        self._lower_titles = [ascii_lower(t) for t in titles]
+
+    @classmethod
+    def build(cls, tips: List[CorpusTip], files: Optional[Dict[str, Dict]] = None) -> 'SearchIndex':
+        """Build the index from parsed tips"""
+        ordered = sorted(tips, key=lambda t: ascii_lower(t.title))
+        categories: Dict[str, set] = {}
+        tags: Dict[str, set] = {}
+        grams: Dict[str, set] = {}
+        tokens: Dict[str, set] = {}
+
+        for tip_id, tip in enumerate(ordered):
+            if tip.category is not None:
+                categories.setdefault(ascii_lower(tip.category), set()).add(tip_id)
+            for tag in tip.tags or []:
+                tags.setdefault(ascii_lower(tag), set()).add(tip_id)
+            title = ascii_lower(tip.title)
+            for gram in trigrams(title):
+                grams.setdefault(gram, set()).add(tip_id)
+            for token in set(_TOKEN_RE.findall(title + '\n' + ascii_lower(tip.description))):
+                tokens.setdefault(token, set()).add(tip_id)
+
+        as_lists = lambda d: {k: sorted(v) for k, v in sorted(d.items())}
+        return cls([t.title for t in ordered], as_lists(categories), as_lists(tags),
+                   as_lists(grams), as_lists(tokens), files)
+
+    def to_dict(self) -> Dict:
+        """The serialized form, with posting lists gap-encoded"""
+        encode = lambda d: {k: encode_postings(v) for k, v in d.items()}
+        return {
+            'version': FORMAT_VERSION,
+            'files': self.files,
+            'titles': self.titles,
+            'categories': encode(self.categories),
+            'tags': encode(self.tags),
+            'trigrams': encode(self.trigrams),
+            'tokens': encode(self.tokens),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, text: str) -> 'SearchIndex':
+        data = json.loads(text)
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index version: {data.get('version')}")
+        decode = lambda d: {k: decode_postings(v) for k, v in d.items()}
+        return cls(data['titles'], decode(data['categories']), decode(data['tags']),
+                   decode(data['trigrams']), decode(data['tokens']), data.get('files'))
+
+    @staticmethod
+    def _vocabulary_union(postings: Dict[str, List[int]], filters: List[str]) -> set:
+        """Union of lists whose key contains any filter (search_parser semantics)"""
+        ids = set()
+        for key, key_ids in postings.items():
+            if any(f in key for f in filters):
+                ids.update(key_ids)
+        return ids
+
+    @staticmethod
+    def _intersect(sets: List[set]) -> set:
+        sets = sorted(sets, key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def query(self, query: Dict[str, List[str]], body_words: Optional[List[str]] = None) -> List[str]:
+        """Titles matching query, in picker order (bookmarks are not indexed)"""
+        constraints = []
+        if query['categories']:
+            constraints.append(self._vocabulary_union(self.categories, query['categories']))
+        if query['tags']:
+            constraints.append(self._vocabulary_union(self.tags, query['tags']))
+        for word in query['title_words']:
+            grams = trigrams(word)
+            if grams:
+                constraints.append(self._intersect([set(self.trigrams.get(g, ())) for g in grams]))
+        for word in body_words or []:
+            constraints.append(set(self.tokens.get(ascii_lower(word), ())))
+
+        if constraints:
+            candidates = sorted(self._intersect(constraints))
+        else:
+            candidates = range(len(self.titles))
+
+        # Trigrams only give a superset for title words; verify them
+        words = query['title_words']
+        return [self.titles[i] for i in candidates
+                if all(w in self._lower_titles[i] for w in words)]
+
+
+def sample_queries(tips: List[CorpusTip], count: int = 200) -> List[str]:
+    """Deterministic mix of tag, category and title-word queries from the corpus"""
+    queries = []
+    step = max(1, len(tips) // count)
+    for tip in tips[::step][:count]:
+        words = [w for w in ascii_lower(tip.title).split() if len(w) >= 3]
+        parts = []
+        if words:
+            parts.append(words[0])
+        if tip.tags:
+            parts.append('t:' + ascii_lower(tip.tags[0]).replace(' ', ''))
+        if len(queries) % 3 == 0 and tip.category:
+            parts.append('c:' + ascii_lower(tip.category).split()[0])
+        if len(queries) % 4 == 1 and len(words) > 1:
+            parts = [words[0], words[-1]]
+        queries.append(' '.join(parts))
+    return queries
+
+
+def benchmark(tips: List[CorpusTip], index: SearchIndex, rounds: int = 5):
+    """Compare index lookups with a linear scan over the same queries"""
+    queries = [parse_search_query(q) for q in sample_queries(tips)]
+    by_title = {t.title: t for t in tips}
+    ordered = [by_title[title] for title in index.titles]
+
+    for query in queries:
+        if index.query(query) != linear_search(ordered, query):
+            raise AssertionError(f"Index result differs from linear scan for {query}")
+
+    def timed(fn) -> float:
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for query in queries:
+                fn(query)
+            best = min(best, time.perf_counter() - start)
+        return best / len(queries)
+
+    scan = timed(lambda q: linear_search(ordered, q))
+    indexed = timed(index.query)
+    print(f"\nBenchmark ({len(queries)} queries, {len(tips)} tips, best of {rounds}):")
+    print(f"  Linear scan: {scan * 1e6:,.1f} µs/query")
+    print(f"  Index:       {indexed * 1e6:,.1f} µs/query")
+    print(f"  Speedup:     {scan / indexed:.1f}x")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build inverted search index for the tips picker')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--output', type=Path, default=Path('lua/neovim_tips/search_index.json'),
+                        help='Index file to write')
+    parser.add_argument('--query', type=str, default=None,
+                        help='Run a picker query (e.g. "motion t:operator") against the index')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare index lookups against a linear scan')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('build_search_index', args)
+
+    with metrics.stage('load'):
+        tips = load_corpus(args.data_dir)
+        files = data_file_stamps(args.data_dir)
+    with metrics.stage('index'):
+        index = SearchIndex.build(tips, files)
+
+    with metrics.stage('write'):
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(index.to_json(), encoding='utf-8')
+    metrics.count('tips', len(index.titles))
+    metrics.count('trigrams', len(index.trigrams))
+    metrics.count('tokens', len(index.tokens))
+    metrics.gauge('output_bytes', args.output.stat().st_size)
+    print(f"✓ Indexed {len(index.titles)} tips: {len(index.categories)} categories, "
+          f"{len(index.tags)} tags, {len(index.trigrams)} trigrams, {len(index.tokens)} tokens")
+    print(f"✓ Wrote {args.output} ({args.output.stat().st_size:,} bytes)")
+
+    if args.query is not None:
+        for title in index.query(parse_search_query(args.query)):
+            print(f"  {title}")
+
+    if args.benchmark:
+        with metrics.stage('benchmark'):
+            benchmark(tips, index)
+
+    metrics.write()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Build a static HTML site of the tips: one page per category file.
+
+Pages go through the same markdown walk as the LaTeX book
+(pdf/build_tex.py: MarkdownFormat), with an HTML format in place of the LaTeX
+one. Tips are ordered by title as in the book, and each has an anchor from
+its title alias.
+
+Search needs no indexing in the browser. search_index.json is the picker's
+prebuilt index (build_search_index.SearchIndex: gap-encoded category, tag,
+title-trigram and body-token posting lists), plus each title's page and
+anchor. search.js only decodes and intersects the lists a query needs.
+
+Rebuilds are incremental. scripts/site_manifest.json keeps each data file's
+hash and its tips' titles and anchors, and only pages of new or changed files
+are parsed and rendered again, in parallel worker processes. The search index
+is rebuilt only when some data file changed. Pages of removed files are
+deleted. The manifest also keeps a hash of the rendering code (this file,
+pdf/build_tex.py and tip_corpus.py), so editing the converter or the page
+layout renders every page again. index.html, the search index and the static
+assets are rewritten only when their content changes.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'pdf'))
+
+from build_search_index import SearchIndex  # noqa: E402
+from build_tex import MarkdownFormat, TipsParser, code_label  # noqa: E402
+from metrics import Metrics, add_arguments as add_metrics_arguments  # noqa: E402
+from tip_corpus import CorpusTip, data_file_stamps, load_corpus, title_alias  # noqa: E402
+
+# Bump when pages must be rendered again for a reason outside RENDERER_SOURCES
+TEMPLATE_VERSION = 1
+
+# Source files whose code shapes the pages; their hash is part of the manifest key
+RENDERER_SOURCES = [Path(__file__).resolve(), Path(__file__).resolve().parent.parent / 'pdf' / 'build_tex.py',
+                    Path(__file__).resolve().parent / 'tip_corpus.py']
+
+_HTML_SPECIAL_CHARS = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}
+
+
+def escape(text: str) -> str:
+    return ''.join(_HTML_SPECIAL_CHARS.get(char, char) for char in text)
+
+
+class HtmlFormat(MarkdownFormat):
+    """Tip markdown as HTML (a pre-wrap block keeps the source's line breaks)"""
+
+    def code_block(self, language: str, code: str) -> str:
+        label = code_label(language)
+        caption = f'<span class="label">{label}</span>' if label else ''
+        return (f'<figure class="example">{caption}<pre><code class="language-{escape(language)}">'
+                f'{escape(code)}</code></pre></figure>')
+
+    def inline_code(self, code: str) -> str:
+        return f'<code>{escape(code)}</code>'
+
+    def bold(self, text: str) -> str:
+        return f'<strong>{escape(text)}</strong>'
+
+    def italic(self, text: str) -> str:
+        return f'<em>{escape(text)}</em>'
+
+    def link(self, text: str, url: str) -> str:
+        return f'<a href="{escape(url)}">{escape(text)}</a>'
+
+    def char(self, char: str) -> str:
+        return _HTML_SPECIAL_CHARS.get(char, char)
+
+
+class HtmlTitleFormat(HtmlFormat):
+    """Tip titles: inline markup only, links reduced to their text"""
+
+    code_blocks = False
+
+    def link(self, text: str, url: str) -> str:
+        return escape(text)
+
+
+def page_name(data_file: str) -> str:
+    return Path(data_file).stem + '.html'
+
+
+def anchors(titles: List[str]) -> List[str]:
+    """Unique anchor per title, in page order; repeated aliases get -2, -3, ..."""
+    seen: Dict[str, int] = {}
+    out = []
+    for title in titles:
+        alias = title_alias(title) or 'tip'
+        seen[alias] = seen.get(alias, 0) + 1
+        out.append(alias if seen[alias] == 1 else f'{alias}-{seen[alias]}')
+    return out
+
+
+def layout(title: str, body: str) -> str:
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{escape(title)} - Neovim Tips</title>
+<link rel="stylesheet" href="style.css">
+</head>
+<body>
+<header>
+<a class="home" href="index.html">Neovim Tips</a>
+<input id="search" type="search" placeholder="Search tips (t:tag c:category)" autocomplete="off">
+<ol id="results"></ol>
+</header>
+<main>
+{body}
+</main>
+<script src="search.js"></script>
+</body>
+</html>
+'''
+
+
+def render_page(source: Path) -> Tuple[str, List[List[str]]]:
+    """HTML page of one data file, and [title, anchor] of each of its tips"""
+    parser = TipsParser(str(source))
+    # Untitled fragments (text before a file's first tip) are not tips
+    tips = [tip for tip in parser.get_tips() if tip.get_title()]
+    body_format, title_format = HtmlFormat(), HtmlTitleFormat()
+    sections = [f'<h1>{escape(parser.get_title())}</h1>']
+    page_anchors = anchors([tip.get_title() for tip in tips])
+    for tip, anchor in zip(tips, page_anchors):
+        tags = ', '.join(f'<span class="tag">{escape(tag.strip())}</span>'
+                         for tag in tip.get_tags().split(',') if tag.strip())
+        sections.append(
+            f'<section id="{anchor}">\n'
+            f'<h2><a href="#{anchor}">{title_format.convert(tip.get_title())}</a></h2>\n'
+            f'<p class="meta">{escape(tip.get_category())}{" · " + tags if tags else ""}</p>\n'
+            f'<div class="body">{body_format.convert(tip.get_body())}</div>\n'
+            f'</section>')
+    return (layout(parser.get_title(), '\n'.join(sections)),
+            [[tip.get_title(), anchor] for tip, anchor in zip(tips, page_anchors)])
+
+
+def render_job(job: Tuple[Path, Path]) -> Tuple[str, List[List[str]], int]:
+    """Render and write one page (runs in a worker process)"""
+    source, output = job
+    html, entries = render_page(source)
+    output.write_text(html, encoding='utf-8')
+    return source.name, entries, len(html.encode('utf-8'))
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding='utf-8') == text:
+        return False
+    path.write_text(text, encoding='utf-8')
+    return True
+
+
+def render_index(pages: List[Tuple[str, str, int]]) -> str:
+    """index.html: every category page with its tip count"""
+    items = '\n'.join(f'<li><a href="{page_name(name)}">{escape(title)}</a> <span class="count">{count}</span></li>'
+                      for name, title, count in pages)
+    total = sum(count for _, _, count in pages)
+    return layout('All tips', f'<h1>Neovim Tips</h1>\n<p>{total} tips in {len(pages)} categories.</p>\n'
+                              f'<ul class="categories">\n{items}\n</ul>')
+
+
+def render_search_index(tips: List[CorpusTip], page_anchors: Dict[str, Dict[str, str]]) -> str:
+    """The picker's search index plus [page, anchor] per title, as compact JSON"""
+    index = SearchIndex.build(tips)
+    by_title = {tip.title: tip for tip in tips}
+    pages = sorted(page_anchors)
+    page_ids = {name: i for i, name in enumerate(pages)}
+    data = index.to_dict()
+    del data['files']
+    data['pages'] = [page_name(name) for name in pages]
+    data['locations'] = [[page_ids[by_title[title].file], page_anchors[by_title[title].file].get(title, '')]
+                         for title in index.titles]
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+STYLE = '''body { margin: 0; font: 16px/1.5 system-ui, sans-serif; color: #1f2328; }
+header { position: sticky; top: 0; display: flex; gap: 1em; align-items: center; padding: .5em 1em;
+         background: #1e2a1e; }
+header .home { color: #8fd18f; font-weight: bold; text-decoration: none; }
+#search { flex: 1; max-width: 30em; padding: .3em .5em; }
+#results { position: absolute; top: 2.6em; left: 10em; max-height: 70vh; overflow: auto; margin: 0;
+           padding: .5em 1.5em; background: #fff; box-shadow: 0 2px 8px #0004; }
+#results:empty { display: none; }
+main { max-width: 50em; margin: 0 auto; padding: 1em; }
+section { border-top: 1px solid #d0d7de; padding-top: .5em; }
+h2 a { color: inherit; text-decoration: none; }
+.meta { color: #59636e; font-size: .9em; }
+.tag { background: #eef6ee; border-radius: 3px; padding: 0 .3em; }
+.body { white-space: pre-wrap; }
+figure.example { margin: .5em 0; white-space: normal; }
+figure.example .label { font-size: .8em; color: #59636e; }
+pre { background: #f6f8fa; padding: .6em; overflow-x: auto; white-space: pre; }
+code { font: .9em ui-monospace, monospace; }
+.count { color: #59636e; }
+'''
+
+SEARCH_JS = '''// Client for search_index.json, written by scripts/build_site.py. The index is
+// prebuilt: posting lists are decoded and intersected per query, nothing is indexed here.
+(function () {
+  var input = document.getElementById('search');
+  var list = document.getElementById('results');
+  var index = null;
+
+  function decode(gaps) {
+    var ids = [], total = 0;
+    for (var i = 0; i < (gaps || []).length; i++) { total += gaps[i]; ids.push(total); }
+    return ids;
+  }
+  function union(postings, filter) {
+    var ids = {};
+    for (var key in postings) {
+      if (key.indexOf(filter) !== -1) decode(postings[key]).forEach(function (id) { ids[id] = true; });
+    }
+    return ids;
+  }
+  function intersect(sets) {
+    var result = sets[0];
+    for (var i = 1; i < sets.length; i++) {
+      var next = {};
+      for (var id in result) if (sets[i][id]) next[id] = true;
+      result = next;
+    }
+    return result;
+  }
+  function toSet(ids) {
+    var set = {};
+    ids.forEach(function (id) { set[id] = true; });
+    return set;
+  }
+  function titleWord(word) {
+    // Trigrams give a superset of titles containing the word; body tokens add exact word matches
+    var sets = [];
+    for (var i = 0; i + 3 <= word.length; i++) sets.push(toSet(decode(index.trigrams[word.substr(i, 3)])));
+    var titles = sets.length ? intersect(sets) : toSet(index.titles.map(function (_, i) { return i; }));
+    var matches = {};
+    for (var id in titles) if (index.lowerTitles[id].indexOf(word) !== -1) matches[id] = true;
+    decode(index.tokens[word]).forEach(function (id) { matches[id] = true; });
+    return matches;
+  }
+  function search(text) {
+    var sets = [];
+    text.toLowerCase().split(/\\s+/).forEach(function (token) {
+      if (token.length < 2) return;
+      if (token.indexOf('t:') === 0 && token.length > 2) sets.push(union(index.tags, token.slice(2)));
+      else if (token.indexOf('c:') === 0 && token.length > 2) sets.push(union(index.categories, token.slice(2)));
+      else sets.push(titleWord(token));
+    });
+    if (!sets.length) return [];
+    return Object.keys(intersect(sets)).map(Number).sort(function (a, b) { return a - b; });
+  }
+  function show() {
+    var ids = search(input.value).slice(0, 50);
+    list.innerHTML = '';
+    ids.forEach(function (id) {
+      var location = index.locations[id];
+      var item = document.createElement('li');
+      var link = document.createElement('a');
+      link.href = index.pages[location[0]] + (location[1] ? '#' + location[1] : '');
+      link.textContent = index.titles[id];
+      item.appendChild(link);
+      list.appendChild(item);
+    });
+  }
+  input.addEventListener('input', function () {
+    if (index) return show();
+    fetch('search_index.json').then(function (response) { return response.json(); }).then(function (data) {
+      index = data;
+      index.lowerTitles = data.titles.map(function (title) { return title.toLowerCase(); });
+      show();
+    });
+  });
+})();
+'''
+
+
+def renderer_hash() -> str:
+    """Hash of the code that renders pages: a change to it invalidates every page"""
+    digest = hashlib.sha1()
+    for path in RENDERER_SOURCES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path, renderer: str) -> Tuple[Dict, bool]:
+    """The last build's manifest, and whether the pages it records are still current"""
+    if not path.exists():
+        return {'files': {}}, False
+    data = json.loads(path.read_text(encoding='utf-8'))
+    return data, data.get('version') == TEMPLATE_VERSION and data.get('renderer') == renderer
+
+
+def corpus_key(digests: Dict[str, str]) -> str:
+    """Hash of every data file's hash: the search index is rebuilt when it changes"""
+    return hashlib.sha256(json.dumps(digests, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def build_site(data_dir: Path, output_dir: Path, manifest_path: Path, full: bool = False,
+               workers: int = 1, metrics: Optional[Metrics] = None, tips: Optional[List[CorpusTip]] = None,
+               file_stamps: Optional[Dict[str, Dict[str, object]]] = None) -> Dict[str, int]:
+    """
+    Render changed pages, the index page, search index and assets; returns counts.
+
+    `tips` and `file_stamps` (load_corpus and data_file_stamps of data_dir)
+    may come from a caller that already holds them in memory; otherwise data_dir
+    is hashed here, and parsed only if the search index must be rebuilt.
+    """
+    metrics = metrics or Metrics('build_site')
+    output_dir.mkdir(parents=True, exist_ok=True)
+    renderer = renderer_hash()
+    manifest, current = load_manifest(manifest_path, renderer)
+    recorded = manifest['files']
+    previous = recorded if current and not full else {}
+
+    with metrics.stage('scan'):
+        if file_stamps is None:
+            file_stamps = data_file_stamps(data_dir)
+        digests = {name: stamp['sha256'] for name, stamp in file_stamps.items()}
+        pending = [name for name in sorted(digests)
+                   if previous.get(name, {}).get('sha256') != digests[name]
+                   or not (output_dir / page_name(name)).exists()]
+
+    with metrics.stage('render'):
+        jobs = [(data_dir / name, output_dir / page_name(name)) for name in pending]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rendered = list(pool.map(render_job, jobs))
+        else:
+            rendered = [render_job(job) for job in jobs]
+        # [title, anchor] of every page's tips: kept in the manifest for unchanged pages
+        entries = {name: previous[name]['tips'] for name in digests if name not in pending}
+        for name, page_entries, size in rendered:
+            entries[name] = page_entries
+            metrics.count('page_bytes', size)
+
+    with metrics.stage('index'):
+        for stale in set(recorded) - set(digests):
+            (output_dir / page_name(stale)).unlink(missing_ok=True)
+        page_anchors = {name: {} for name in entries}
+        for name, page_entries in entries.items():
+            for title, anchor in page_entries:
+                page_anchors[name].setdefault(title, anchor)
+        pages = [(name, TipsParser(name).get_title(), len(entries[name])) for name in sorted(entries)]
+        rewritten = sum([
+            write_if_changed(output_dir / 'index.html', render_index(pages)),
+            write_if_changed(output_dir / 'style.css', STYLE),
+            write_if_changed(output_dir / 'search.js', SEARCH_JS),
+        ])
+        # The search index spans the whole corpus (titles repeated across files
+        # keep the first), so it is rebuilt whenever any data file changed
+        search_key = corpus_key(digests)
+        search_path = output_dir / 'search_index.json'
+        if not current or full or manifest.get('search_index') != search_key or not search_path.exists():
+            rewritten += write_if_changed(search_path, render_search_index(
+                tips if tips is not None else load_corpus(data_dir), page_anchors))
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    files = {name: {'sha256': digests[name], 'tips': entries[name]} for name in sorted(digests)}
+    manifest_path.write_text(json.dumps({'version': TEMPLATE_VERSION, 'renderer': renderer,
+                                         'search_index': search_key, 'files': files}, indent=1),
+                             encoding='utf-8')
+    return {'pages': len(digests), 'rendered': len(rendered), 'tips': sum(len(e) for e in entries.values()),
+            'removed': len(set(recorded) - set(digests)), 'other_files_written': rewritten}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the static HTML site with a prebuilt search index')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--output-dir', type=Path, default=Path('site'),
+                        help='Directory the site is written to')
+    parser.add_argument('--manifest', type=Path, default=Path('scripts/site_manifest.json'),
+                        help='Data file hashes, titles and anchors from the last build, for incremental rebuilds')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the manifest and render every page')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Rendering processes (0 = one per CPU core)')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('build_site', args)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    stats = build_site(args.data_dir, args.output_dir, args.manifest, args.full, workers, metrics)
+    for key, value in stats.items():
+        metrics.count(key, value)
+    print(f"✓ {stats['tips']} tips on {stats['pages']} pages: {stats['rendered']} rendered, "
+          f"{stats['removed']} removed, {stats['other_files_written']} other files updated")
+    print(f"✓ Site written to {args.output_dir}")
+    metrics.write()
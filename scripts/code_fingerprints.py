@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Winnowing fingerprints of tip code blocks: which tips share code.
+
+Vim and Lua fences are tokenized with comments and whitespace dropped, and
+<Key> notation lowercased. The tokens are hashed as k-grams and winnowed:
+the rightmost minimum hash of every window of `window` consecutive k-grams
+is kept (Schleimer et al., 2003). Any run of at least k + window - 1 tokens
+that two tips share is guaranteed to produce a common fingerprint, whatever
+prose surrounds it.
+
+FingerprintIndex is an inverted index from fingerprint to tips. It counts
+shared fingerprints per pair from the posting lists, so finding tips with
+substantial common code costs about the size of the index, not O(n^2)
+comparisons. Very common fingerprints (boilerplate such as
+`vim.keymap.set('n',`) are skipped with max_postings.
+"""
+
+import re
+import zlib
+from collections import Counter, defaultdict, deque
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+LANGUAGES = ('vim', 'lua')
+
+# Comments come first so they win over the string and symbol alternatives; a
+# "comment" group match is dropped
+_VIM_TOKEN_RE = re.compile(r'''
+    (?P<comment>^[ \t:]*"[^\n]*)
+  | '(?:[^'\n]|'')*'
+  | "(?:[^"\\\n]|\\.)*"
+  | <[\w-]+>
+  | \w+
+  | [^\w\s]
+''', re.MULTILINE | re.VERBOSE)
+
+_LUA_TOKEN_RE = re.compile(r'''
+    (?P<comment>--\[(?P<level>=*)\[.*?\](?P=level)\]|--[^\n]*)
+  | \[(?P<strlevel>=*)\[.*?\](?P=strlevel)\]
+  | '(?:[^'\\\n]|\\.)*'
+  | "(?:[^"\\\n]|\\.)*"
+  | <[\w-]+>
+  | \w+
+  | [^\w\s]
+''', re.DOTALL | re.VERBOSE)
+
+_TOKEN_RES = {'vim': _VIM_TOKEN_RE, 'lua': _LUA_TOKEN_RE}
+_KEY_NOTATION_RE = re.compile(r'<[\w-]+>')
+
+
+def tokenize(code: str, language: str) -> List[str]:
+    """Tokens of a vim or lua code block, without comments or whitespace"""
+    tokens = []
+    for match in _TOKEN_RES[language].finditer(code):
+        if match.group('comment'):
+            continue
+        token = match.group(0)
+        if '<' in token:
+            # Key notation is case-insensitive inside string literals too: <CR> == <cr>
+            token = _KEY_NOTATION_RE.sub(lambda m: m.group(0).lower(), token)
+        tokens.append(token)
+    return tokens
+
+
+def kgram_hashes(tokens: List[str], k: int) -> List[int]:
+    """32-bit hash of each run of k consecutive tokens (stable across runs)"""
+    return [zlib.crc32('\x1f'.join(tokens[i:i + k]).encode('utf-8'))
+            for i in range(len(tokens) - k + 1)]
+
+
+def winnow(hashes: List[int], window: int) -> Set[int]:
+    """Rightmost minimum hash of every window of `window` consecutive hashes"""
+    if not hashes:
+        return set()
+    if len(hashes) <= window:
+        return {min(hashes)}
+    selected = set()
+    candidates: deque = deque()  # indexes with increasing hashes
+    for i, value in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1:
+            selected.add(hashes[candidates[0]])
+    return selected
+
+
+def fingerprint(blocks: Iterable[Tuple[str, str]], k: int = 5, window: int = 4) -> Set[int]:
+    """Fingerprints of (language, code) blocks; other languages and blocks under k tokens are ignored"""
+    fingerprints: Set[int] = set()
+    for language, code in blocks:
+        if language not in _TOKEN_RES or not code:
+            continue
+        tokens = tokenize(code, language)
+        if len(tokens) >= k:
+            fingerprints |= winnow(kgram_hashes(tokens, k), window)
+    return fingerprints
+
+
+class FingerprintIndex:
+    """Fingerprint -> tips containing it, and the reverse"""
+
+    def __init__(self, k: int = 5, window: int = 4):
+        self.k = k
+        self.window = window
+        self.fingerprints: Dict[Hashable, Set[int]] = {}
+        self.postings: Dict[int, List[Hashable]] = defaultdict(list)
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[Hashable, Iterable[Tuple[str, str]]]],
+              k: int = 5, window: int = 4) -> 'FingerprintIndex':
+        """Index (key, code blocks) pairs in one pass"""
+        index = cls(k, window)
+        for key, blocks in items:
+            index.add(key, blocks)
+        return index
+
+    def add(self, key: Hashable, blocks: Iterable[Tuple[str, str]]):
+        fingerprints = fingerprint(blocks, self.k, self.window)
+        if not fingerprints:
+            return
+        self.fingerprints[key] = fingerprints
+        for value in fingerprints:
+            self.postings[value].append(key)
+
+    def shared_code(self, min_similarity: float = 0.5, min_shared: int = 2, max_postings: int = 50,
+                    involving: Optional[Set[Hashable]] = None) -> List[Tuple[Hashable, Hashable, float, int]]:
+        """
+        Pairs of tips sharing code, as (key1, key2, similarity, shared fingerprints).
+
+        similarity is containment: shared fingerprints over those of the tip
+        with less code, so a snippet copied into a longer tip still scores 1.0.
+        With `involving`, only pairs with at least one of those tips are counted.
+        """
+        shared: Counter = Counter()
+        for keys in self.postings.values():
+            if len(keys) < 2 or len(keys) > max_postings:
+                continue
+            for a, b in combinations(keys, 2):
+                if involving is None or a in involving or b in involving:
+                    shared[(a, b)] += 1
+
+        pairs = []
+        for (a, b), count in shared.items():
+            if count < min_shared:
+                continue
+            similarity = count / min(len(self.fingerprints[a]), len(self.fingerprints[b]))
+            if similarity >= min_similarity:
+                pairs.append((a, b, similarity, count))
+        pairs.sort(key=lambda pair: (-pair[2], -pair[3]))
+        return pairs
+
+
+if __name__ == '__main__':
+    import argparse
+    from pathlib import Path
+
+    from tip_corpus import code_blocks, load_corpus
+
+    parser = argparse.ArgumentParser(description='Find tips that share code, by winnowed k-gram fingerprints')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--k', type=int, default=5,
+                        help='Tokens per k-gram')
+    parser.add_argument('--window', type=int, default=4,
+                        help='Winnowing window (k-grams)')
+    parser.add_argument('--min-similarity', type=float, default=0.5,
+                        help='Minimum share of the smaller tip\'s fingerprints in common')
+    parser.add_argument('--top', type=int, default=20,
+                        help='Number of pairs to list')
+
+    args = parser.parse_args()
+
+    tips = load_corpus(args.data_dir)
+    index = FingerprintIndex.build(((i, code_blocks(tip.description)) for i, tip in enumerate(tips)),
+                                   args.k, args.window)
+    pairs = index.shared_code(args.min_similarity)
+    cross_file = sum(1 for a, b, _, _ in pairs if tips[a].file != tips[b].file)
+
+    print(f"✓ {len(index.postings)} fingerprints from {len(index.fingerprints)} tips with code")
+    print(f"✓ {len(pairs)} pairs share code ({cross_file} across files, "
+          f"similarity >= {args.min_similarity})")
+    for a, b, similarity, count in pairs[:args.top]:
+        print(f"\n  {similarity:.2f} ({count} shared)")
+        print(f"    {tips[a].tip_id}  {tips[a].file}  {tips[a].title}")
+        print(f"    {tips[b].tip_id}  {tips[b].file}  {tips[b].title}")
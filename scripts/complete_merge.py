@@ -2,12 +2,42 @@
 """
 Complete merge script that handles all files, including renaming related files
 and copying unpaired files.
+
+Runs in-process as a streaming pipeline over parsed tip records, one job per
+output file:
+
+1. Rename mapping: extracted_tips/ names are mapped onto data/ names
+   (autocmds.md -> autocommands.md, ...) without touching the sources
+2. Format conversion: extracted tips ("## Title" format) become
+   "# Title:" records
+3. Pairing: files present in both directories are merged, the others are
+   copied (data/) or converted (extracted_tips/)
+4. Merging: the data/ file verbatim, then extracted tips whose title is new
+
+A manifest records each output's source hashes and counts, so a re-run only
+reprocesses outputs whose sources changed. Jobs run in parallel and every
+count in the summary comes from the parsed records.
 """
 
+import hashlib
+import json
 import os
+import re
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+
+# Bump when the merge output for unchanged sources would differ
+MERGE_VERSION = 1
+
+_SEPARATOR_RE = re.compile(r'^\*\*\*[ \t]*$', re.MULTILINE)
+_HEADING_RE = re.compile(r'^## +(.+?)\s*$', re.MULTILINE)
+_META_RE = re.compile(r'^\s*(?:\*\*)?(Category|Tags):(?:\*\*)?\s*(.*?)\s*$', re.IGNORECASE)
+
 
 def identify_related_files() -> Dict[str, str]:
     """
@@ -29,175 +59,312 @@ def identify_related_files() -> Dict[str, str]:
     return related_files
 
 
-def rename_extracted_files(extracted_dir: Path, rename_map: Dict[str, str]):
-    """Rename files in extracted_tips/ to match data/ filenames"""
-
-    print("\n" + "="*80)
-    print("STEP 1: Renaming related files in extracted_tips/")
-    print("="*80)
-
-    for old_name, new_name in rename_map.items():
-        old_path = extracted_dir / old_name
-        new_path = extracted_dir / new_name
-
-        if not old_path.exists():
-            print(f"  ⚠️  {old_name} not found, skipping")
+@dataclass
+class MergeTip:
+    """One tip record flowing through the merge"""
+    title: str
+    category: str = ''
+    tags: List[str] = field(default_factory=list)
+    body: str = ''
+    raw: Optional[str] = None  # original "# Title:" block, written back verbatim
+
+    def to_markdown(self) -> str:
+        if self.raw is not None:
+            return self.raw + '\n***\n'
+        # No trailing space on an empty field
+        header = [f"# Title: {self.title}", f"# Category: {self.category}", f"# Tags: {', '.join(self.tags)}"]
+        return '\n'.join(line.rstrip() for line in header) + f"\n---\n{self.body}\n***\n"
+
+
+def parse_old_format(content: str) -> Iterator[MergeTip]:
+    """Tips from the data/ format ('# Title:' headers, '***' separators)"""
+    for block in _SEPARATOR_RE.split(content):
+        block = block.strip('\n')
+        lines = block.split('\n')
+        fields = {}
+        body_start = None
+        for i, line in enumerate(lines):
+            if line.strip() == '---':
+                body_start = i + 1
+                break
+            for key in ('Title', 'Category', 'Tags'):
+                if line.startswith(f'# {key}:') and key not in fields:
+                    fields[key] = line.split(':', 1)[1].strip()
+        if 'Title' not in fields:
             continue
+        body = '\n'.join(lines[body_start:]).strip() if body_start is not None else ''
+        tags = [t.strip() for t in fields.get('Tags', '').split(',') if t.strip()]
+        yield MergeTip(fields['Title'], fields.get('Category', ''), tags, body, raw=block)
 
-        if new_path.exists():
-            print(f"  ⚠️  {new_name} already exists in extracted_tips/, skipping rename")
-            continue
-
-        # Count tips before rename
-        content = old_path.read_text()
-        tip_count = content.count('\n## ')
-
-        print(f"  ✓ Renaming: {old_name} → {new_name} ({tip_count} tips)")
-        old_path.rename(new_path)
-
-
-def copy_unpaired_files(data_dir: Path, extracted_dir: Path, merged_dir: Path):
-    """Copy files that exist only in data/ directly to merged_tips/"""
-
-    print("\n" + "="*80)
-    print("STEP 2: Copying unpaired files from data/")
-    print("="*80)
-
-    data_files = set(f.name for f in data_dir.glob('*.md'))
-    extracted_files = set(f.name for f in extracted_dir.glob('*.md'))
-
-    # Files only in data/ (no pair in extracted_tips/)
-    unpaired = data_files - extracted_files
-
-    print(f"\nFound {len(unpaired)} files only in data/ (will copy as-is)")
 
-    for filename in sorted(unpaired):
-        src = data_dir / filename
-        dst = merged_dir / filename
-
-        tip_count = src.read_text().count('\n# Title:')
-        print(f"  ✓ Copying: {filename} ({tip_count} tips)")
-        shutil.copy2(src, dst)
-
-
-def convert_and_copy_extracted_only(extracted_dir: Path, data_dir: Path, merged_dir: Path):
-    """Convert and copy files that exist only in extracted_tips/"""
-
-    print("\n" + "="*80)
-    print("STEP 3: Converting and copying unpaired files from extracted_tips/")
-    print("="*80)
+def parse_new_format(content: str, file_name: str) -> Iterator[MergeTip]:
+    """
+    Tips from the extracted_tips/ format: a '## Title' heading per tip,
+    optional 'Category:'/'Tags:' lines (plain or bold) right after it, then
+    the body up to the next heading.
+    """
+    default_category = Path(file_name).stem.replace('_', ' ').replace('-', ' ').title()
+    headings = list(_HEADING_RE.finditer(content))
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        lines = content[heading.end():end].strip('\n').split('\n')
+        meta = {}
+        while lines:
+            match = _META_RE.match(lines[0])
+            if not match:
+                break
+            meta[match.group(1).lower()] = match.group(2)
+            lines.pop(0)
+        body = _SEPARATOR_RE.sub('', '\n'.join(lines)).strip()
+        tags = [t.strip() for t in meta.get('tags', '').split(',') if t.strip()]
+        yield MergeTip(heading.group(1), meta.get('category') or default_category, tags, body)
+
+
+def parse_extracted(content: str, file_name: str) -> List[MergeTip]:
+    """Convert an extracted_tips/ file, with merge_tips' parser when it is available"""
+    try:
+        from merge_tips import TipParser
+    except ImportError:
+        return list(parse_new_format(content, file_name))
+    tips = TipParser().parse_new_format(content, file_name)
+    return [tip for t in tips for tip in parse_old_format(t.to_markdown())]
+
+
+def merge_records(primary: Iterable[MergeTip], secondary: Iterable[MergeTip],
+                  stats: Dict[str, int]) -> Iterator[MergeTip]:
+    """Stream the secondary tips whose title isn't among the primary ones (or earlier secondaries)"""
+    seen = set()
+    for tip in primary:
+        seen.add(tip.title.casefold())
+        stats['kept'] += 1
+    for tip in secondary:
+        key = tip.title.casefold()
+        if key in seen:
+            stats['skipped_duplicates'] += 1
+            continue
+        seen.add(key)
+        stats['added'] += 1
+        yield tip
+
+
+@dataclass
+class MergeJob:
+    """One output file and the sources it is built from"""
+    name: str
+    data_path: Optional[Path]
+    extracted_path: Optional[Path]
+    output_path: Path
+
+    @property
+    def kind(self) -> str:
+        if self.data_path and self.extracted_path:
+            return 'merged'
+        return 'copied' if self.data_path else 'converted'
+
+    def source_hashes(self) -> Dict[str, Optional[str]]:
+        return {'data': file_digest(self.data_path), 'extracted': file_digest(self.extracted_path),
+                'version': MERGE_VERSION}
+
+
+def file_digest(path: Optional[Path]) -> Optional[str]:
+    """SHA-1 of a file, or None if there is no such file"""
+    return hashlib.sha1(path.read_bytes()).hexdigest() if path and path.exists() else None
+
+
+def run_job(job: MergeJob) -> Dict:
+    """Parse, convert, pair and merge one output file, returning its record counts"""
+    stats = {'kept': 0, 'added': 0, 'skipped_duplicates': 0}
+    data_text = ''
+    data_tips: List[MergeTip] = []
+    extracted_tips: List[MergeTip] = []
+
+    if job.data_path:
+        data_text = job.data_path.read_text(encoding='utf-8')
+        data_tips = list(parse_old_format(data_text))
+    if job.extracted_path:
+        extracted_tips = parse_extracted(job.extracted_path.read_text(encoding='utf-8'), job.extracted_path.name)
+        # Extracted tips without a category of their own join the data file's category
+        if data_tips and data_tips[0].category:
+            default = Path(job.extracted_path.name).stem.replace('_', ' ').replace('-', ' ').title()
+            for tip in extracted_tips:
+                if tip.category == default:
+                    tip.category = data_tips[0].category
+
+    result = {'file': job.name, 'kind': job.kind, 'data_tips': len(data_tips),
+              'extracted_tips': len(extracted_tips)}
+
+    if job.kind == 'converted' and not extracted_tips:
+        # Empty extracted files produce no output
+        result.update(stats, tips=0, written=False)
+        return result
+
+    if job.kind == 'copied':
+        shutil.copy2(job.data_path, job.output_path)
+        stats['kept'] = len(data_tips)
+    else:
+        with open(job.output_path, 'w', encoding='utf-8') as f:
+            # The data/ file goes through verbatim, new tips are appended
+            if data_text:
+                f.write(data_text if data_text.endswith('\n') else data_text + '\n')
+            for tip in merge_records(data_tips, extracted_tips, stats):
+                f.write(tip.to_markdown())
 
-    data_files = set(f.name for f in data_dir.glob('*.md'))
-    extracted_files = set(f.name for f in extracted_dir.glob('*.md'))
+    result.update(stats, tips=stats['kept'] + stats['added'], written=True)
+    return result
 
-    # Files only in extracted_tips/ (no pair in data/)
-    unpaired = extracted_files - data_files
 
-    # Filter out empty files
-    non_empty_unpaired = []
-    for filename in unpaired:
-        content = (extracted_dir / filename).read_text()
-        tip_count = content.count('\n## ')
-        if tip_count > 0:
-            non_empty_unpaired.append((filename, tip_count))
+def plan_jobs(data_dir: Path, extracted_dir: Path, merged_dir: Path,
+              rename_map: Dict[str, str]) -> List[MergeJob]:
+    """Pair data/ and extracted_tips/ files under their output names"""
+    data_files = {p.name: p for p in data_dir.glob('*.md')}
+    extracted_files = {p.name: p for p in extracted_dir.glob('*.md')} if extracted_dir.exists() else {}
 
-    if not non_empty_unpaired:
-        print("\n  No unpaired files with tips in extracted_tips/")
-        return
+    mapped: Dict[str, Path] = {}
+    for name, path in sorted(extracted_files.items()):
+        target = rename_map.get(name, name)
+        if target != name and target in extracted_files:
+            print(f"  ⚠️  {target} already exists in extracted_tips/, not mapping {name}")
+            target = name
+        mapped[target] = path
 
-    print(f"\nFound {len(non_empty_unpaired)} non-empty files only in extracted_tips/")
+    return [MergeJob(name, data_files.get(name), mapped.get(name), merged_dir / name)
+            for name in sorted(set(data_files) | set(mapped))]
 
-    # These need to be converted from new format to old format
-    # We'll do this by parsing and converting
-    from merge_tips import TipParser
 
-    for filename, tip_count in sorted(non_empty_unpaired):
-        src = extracted_dir / filename
-        dst = merged_dir / filename
+def load_manifest(path: Path) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('files', {})
 
-        print(f"  ✓ Converting: {filename} ({tip_count} tips)")
 
-        # Parse new format
-        content = src.read_text()
-        parser = TipParser()
-        tips = parser.parse_new_format(content, filename)
+def write_manifest(path: Path, entries: Dict[str, Dict]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MERGE_VERSION, 'files': entries}, f, indent=2, sort_keys=True)
 
-        # Write in old format
-        with open(dst, 'w') as f:
-            for tip in tips:
-                f.write(tip.to_markdown())
 
+def complete_merge(data_dir: Path, extracted_dir: Path, merged_dir: Path, manifest_path: Path,
+                   workers: int = 1, full: bool = False,
+                   metrics: Optional[Metrics] = None) -> List[Dict]:
+    """Merge into merged_dir, reprocessing only outputs whose sources changed"""
+    metrics = metrics or Metrics('complete_merge')
+    merged_dir.mkdir(parents=True, exist_ok=True)
 
-def main():
+    with metrics.stage('plan'):
+        jobs = plan_jobs(data_dir, extracted_dir, merged_dir, identify_related_files())
+        previous = {} if full else load_manifest(manifest_path)
+        hashes = {job.name: job.source_hashes() for job in jobs}
+
+    pending, results = [], {}
+    for job in jobs:
+        entry = previous.get(job.name)
+        # An output edited since the merge (e.g. by applying dedup results) is merged again
+        output_ok = entry is not None and (not entry['result']['written']
+                                           or entry.get('output') == file_digest(job.output_path))
+        if entry and entry['sources'] == hashes[job.name] and output_ok:
+            results[job.name] = dict(entry['result'], reused=True)
+        else:
+            pending.append(job)
+    print(f"\n{len(pending)} of {len(jobs)} output files need processing "
+          f"({len(jobs) - len(pending)} unchanged since the last merge)")
+
+    with metrics.stage('merge'):
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for result in pool.map(run_job, pending):
+                    results[result['file']] = result
+        else:
+            for job in pending:
+                results[job.name] = run_job(job)
+
+    for job in pending:
+        result = results[job.name]
+        if result['written']:
+            print(f"  ✓ {result['kind'].capitalize()}: {job.name} ({result['tips']} tips"
+                  + (f", +{result['added']} from extracted_tips/, "
+                     f"{result['skipped_duplicates']} duplicate titles skipped" if job.kind == 'merged' else '')
+                  + ")")
+        else:
+            print(f"  - Skipped empty: {job.name}")
+
+    # Outputs whose sources are gone
+    expected = {name for name, result in results.items() if result['written']}
+    for stale in merged_dir.glob('*.md'):
+        if stale.name not in expected:
+            stale.unlink()
+            print(f"  ✗ Removed stale output: {stale.name}")
+
+    write_manifest(manifest_path, {
+        job.name: {'sources': hashes[job.name],
+                   'output': file_digest(job.output_path) if results[job.name]['written'] else None,
+                   'result': {k: v for k, v in results[job.name].items() if k != 'reused'}}
+        for job in jobs
+    })
+
+    ordered = [results[job.name] for job in jobs]
+    for key in ('tips', 'data_tips', 'extracted_tips', 'added', 'skipped_duplicates'):
+        metrics.count(key, sum(r[key] for r in ordered))
+    metrics.count('files', sum(1 for r in ordered if r['written']))
+    metrics.count('reprocessed', len(pending))
+    return ordered
+
+
+def main(metrics: Optional[Metrics] = None, data_dir: Path = Path('data'),
+         extracted_dir: Path = Path('scripts/extracted_tips'), merged_dir: Path = Path('scripts/merged_tips'),
+         manifest_path: Path = Path('scripts/merge_manifest.json'), workers: int = 1, full: bool = False):
     """Main function"""
-
-    data_dir = Path('data')
-    extracted_dir = Path('scripts/extracted_tips')
-    merged_dir = Path('scripts/merged_tips')
+    metrics = metrics or Metrics('complete_merge')
 
     print("="*80)
     print("COMPLETE MERGE - All Files")
     print("="*80)
     print(f"\nSource directories:")
-    print(f"  data/: {len(list(data_dir.glob('*.md')))} files")
-    print(f"  extracted_tips/: {len(list(extracted_dir.glob('*.md')))} files")
-
-    # Clean merged_tips directory
-    print(f"\nCleaning merged_tips/ directory...")
-    if merged_dir.exists():
-        shutil.rmtree(merged_dir)
-    merged_dir.mkdir(parents=True, exist_ok=True)
-
-    # Step 1: Rename related files
-    rename_map = identify_related_files()
-    rename_extracted_files(extracted_dir, rename_map)
-
-    # Step 2: Copy unpaired data/ files
-    copy_unpaired_files(data_dir, extracted_dir, merged_dir)
+    print(f"  {data_dir}/: {len(list(data_dir.glob('*.md')))} files")
+    print(f"  {extracted_dir}/: {len(list(extracted_dir.glob('*.md')))} files")
 
-    # Step 3: Convert and copy unpaired extracted_tips/ files
-    convert_and_copy_extracted_only(extracted_dir, data_dir, merged_dir)
+    results = complete_merge(data_dir, extracted_dir, merged_dir, manifest_path, workers, full, metrics)
 
-    # Step 4: Run merge script on matched pairs
-    print("\n" + "="*80)
-    print("STEP 4: Running merge script on all matching file pairs")
-    print("="*80)
-    print("\nThis will take 10-15 minutes...")
-    print("(The merge script will handle files that exist in BOTH directories)\n")
-
-    # Import and run the merge
-    import subprocess
-    result = subprocess.run(
-        ['python', 'scripts/merge_tips.py'],
-        capture_output=True,
-        text=True
-    )
-
-    # Print merge output
-    print(result.stdout)
-    if result.stderr:
-        print("STDERR:", result.stderr)
-
-    # Final summary
+    # Final summary, from the merge records
     print("\n" + "="*80)
     print("COMPLETE MERGE SUMMARY")
     print("="*80)
 
-    total_files = len(list(merged_dir.glob('*.md')))
-    total_tips = 0
-
-    for file in merged_dir.glob('*.md'):
-        content = file.read_text()
-        tips = content.count('\n# Title:')
-        total_tips += tips
-
-    print(f"\nFinal result in scripts/merged_tips/:")
-    print(f"  Total files: {total_files}")
-    print(f"  Total tips: {total_tips}")
-    print(f"\nOriginal data/ had: {len(list(data_dir.glob('*.md')))} files")
-    print(f"Original extracted_tips/ had: {len(list(extracted_dir.glob('*.md')))} files")
+    written = [r for r in results if r['written']]
+    by_kind = {kind: sum(1 for r in written if r['kind'] == kind) for kind in ('merged', 'copied', 'converted')}
+    print(f"\nFinal result in {merged_dir}/:")
+    print(f"  Total files: {len(written)} ({by_kind['merged']} merged, {by_kind['copied']} copied, "
+          f"{by_kind['converted']} converted)")
+    print(f"  Total tips: {sum(r['tips'] for r in written)}")
+    print(f"  Added from extracted_tips/: {sum(r['added'] for r in written)} "
+          f"({sum(r['skipped_duplicates'] for r in written)} duplicate titles skipped)")
+    print(f"\nOriginal {data_dir}/ had: {sum(1 for r in results if r['kind'] != 'converted')} files, "
+          f"{sum(r['data_tips'] for r in results)} tips")
+    print(f"Original {extracted_dir}/ had: {sum(1 for r in results if r['kind'] != 'copied')} files, "
+          f"{sum(r['extracted_tips'] for r in results)} tips")
     print(f"\n✓ Complete merge finished!")
 
+    metrics.write()
+
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Merge data/ and extracted_tips/ into merged_tips/')
+    parser.add_argument('--target-dir', type=Path, default=Path('data'),
+                        help='Existing tips (data/ format)')
+    parser.add_argument('--source-dir', type=Path, default=Path('scripts/extracted_tips'),
+                        help='New tips to merge in (extracted "## Title" format)')
+    parser.add_argument('--output-dir', type=Path, default=Path('scripts/merged_tips'),
+                        help='Directory for merged files')
+    parser.add_argument('--manifest', type=Path, default=Path('scripts/merge_manifest.json'),
+                        help='Source hashes and counts from the last merge')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Parallel merge processes (0 = one per CPU core)')
+    parser.add_argument('--full', action='store_true',
+                        help='Reprocess every file, ignoring the manifest')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+
+    main(Metrics.from_args('complete_merge', args), args.target_dir, args.source_dir, args.output_dir,
+         args.manifest, args.workers if args.workers > 0 else (os.cpu_count() or 1), args.full)
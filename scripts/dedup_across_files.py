@@ -9,6 +9,9 @@ from pathlib import Path
 from typing import Dict, List
 from collections import defaultdict
 
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import tip_identity
+
 class Tip:
     def __init__(self, title: str, content: str, file_path: Path, start_line: int):
         self.title = title
@@ -17,6 +20,7 @@ class Tip:
         self.start_line = start_line
         self.category = self._extract_category()
         self.tags = self._extract_tags()
+        self.tip_id, self.alias = tip_identity(content)
 
     def _extract_category(self) -> str:
         match = re.search(r'# Category:\s*(.+)', self.content)
@@ -168,12 +172,12 @@ def remove_duplicates(data_dir: Path, dry_run: bool = False):
 
         # Keep the first (best), mark others for removal
         keeper = tips[0]
-        print(f"   ✓ KEEP: {keeper.file_path.name}:{keeper.start_line}")
+        print(f"   ✓ KEEP: {keeper.file_path.name}:{keeper.start_line} [{keeper.tip_id}]")
         print(f"      Score: {keeper.get_score()}, Vim: {'✓' if keeper.has_vimscript() else '✗'}, Lua: {'✓' if keeper.has_lua() else '✗'}")
 
         for tip in tips[1:]:
             reason = keeper.get_decision_reason(tip)
-            print(f"   ✗ REMOVE: {tip.file_path.name}:{tip.start_line}")
+            print(f"   ✗ REMOVE: {tip.file_path.name}:{tip.start_line} [{tip.tip_id}]")
             print(f"      Score: {tip.get_score()}, Vim: {'✓' if tip.has_vimscript() else '✗'}, Lua: {'✓' if tip.has_lua() else '✗'}")
             print(f"      Reason: {reason}")
             tips_to_remove.append(tip)
@@ -231,7 +235,11 @@ if __name__ == '__main__':
                         help='Directory containing tip files')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be removed without actually removing')
+    add_metrics_arguments(parser)
 
     args = parser.parse_args()
+    metrics = Metrics.from_args('dedup_across_files', args)
 
-    remove_duplicates(args.data_dir, dry_run=args.dry_run)
+    with metrics.stage('remove_duplicates'):
+        remove_duplicates(args.data_dir, dry_run=args.dry_run)
+    metrics.write()
@@ -6,27 +6,85 @@ Stage 1: Use embeddings to find similar tips (fast, cheap/free)
 Stage 2: Use AI only to verify high-similarity pairs (expensive but selective)
 
 This reduces API costs by 90-95% compared to full AI comparison.
+
+With --source-groups, tips citing the same source page (see source_index.py)
+are verified first, across files and without any embeddings. --shared-code
+does the same for tips whose code blocks overlap (see code_fingerprints.py).
+Pairs already verified that way are not verified again when a later stage
+finds them.
+
+With --schedule (or a --budget-calls/--budget-tokens budget), the candidate
+pairs of all files are verified in order of expected yield until the budget
+or the yield runs out, and the threshold adapts to what verification finds
+(see verify_scheduler.py).
+
+--local-decisions settles clear duplicates and clear non-duplicates from
+embedding, title, code and tag similarity without an AI call, and logs how
+an audit sample of them compares with the AI (see local_decision.py).
+
+--blocking computes similarity only for tips that share a normalized tag,
+category, ex command, API function, option or key (see blocking.py);
+--blocking-report measures the pairs saved and the recall against the
+unblocked run.
 """
 
 import os
+import importlib
+import importlib.util
 import json
-import numpy as np
+import subprocess
+import sys
 from pathlib import Path
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
-from anthropic import Anthropic
-from dotenv import load_dotenv
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import TYPE_CHECKING, List, Dict, Optional, Set, Tuple
+from dataclasses import dataclass, field
 import time
 
-# Load environment variables
-load_dotenv('.env.scripts')
+from blocking import BlockIndex, blocking_keys
+from code_fingerprints import FingerprintIndex
+from dedup_report import ReportWriter
+from local_decision import Cutoffs, LocalDecider, decide
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from pipeline import Pipeline
+from source_index import SourceIndex
+from tip_corpus import tip_identity
+from verify_scheduler import VerifyScheduler
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy, scipy, sklearn, anthropic and the embedding model are loaded on first
+# use (see lazy_import), so runs that never embed or verify don't pay for them.
+# Mirrors quantized_embeddings.PRECISIONS without importing numpy for --help.
+PRECISION_CHOICES = ('float32', 'float16', 'int8')
+
+# Report entries holding the pairs found across files by corpus-wide indexes
+SOURCE_GROUPS_FILE = '(shared sources)'
+SHARED_CODE_FILE = '(shared code)'
+
+
+# Run-wide metrics; main() replaces it with one configured from the command line
+METRICS = Metrics('dedup_hybrid')
+
+
+def lazy_import(name: str):
+    """Import a heavy module the first time a stage needs it, timing the import"""
+    module = sys.modules.get(name)
+    if module is None:
+        with METRICS.stage(f'import {name}'):
+            module = importlib.import_module(name)
+    return module
+
+
+def is_sparse(matrix) -> bool:
+    """True for scipy sparse matrices (only the TF-IDF fallback loads scipy)"""
+    return 'scipy.sparse' in sys.modules and sys.modules['scipy.sparse'].issparse(matrix)
 
 
 @dataclass
 class Tip:
     """Represents a single tip"""
     id: str
+    alias: str
     title: str
     category: str
     tags: List[str]
@@ -47,6 +105,22 @@ class Tip:
         ]
         return ' '.join(parts)
 
+    def get_blocking_keys(self) -> Set[str]:
+        """Blocking keys from category, tags, prose and code (see blocking.py)"""
+        text = '\n'.join([self.title, self.explanation, self.vimscript, self.lua])
+        return blocking_keys(self.category, self.tags, text)
+
+
+@dataclass
+class FileWork:
+    """A file between the CPU stages and AI verification"""
+    file_path: Path
+    tips: List[Tip]
+    changed: Optional[List[int]] = None
+    similar_pairs: List[Tuple[int, int, float]] = field(default_factory=list)
+    pairs_filtered: int = 0
+    result: Optional[Dict] = None  # set when there is nothing to verify
+
 
 class TipParser:
     """Parse tips from merged files"""
@@ -54,13 +128,17 @@ class TipParser:
     @staticmethod
     def parse_file(file_path: Path) -> List[Tip]:
         """Parse tips from a file"""
-        content = file_path.read_text()
+        return TipParser.parse_content(file_path.read_text())
+
+    @staticmethod
+    def parse_content(content: str) -> List[Tip]:
+        """Parse tips from file content"""
         tips = []
 
         sections = content.split('***')
         line_offset = 1
 
-        for idx, section in enumerate(sections):
+        for section in sections:
             section = section.strip()
             if not section:
                 continue
@@ -112,8 +190,12 @@ class TipParser:
             vimscript = '\n'.join(vim_blocks).strip() if vim_blocks else ''
             lua = '\n'.join(lua_blocks).strip() if lua_blocks else ''
 
+            # Content-addressed id, stable across edits to other tips
+            tip_id, alias = tip_identity(section)
+
             tips.append(Tip(
-                id=f"tip_{idx}",
+                id=tip_id,
+                alias=alias,
                 title=title,
                 category=category,
                 tags=tags,
@@ -132,44 +214,106 @@ class TipParser:
 class EmbeddingGenerator:
     """Generate embeddings for tips using sentence-transformers (FREE)"""
 
-    def __init__(self):
-        try:
-            from sentence_transformers import SentenceTransformer
-            print("Loading sentence-transformers model (first time may download ~400MB)...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, workers: int = 1, batch_size: int = 64, tfidf_mode: str = 'fit'):
+        # Embeddings by stable tip id, so tips encoded up front aren't encoded again
+        self.cache: Dict[str, 'np.ndarray'] = {}
+        self.tfidf_mode = tfidf_mode
+        self.vectorizer = None
+
+        if importlib.util.find_spec('sentence_transformers') is not None:
+            # The model itself is loaded by the first prime()/generate_embeddings()
+            embedding_service = lazy_import('embedding_service')
+            self.service = embedding_service.EmbeddingService(
+                embedding_service.DEFAULT_MODEL, workers=workers, batch_size=batch_size)
             self.method = 'local'
             print("✓ Using local embeddings (FREE)")
-        except ImportError:
+        else:
             print("⚠️  sentence-transformers not installed")
             print("Install with: pip install sentence-transformers")
-            print("Falling back to simple TF-IDF...")
-            self.model = None
+            print(f"Falling back to sparse TF-IDF ({tfidf_mode})...")
+            self.service = None
             self.method = 'tfidf'
 
-    def generate_embeddings(self, tips: List[Tip]) -> np.ndarray:
+    def _load_model(self):
+        if self.service.warm:
+            return
+        if self.service.workers == 1:
+            print("Loading sentence-transformers model (first time may download ~400MB)...")
+            with METRICS.stage('model load'):
+                self.service.warm_up()
+        else:
+            # Workers load the model in their initializer, timed as part of encoding
+            print(f"Starting {self.service.workers} encoder processes (model loaded once per process)...")
+
+    def prime(self, tips: List[Tip]):
+        """Encode (or, for TF-IDF, fit on) tips from any number of files in one pass"""
+        if self.method == 'tfidf':
+            self._fit_tfidf(tips)
+            return
+        pending = list({tip.id: tip for tip in tips if tip.id not in self.cache}.values())
+        if not pending:
+            return
+        self._load_model()
+        print(f"  Encoding {len(pending)} tips in batches of {self.service.batch_size}...")
+        embeddings = self.service.encode([tip.get_text_for_embedding() for tip in pending])
+        for tip, embedding in zip(pending, embeddings):
+            self.cache[tip.id] = embedding
+        print(f"  ✓ {self.service.report()}")
+
+    def generate_embeddings(self, tips: List[Tip]) -> 'np.ndarray':
         """Generate embeddings for all tips"""
         texts = [tip.get_text_for_embedding() for tip in tips]
 
         if self.method == 'local':
             # Use sentence-transformers (FREE, runs locally)
-            embeddings = self.model.encode(texts, show_progress_bar=True)
-            return embeddings
+            self.prime(tips)
+            np = lazy_import('numpy')
+            return np.stack([self.cache[tip.id] for tip in tips])
 
         elif self.method == 'tfidf':
-            # Fallback: Simple TF-IDF (FREE, basic)
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            vectorizer = TfidfVectorizer(max_features=384)
-            embeddings = vectorizer.fit_transform(texts).toarray()
-            return embeddings
+            # Fallback: sparse TF-IDF with one vocabulary for the whole corpus (FREE, basic)
+            if self.vectorizer is None:
+                self._fit_tfidf(tips)
+            return self.vectorizer.transform(texts)
+
+    def _fit_tfidf(self, tips: List[Tip]):
+        """Build the corpus-wide vectorizer once (hashing mode needs no fit)"""
+        if self.vectorizer is not None:
+            return
+        if self.tfidf_mode == 'hashing':
+            text = lazy_import('sklearn.feature_extraction.text')
+            self.vectorizer = text.HashingVectorizer(n_features=2 ** 20, alternate_sign=False, norm='l2')
+        else:
+            text = lazy_import('sklearn.feature_extraction.text')
+            self.vectorizer = text.TfidfVectorizer(sublinear_tf=True)
+            self.vectorizer.fit([tip.get_text_for_embedding() for tip in tips])
+            print(f"  ✓ Fitted TF-IDF on {len(tips)} tips ({len(self.vectorizer.vocabulary_):,} terms)")
+
+    def close(self):
+        if self.service is not None:
+            self.service.close()
 
 
 class HybridDeduplicator:
     """Hybrid deduplication: embeddings + AI verification"""
 
-    def __init__(self, similarity_threshold: float = 0.7):
+    def __init__(self, similarity_threshold: float = 0.7, precision: str = 'float32',
+                 workers: int = 1, batch_size: int = 64, tfidf_mode: str = 'fit',
+                 blocking: bool = False, max_block_share: float = 0.1):
         self.similarity_threshold = similarity_threshold
-        self.embedding_gen = EmbeddingGenerator()
-        self.client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        self.precision = precision
+        self.workers = workers
+        self.batch_size = batch_size
+        self.tfidf_mode = tfidf_mode
+        self.blocking = blocking
+        self.max_block_share = max_block_share
+
+        # Created by the first stage that needs them
+        self._embedding_gen: Optional[EmbeddingGenerator] = None
+        self._client = None
+
+        # JSONL report that verified pairs are streamed to, if any
+        self.report: Optional[ReportWriter] = None
 
         # Cost tracking
         self.total_input_tokens = 0
@@ -177,31 +321,103 @@ class HybridDeduplicator:
         self.total_calls = 0
         self.pairs_filtered = 0
         self.pairs_verified = 0
-
-    def find_similar_pairs(self, tips: List[Tip]) -> List[Tuple[int, int, float]]:
-        """Find similar tip pairs using embeddings"""
+        # Pairs an unblocked run would compare, and those sharing a blocking key
+        self.blocking_stats = {'pairs': 0, 'compared': 0}
+
+        # Unordered tip id pairs already verified (by the source-group stage)
+        self.verified_pairs: Set[Tuple[str, str]] = set()
+
+        # Settles clear-cut pairs without an AI call, if enabled
+        self.local: Optional[LocalDecider] = None
+
+    @property
+    def embedding_gen(self) -> EmbeddingGenerator:
+        if self._embedding_gen is None:
+            self._embedding_gen = EmbeddingGenerator(workers=self.workers, batch_size=self.batch_size,
+                                                     tfidf_mode=self.tfidf_mode)
+        return self._embedding_gen
+
+    @property
+    def client(self):
+        if self._client is None:
+            lazy_import('dotenv').load_dotenv('.env.scripts')
+            anthropic = lazy_import('anthropic')
+            self._client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        return self._client
+
+    def close(self):
+        if self._embedding_gen is not None:
+            self._embedding_gen.close()
+
+    def find_similar_pairs(self, tips: List[Tip],
+                           changed: Optional[List[int]] = None) -> List[Tuple[int, int, float]]:
+        """
+        Find similar tip pairs using embeddings.
+
+        With `changed` (delta mode), only pairs involving at least one of those
+        tip indexes are compared: O(changed x n) instead of O(n^2).
+        """
         print(f"\n  Generating embeddings for {len(tips)} tips...")
-        embeddings = self.embedding_gen.generate_embeddings(tips)
-
-        print(f"  Calculating cosine similarity...")
-        similarity_matrix = cosine_similarity(embeddings)
-
-        # Find pairs above threshold
+        with METRICS.stage('embed'):
+            embeddings = self.embedding_gen.generate_embeddings(tips)
+        with METRICS.stage('similarity'):
+            return self._similar_pairs(tips, embeddings, changed)
+
+    def _similar_pairs(self, tips: List[Tip], embeddings,
+                       changed: Optional[List[int]]) -> List[Tuple[int, int, float]]:
+        """Pairs at or above the threshold, from already generated embeddings"""
+        rows = list(range(len(tips))) if changed is None else changed
+        scope = '' if changed is None else f" for {len(changed)} changed tips"
+
+        if self.blocking:
+            print(f"  Calculating cosine similarity within blocks{scope}...")
+            position = {i: row for row, i in enumerate(rows)}
+            candidates = [(position[i], j, similarity) if i in position else (position[j], i, similarity)
+                          for i, j, similarity in self._blocked_similarities(tips, embeddings, changed)]
+        elif is_sparse(embeddings):
+            # TF-IDF rows are L2-normalized: cosine is a sparse dot product
+            print(f"  Calculating sparse cosine similarity{scope}...")
+            similarity_rows = (embeddings[rows] @ embeddings.T).tocoo()
+            hits = similarity_rows.data >= self.similarity_threshold
+            candidates = zip(similarity_rows.row[hits], similarity_rows.col[hits],
+                             similarity_rows.data[hits])
+        else:
+            print(f"  Calculating cosine similarity{scope} ({self.precision})...")
+            quantized = lazy_import('quantized_embeddings')
+            candidates = zip(*quantized.QuantizedEmbeddings.from_embeddings(
+                embeddings, self.precision).similar(self.similarity_threshold, rows))
+
+        # Keep each unordered pair once: pairs of two compared rows only from the lower index
+        row_set = set(rows)
         similar_pairs = []
-        for i in range(len(tips)):
-            for j in range(i + 1, len(tips)):
-                similarity = similarity_matrix[i][j]
-                if similarity >= self.similarity_threshold:
-                    similar_pairs.append((i, j, similarity))
+        for row, j, similarity in candidates:
+            i = rows[row]
+            if j == i or (j in row_set and j < i):
+                continue
+            similar_pairs.append((min(i, j), int(max(i, j)), float(similarity)))
 
         # Sort by similarity (highest first)
         similar_pairs.sort(key=lambda x: x[2], reverse=True)
 
         print(f"  Found {len(similar_pairs)} similar pairs (threshold: {self.similarity_threshold})")
-        self.pairs_filtered = len(tips) * (len(tips) - 1) // 2 - len(similar_pairs)
+        compared = len(rows) * (len(tips) - len(rows)) + len(rows) * (len(rows) - 1) // 2
+        self.pairs_filtered = compared - len(similar_pairs)
 
         return similar_pairs
 
+    def _blocked_similarities(self, tips: List[Tip], embeddings,
+                              changed: Optional[List[int]]) -> List[Tuple[int, int, float]]:
+        """(i, j, similarity) at or above the threshold, computed only for pairs sharing a block"""
+        index = BlockIndex([tip.get_blocking_keys() for tip in tips], self.max_block_share)
+        pairs = sorted(index.candidate_pairs(changed))
+        self.blocking_stats['pairs'] += index.all_pairs(changed)
+        self.blocking_stats['compared'] += len(pairs)
+        if not pairs:
+            return []
+        similarities = pair_similarities(embeddings, pairs, self.precision)
+        return [(i, j, float(similarity)) for (i, j), similarity in zip(pairs, similarities)
+                if similarity >= self.similarity_threshold]
+
     def verify_with_ai(self, tip1: Tip, tip2: Tip) -> Dict:
         """Verify similarity using AI"""
         prompt = f"""Compare these two tips and determine their relationship:
@@ -258,41 +474,215 @@ Return JSON only:
                 "recommendation": "keep_both"
             }
 
-    def process_file(self, file_path: Path) -> Dict:
-        """Process a single file"""
+    def verify_pair(self, tip1: Tip, tip2: Tip, cosine: Optional[float] = None) -> Dict:
+        """
+        verify_with_ai, with both tips identified in the result.
+
+        With a local decision tier, clear-cut pairs are decided without the
+        AI (the result has 'decided_by': 'local'), except for an audit sample
+        whose AI verdict is logged against the local one.
+        """
+        result = None
+        if self.local is not None:
+            signals = self.local.signals(tip1, tip2, cosine)
+            local = decide(signals, self.local.cutoffs)
+            if local is not None and not self.local.should_audit(tip1, tip2):
+                result = self.local.local_result(local, signals)
+        if result is None:
+            calls_before = self.total_calls
+            with METRICS.stage('verify'):
+                result = self.verify_with_ai(tip1, tip2)
+            if self.local is not None and self.total_calls > calls_before:
+                self.local.record(tip1, tip2, signals, local, result)
+        result['tip1_id'] = tip1.id
+        result['tip2_id'] = tip2.id
+        result['tip1_alias'] = tip1.alias
+        result['tip2_alias'] = tip2.alias
+        result['tip1_title'] = tip1.title
+        result['tip2_title'] = tip2.title
+        result['tip1_line'] = tip1.line_number
+        result['tip2_line'] = tip2.line_number
+        self.verified_pairs.add(pair_key(tip1, tip2))
+        return result
+
+    def verify_corpus_pairs(self, name: str, located: Dict[Tuple[Path, int], Tip],
+                            candidates: List[Tuple[Tuple[Path, int], Tuple[Path, int], Dict]]) -> Dict:
+        """
+        Verify candidate pairs found across files by a corpus-wide index.
+
+        located maps (file, index) to tips; each candidate carries extra fields
+        for its report entry. Pairs already verified by an earlier stage are skipped.
+        """
+        candidates = [(key1, key2, extra) for key1, key2, extra in candidates
+                      if pair_key(located[key1], located[key2]) not in self.verified_pairs]
+        print(f"  Verifying {len(candidates)} pairs with AI {name}...")
+
+        duplicates = []
+        similar = []
+        for idx, (key1, key2, extra) in enumerate(candidates):
+            if (idx + 1) % 10 == 0:
+                print(f"    [{idx+1}/{len(candidates)}]")
+            result = self.verify_pair(located[key1], located[key2])
+            result['tip1_file'] = key1[0].name
+            result['tip2_file'] = key2[0].name
+            result.update(extra)
+            result['cosine_similarity'] = None
+
+            if result['relationship'] == 'duplicate':
+                duplicates.append(result)
+            elif result['relationship'] == 'similar':
+                similar.append(result)
+            if self.report is not None and result['relationship'] in ('duplicate', 'similar'):
+                self.report.write_pair(name, result)
+
+            if result.get('decided_by') != 'local':
+                time.sleep(0.2)  # Small delay
+
+        print(f"\n  Results {name}:")
+        print(f"    Duplicates: {len(duplicates)}")
+        print(f"    Similar: {len(similar)}")
+        print(f"    Different: {len(candidates) - len(duplicates) - len(similar)}")
+
+        return {
+            'file': name,
+            'pairs_verified': len(candidates),
+            'duplicates': duplicates,
+            'similar': similar,
+            'all_tips': []
+        }
+
+    def verify_source_groups(self, file_tips: Dict[Path, List[Tip]], baseline_for,
+                             max_group: Optional[int] = None) -> Dict:
+        """
+        Verify pairs of tips that cite the same source page, across all files.
+
+        Needs no embeddings: the candidates come from the canonical source-URL
+        index. In delta mode only pairs involving a new or changed tip are
+        verified. Groups larger than max_group (hub pages) are skipped.
+        """
+        print(f"\n{'='*80}")
+        print("Processing: tips sharing a source page")
+        print(f"{'='*80}")
+
+        located, changed = locate_tips(file_tips, baseline_for)
+        with METRICS.stage('source index'):
+            index = SourceIndex.build((key, tip.source) for key, tip in located.items())
+            candidates = [(key1, key2, {'source_url': url})
+                          for key1, key2, url in index.candidate_pairs(max_group, changed)]
+        groups = index.groups()
+        print(f"  {len(groups)} shared sources, {len(candidates)} candidate pairs")
+        METRICS.count('source_pairs', len(candidates))
+
+        result = self.verify_corpus_pairs(SOURCE_GROUPS_FILE, located, candidates)
+        return {'file': SOURCE_GROUPS_FILE,
+                'tips': len({key for keys in groups.values() for key in keys}),
+                'source_groups': len(groups),
+                **result}
+
+    def verify_shared_code(self, file_tips: Dict[Path, List[Tip]], baseline_for,
+                           min_similarity: float = 0.5) -> Dict:
+        """
+        Verify pairs of tips whose vim/lua code overlaps, across all files.
+
+        Candidates come from winnowed code fingerprints (code_fingerprints.py),
+        which see the whole code blocks rather than the first 200 characters
+        that go into the embeddings. In delta mode only pairs involving a new
+        or changed tip are verified.
+        """
+        print(f"\n{'='*80}")
+        print("Processing: tips sharing code")
+        print(f"{'='*80}")
+
+        located, changed = locate_tips(file_tips, baseline_for)
+        with METRICS.stage('code fingerprints'):
+            index = FingerprintIndex.build(
+                (key, [('vim', tip.vimscript), ('lua', tip.lua)]) for key, tip in located.items())
+            candidates = [(key1, key2, {'code_similarity': round(similarity, 4), 'shared_fingerprints': count})
+                          for key1, key2, similarity, count in index.shared_code(min_similarity, involving=changed)]
+        print(f"  {len(index.fingerprints)} tips with code, {len(candidates)} candidate pairs "
+              f"(code similarity >= {min_similarity})")
+        METRICS.count('shared_code_pairs', len(candidates))
+
+        result = self.verify_corpus_pairs(SHARED_CODE_FILE, located, candidates)
+        return {'file': SHARED_CODE_FILE,
+                'tips': len({key for key1, key2, _ in candidates for key in (key1, key2)}),
+                **result}
+
+    def prepare_file(self, file_path: Path, baseline_ids: Optional[Set[str]] = None,
+                     tips: Optional[List[Tip]] = None) -> FileWork:
+        """
+        CPU half of processing a file: parse, embed and find candidate pairs.
+
+        baseline_ids are the tip ids the file had in the previous run (delta
+        mode); only pairs involving a tip outside that set are verified.
+        tips, if given, are the file's already parsed tips.
+        """
         print(f"\n{'='*80}")
         print(f"Processing: {file_path.name}")
         print(f"{'='*80}")
 
         # Parse tips
-        parser = TipParser()
-        tips = parser.parse_file(file_path)
+        if tips is None:
+            with METRICS.stage('parse'):
+                tips = TipParser.parse_file(file_path)
         print(f"  Found {len(tips)} tips")
+        work = FileWork(file_path, tips)
+
+        if baseline_ids is not None:
+            work.changed = [i for i, tip in enumerate(tips) if tip.id not in baseline_ids]
+            print(f"  Delta: {len(work.changed)} new or changed tips")
+            if not work.changed:
+                work.result = {
+                    'file': file_path.name,
+                    'tips': len(tips),
+                    'changed_tips': 0,
+                    'duplicates': [],
+                    'similar': [],
+                    'all_tips': [{'id': t.id, 'alias': t.alias, 'title': t.title, 'line': t.line_number} for t in tips]
+                }
+                return work
 
         if len(tips) < 2:
-            return {
+            work.result = {
                 'file': file_path.name,
                 'tips': len(tips),
                 'duplicates': [],
                 'similar': [],
                 'all_tips': []
             }
+            return work
 
         # Stage 1: Find similar pairs using embeddings
-        similar_pairs = self.find_similar_pairs(tips)
-
-        if not similar_pairs:
+        work.similar_pairs = self.find_similar_pairs(tips, work.changed)
+        work.pairs_filtered = self.pairs_filtered
+        if self.verified_pairs:
+            before = len(work.similar_pairs)
+            work.similar_pairs = [(i, j, sim) for i, j, sim in work.similar_pairs
+                                  if pair_key(tips[i], tips[j]) not in self.verified_pairs]
+            if len(work.similar_pairs) < before:
+                print(f"  Skipping {before - len(work.similar_pairs)} pairs already verified by shared source")
+        METRICS.count('candidate_pairs', len(work.similar_pairs))
+
+        if not work.similar_pairs:
             print(f"  No similar pairs found - all tips are unique!")
-            return {
+            work.result = {
                 'file': file_path.name,
                 'tips': len(tips),
                 'duplicates': [],
                 'similar': [],
-                'all_tips': [{'id': t.id, 'title': t.title, 'line': t.line_number} for t in tips]
+                'all_tips': [{'id': t.id, 'alias': t.alias, 'title': t.title, 'line': t.line_number} for t in tips]
             }
+        return work
+
+    def verify_file(self, work: FileWork) -> Dict:
+        """I/O half of processing a file: verify its candidate pairs with AI"""
+        if work.result is not None:
+            return work.result
+
+        file_path, tips, similar_pairs = work.file_path, work.tips, work.similar_pairs
 
         # Stage 2: Verify with AI (only high-similarity pairs)
-        print(f"  Verifying {len(similar_pairs)} pairs with AI...")
+        print(f"  Verifying {len(similar_pairs)} pairs with AI ({file_path.name})...")
 
         duplicates = []
         similar = []
@@ -301,36 +691,107 @@ Return JSON only:
             if (idx + 1) % 10 == 0:
                 print(f"    [{idx+1}/{len(similar_pairs)}]")
 
-            result = self.verify_with_ai(tips[i], tips[j])
-            result['tip1_id'] = tips[i].id
-            result['tip2_id'] = tips[j].id
-            result['tip1_title'] = tips[i].title
-            result['tip2_title'] = tips[j].title
-            result['tip1_line'] = tips[i].line_number
-            result['tip2_line'] = tips[j].line_number
+            result = self.verify_pair(tips[i], tips[j], float(cosine_sim))
             result['cosine_similarity'] = float(cosine_sim)
 
             if result['relationship'] == 'duplicate':
                 duplicates.append(result)
             elif result['relationship'] == 'similar':
                 similar.append(result)
+            if self.report is not None and result['relationship'] in ('duplicate', 'similar'):
+                self.report.write_pair(file_path.name, result)
+
+            if result.get('decided_by') != 'local':
+                time.sleep(0.2)  # Small delay
 
-            time.sleep(0.2)  # Small delay
+        return self.file_result(work, duplicates, similar, len(similar_pairs))
 
-        print(f"\n  Results:")
+    def file_result(self, work: FileWork, duplicates: List[Dict], similar: List[Dict],
+                    verified: int, deferred: Optional[int] = None) -> Dict:
+        """Report entry of a file whose candidate pairs were verified"""
+        print(f"\n  Results ({work.file_path.name}):")
         print(f"    Duplicates: {len(duplicates)}")
         print(f"    Similar: {len(similar)}")
-        print(f"    Different: {len(similar_pairs) - len(duplicates) - len(similar)}")
+        print(f"    Different: {verified - len(duplicates) - len(similar)}")
 
-        return {
-            'file': file_path.name,
+        tips = work.tips
+        result = {
+            'file': work.file_path.name,
             'tips': len(tips),
-            'pairs_filtered': self.pairs_filtered,
-            'pairs_verified': len(similar_pairs),
+            'changed_tips': len(work.changed) if work.changed is not None else len(tips),
+            'pairs_filtered': work.pairs_filtered,
+            'pairs_verified': verified,
             'duplicates': duplicates,
             'similar': similar,
-            'all_tips': [{'id': t.id, 'title': t.title, 'line': t.line_number} for t in tips]
+            'all_tips': [{'id': t.id, 'alias': t.alias, 'title': t.title, 'line': t.line_number} for t in tips]
         }
+        if deferred is not None:
+            result['pairs_deferred'] = deferred
+        return result
+
+    def verify_scheduled(self, works: List[FileWork], scheduler_args: Dict) -> Tuple[List[Dict], VerifyScheduler]:
+        """
+        Verify the candidate pairs of all files in expected-yield order (see verify_scheduler.py).
+
+        Returns one result per work, in file order, and the scheduler for its report.
+        """
+        candidates = [(similarity, (w, p)) for w, work in enumerate(works) if work.result is None
+                      for p, (_, _, similarity) in enumerate(work.similar_pairs)]
+        scheduler = VerifyScheduler(candidates, **scheduler_args)
+        print(f"\n{'='*80}")
+        print(f"Scheduling {len(candidates)} candidate pairs from {len(works)} files")
+        print(f"{'='*80}")
+
+        found: Dict[int, Tuple[List[Dict], List[Dict]]] = {w: ([], []) for w in range(len(works))}
+        verified = [0] * len(works)
+        while True:
+            item = scheduler.next()
+            if item is None:
+                break
+            similarity, (w, p) = item
+            work = works[w]
+            i, j, _ = work.similar_pairs[p]
+            tokens_before = self.total_input_tokens + self.total_output_tokens
+            calls_before = self.total_calls
+
+            result = self.verify_pair(work.tips[i], work.tips[j], float(similarity))
+            result['cosine_similarity'] = float(similarity)
+            verified[w] += 1
+            if self.total_calls > calls_before:
+                # Only AI verdicts update the rates: failed calls carry none, and
+                # local decisions would just echo the local cutoffs
+                scheduler.record(similarity, result['relationship'] == 'duplicate',
+                                 self.total_input_tokens + self.total_output_tokens - tokens_before)
+                if scheduler.calls % 10 == 0:
+                    threshold = scheduler.effective_threshold()
+                    print(f"    [{scheduler.calls} verified, effective threshold "
+                          f"{'none' if threshold is None else f'{threshold:.2f}'}]")
+
+            duplicates, similar = found[w]
+            if result['relationship'] == 'duplicate':
+                duplicates.append(result)
+            elif result['relationship'] == 'similar':
+                similar.append(result)
+            if self.report is not None and result['relationship'] in ('duplicate', 'similar'):
+                self.report.write_pair(work.file_path.name, result)
+
+            if result.get('decided_by') != 'local':
+                time.sleep(0.2)  # Small delay
+
+        results = []
+        for w, work in enumerate(works):
+            if work.result is not None:
+                results.append(work.result)
+                continue
+            duplicates, similar = found[w]
+            results.append(self.file_result(work, duplicates, similar, verified[w],
+                                            len(work.similar_pairs) - verified[w]))
+        return results, scheduler
+
+    def process_file(self, file_path: Path, baseline_ids: Optional[Set[str]] = None,
+                     tips: Optional[List[Tip]] = None) -> Dict:
+        """Process a single file (prepare_file, then verify_file)"""
+        return self.verify_file(self.prepare_file(file_path, baseline_ids, tips))
 
     def print_summary(self):
         """Print cost summary"""
@@ -345,7 +806,13 @@ Return JSON only:
         print("HYBRID DEDUPLICATION SUMMARY")
         print(f"{'='*80}")
         print(f"Pairs filtered by embeddings: {self.pairs_filtered:,} (saved ${self.pairs_filtered * 0.00265:.2f})")
+        if self.blocking:
+            stats = self.blocking_stats
+            print(f"Pairs compared within blocks: {stats['compared']:,} of {stats['pairs']:,} "
+                  f"(reduction {blocking_reduction(stats):.1%})")
         print(f"Pairs verified with AI: {self.pairs_verified:,}")
+        if self.local is not None:
+            print(self.local.report())
         print(f"API calls: {self.total_calls}")
         print(f"Input tokens: {self.total_input_tokens:,}")
         print(f"Output tokens: {self.total_output_tokens:,}")
@@ -353,45 +820,470 @@ Return JSON only:
         print(f"{'='*80}\n")
 
 
+def print_precision_report(files: List[Path], threshold: float, tfidf_mode: str = 'fit'):
+    """Memory use and candidate-pair recall of float16/int8 against float32"""
+    quantized = lazy_import('quantized_embeddings')
+    generator = EmbeddingGenerator(tfidf_mode=tfidf_mode)
+    totals = {p: {'bytes': 0, 'pairs': 0, 'missed': 0, 'extra': 0, 'expected': 0} for p in quantized.PRECISIONS}
+    file_tips = [(f, TipParser.parse_file(f)) for f in files]
+    # As in main(): with nothing to compare, the vectorizer would be fitted on no tips
+    pending = [tip for _, tips in file_tips if len(tips) >= 2 for tip in tips]
+    if pending:
+        generator.prime(pending)
+
+    for file_path, tips in file_tips:
+        if len(tips) < 2:
+            continue
+        print(f"  {file_path.name}: {len(tips)} tips")
+        embeddings = generator.generate_embeddings(tips)
+        if is_sparse(embeddings):
+            # Hashed TF-IDF has 2^20 columns: only the n x n product may go dense
+            rows = quantized.compare_sparse_precisions(embeddings, threshold)
+        else:
+            rows = quantized.compare_precisions(embeddings, threshold)
+        for row in rows:
+            for key in totals[row['precision']]:
+                totals[row['precision']][key] += row[key]
+
+    reference_bytes = totals['float32']['bytes'] or 1
+    print(f"\n{'='*80}")
+    print(f"EMBEDDING PRECISION REPORT (threshold: {threshold})")
+    print(f"{'='*80}")
+    print(f"{'Precision':<10} {'Memory':>12} {'Saved':>7} {'Pairs':>7} {'Recall':>8} {'Missed':>7} {'Extra':>7}")
+    for precision in quantized.PRECISIONS:
+        t = totals[precision]
+        recall = 1 - t['missed'] / t['expected'] if t['expected'] else 1.0
+        saved = 1 - t['bytes'] / reference_bytes
+        print(f"{precision:<10} {t['bytes']:>12,} {saved:>6.0%} {t['pairs']:>7,} "
+              f"{recall:>8.2%} {t['missed']:>7,} {t['extra']:>7,}")
+    print(f"{'='*80}\n")
+
+
+def pair_similarities(embeddings, pairs: List[Tuple[int, int]], precision: str = 'float32'):
+    """Cosine similarity of each (i, j) pair of embedding rows"""
+    np = lazy_import('numpy')
+    left = [i for i, _ in pairs]
+    right = [j for _, j in pairs]
+    if is_sparse(embeddings):
+        return np.asarray(embeddings[left].multiply(embeddings[right]).sum(axis=1)).ravel()
+    quantized = lazy_import('quantized_embeddings')
+    return quantized.QuantizedEmbeddings.from_embeddings(embeddings, precision).pair_similarity(left, right)
+
+
+def blocking_reduction(stats: Dict[str, int]) -> float:
+    """Share of pairs that blocking left out of the similarity computation"""
+    return 1 - stats['compared'] / stats['pairs'] if stats['pairs'] else 0.0
+
+
+def print_blocking_report(files: List[Path], threshold: float, precision: str, max_share: float,
+                          tfidf_mode: str = 'fit'):
+    """Pairs compared and candidate-pair recall with blocking, against the unblocked run"""
+    quantized = lazy_import('quantized_embeddings')
+    generator = EmbeddingGenerator(tfidf_mode=tfidf_mode)
+    file_tips = [(f, TipParser.parse_file(f)) for f in files]
+    # As in main(): with nothing to compare, the vectorizer would be fitted on no tips
+    pending = [tip for _, tips in file_tips if len(tips) >= 2 for tip in tips]
+    if pending:
+        generator.prime(pending)
+
+    stats = {'pairs': 0, 'compared': 0}
+    expected = found = 0
+    missed = []
+    for file_path, tips in file_tips:
+        if len(tips) < 2:
+            continue
+        embeddings = generator.generate_embeddings(tips)
+        if is_sparse(embeddings):
+            # Hashed TF-IDF has 2^20 columns: only the n x n product may go dense
+            unblocked = quantized.pairs_above((embeddings @ embeddings.T).toarray(), threshold)
+        else:
+            unblocked = quantized.similar_pairs(
+                quantized.QuantizedEmbeddings.from_embeddings(embeddings, precision), threshold)
+        index = BlockIndex([tip.get_blocking_keys() for tip in tips], max_share)
+        candidates = index.candidate_pairs()
+        stats['pairs'] += index.all_pairs()
+        stats['compared'] += len(candidates)
+        # Blocked similarities equal unblocked ones, so recall is the share of pairs kept
+        kept = len(unblocked & candidates)
+        expected += len(unblocked)
+        found += kept
+        if kept < len(unblocked):
+            missed.append((file_path.name, len(unblocked) - kept, len(unblocked)))
+
+    recall = found / expected if expected else 1.0
+    print(f"\n{'='*80}")
+    print(f"BLOCKING REPORT (threshold: {threshold}, max block share: {max_share})")
+    print(f"{'='*80}")
+    print(f"Pairs compared: {stats['compared']:,} of {stats['pairs']:,} (reduction {blocking_reduction(stats):.1%})")
+    print(f"Candidate pairs: {found:,} of {expected:,} found unblocked (recall {recall:.2%})")
+    for name, count, total in sorted(missed, key=lambda item: -item[1])[:10]:
+        print(f"  {name}: {count} of {total} missed")
+    print(f"{'='*80}\n")
+    METRICS.gauge('blocking_reduction', round(blocking_reduction(stats), 4))
+    METRICS.gauge('blocking_recall', round(recall, 4))
+
+
+def load_manifest(manifest_path: Path) -> Optional[Dict[str, Set[str]]]:
+    """Tip ids per file recorded by the previous run, or None"""
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path) as f:
+        data = json.load(f)
+    return {name: set(ids) for name, ids in data.get('files', {}).items()}
+
+
+def load_git_baseline(revision: str, input_dir: Path) -> Dict[str, Set[str]]:
+    """Tip ids per file as of a git revision"""
+    # --full-name: ls-tree lists paths relative to the cwd, but rev:path is resolved from the repo root
+    listing = subprocess.run(
+        ['git', 'ls-tree', '--name-only', '--full-name', revision, str(input_dir) + '/'],
+        capture_output=True, text=True, check=True
+    )
+    baseline = {}
+    for path in listing.stdout.splitlines():
+        if not path.endswith('.md'):
+            continue
+        content = subprocess.run(
+            ['git', 'show', f'{revision}:{path}'],
+            capture_output=True, text=True, check=True
+        ).stdout
+        baseline[Path(path).name] = {tip.id for tip in TipParser.parse_content(content)}
+    return baseline
+
+
+def write_manifest(manifest_path: Path, files: List[Path], held: Optional[Dict[str, Optional[Set[str]]]] = None):
+    """
+    Record current tip ids per file for the next delta run.
+
+    Files in `held` (those with deferred pairs) keep their baseline ids
+    instead, so the next delta run compares their changed tips again; a
+    held file without a baseline is left out, making all its tips new.
+    """
+    held = held or {}
+    data = {'files': {}}
+    for f in files:
+        if f.name not in held:
+            data['files'][f.name] = [tip.id for tip in TipParser.parse_file(f)]
+        elif held[f.name] is not None:
+            data['files'][f.name] = sorted(held[f.name])
+    with open(manifest_path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def locate_tips(file_tips: Dict[Path, List[Tip]], baseline_for):
+    """
+    Tips keyed by (file, index), and the keys of new or changed tips.
+
+    The changed set is None outside delta mode.
+    """
+    located = {(file_path, i): tip for file_path, tips in file_tips.items() for i, tip in enumerate(tips)}
+    changed = None
+    if any(baseline_for(file_path) is not None for file_path in file_tips):
+        changed = {(file_path, i) for (file_path, i), tip in located.items()
+                   if tip.id not in (baseline_for(file_path) or set())}
+    return located, changed
+
+
+def pair_key(tip1: Tip, tip2: Tip) -> Tuple[str, str]:
+    """Order-independent key of a tip pair"""
+    return (tip1.id, tip2.id) if tip1.id <= tip2.id else (tip2.id, tip1.id)
+
+
+def needs_comparison(tips: List[Tip], baseline_ids: Optional[Set[str]]) -> bool:
+    """Whether a file has pairs to compare (and so needs embeddings at all)"""
+    if len(tips) < 2:
+        return False
+    return baseline_ids is None or any(tip.id not in baseline_ids for tip in tips)
+
+
+def run_pipeline(deduplicator: HybridDeduplicator, files: List[Path], file_tips: Dict[Path, List[Tip]],
+                 baseline_for, queue_size: int, record):
+    """
+    Process files as an overlapped pipeline: embed -> pairs -> verify.
+
+    Files are embedded in groups of at least one encoding batch, and those
+    groups flow through bounded queues, so later files are encoded and
+    compared while earlier ones wait on AI verification. Results come out
+    in file order, as in the sequential run.
+    """
+    generator = deduplicator.embedding_gen if any(
+        needs_comparison(tips, baseline_for(f)) for f, tips in file_tips.items()) else None
+    if generator is not None and generator.method == 'tfidf':
+        # One vocabulary for the whole corpus, as in the sequential run
+        with METRICS.stage('embed'):
+            generator.prime([tip for tips in file_tips.values() for tip in tips])
+
+    group_size = 1
+    if generator is not None and generator.service is not None:
+        group_size = generator.service.batch_size * generator.service.workers
+
+    def groups():
+        group, pending = [], 0
+        for file_path in files:
+            group.append(file_path)
+            if needs_comparison(file_tips[file_path], baseline_for(file_path)):
+                pending += len(file_tips[file_path])
+            if pending >= group_size:
+                yield group
+                group, pending = [], 0
+        if group:
+            yield group
+
+    def embed(group: List[Path]) -> List[Path]:
+        tips = [tip for f in group if needs_comparison(file_tips[f], baseline_for(f)) for tip in file_tips[f]]
+        if tips:
+            with METRICS.stage('embed'):
+                deduplicator.embedding_gen.prime(tips)
+        return group
+
+    def pairs(group: List[Path]) -> List[FileWork]:
+        return [deduplicator.prepare_file(f, baseline_for(f), file_tips[f]) for f in group]
+
+    def verify(works: List[FileWork]) -> List[Dict]:
+        return [deduplicator.verify_file(work) for work in works]
+
+    pipeline = Pipeline([('embed', embed), ('pairs', pairs), ('verify', verify)], queue_size)
+    print(f"Processing {len(files)} files as a pipeline (queue size {pipeline.queue_size})...\n")
+    for results in pipeline.run(groups()):
+        for result in results:
+            record(result)
+
+    print(f"\n{'='*80}")
+    print("PIPELINE STAGES (items are file groups)")
+    print(f"{'='*80}")
+    print(pipeline.report())
+    for stage in pipeline.metrics:
+        for key in ('busy', 'starved', 'blocked'):
+            METRICS.gauge(f'pipeline.{stage.name}.{key}_seconds', round(getattr(stage, key), 6))
+
+
+def print_timings():
+    print(f"\n{'='*80}")
+    print("TIMINGS (stages may nest: imports and model load count toward their stage too)")
+    print(f"{'='*80}")
+    print(METRICS.report())
+    print(f"{'='*80}\n")
+
+
 def main():
+    global METRICS
     import argparse
 
     parser = argparse.ArgumentParser(description='Hybrid deduplication with embeddings + AI')
     parser.add_argument('--input-dir', type=str, default='scripts/merged_tips',
                        help='Input directory')
-    parser.add_argument('--output', type=str, default='scripts/dedup_report_hybrid.json',
-                       help='Output report file')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Output report file (default: scripts/dedup_report_hybrid.json or .jsonl)')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                       help='json: one document at the end; jsonl: stream pairs and file summaries as produced')
     parser.add_argument('--threshold', type=float, default=0.7,
                        help='Cosine similarity threshold (0.0-1.0)')
     parser.add_argument('--file', type=str, default=None,
                        help='Process single file for testing')
+    parser.add_argument('--delta', action='store_true',
+                       help='Only compare new or changed tips (against --manifest or --base)')
+    parser.add_argument('--base', type=str, default=None,
+                       help='Git revision to detect changed tips against (implies --delta)')
+    parser.add_argument('--manifest', type=str, default='scripts/dedup_manifest.json',
+                       help='Tip id manifest written after each run and read by --delta')
+    parser.add_argument('--precision', choices=PRECISION_CHOICES, default='float32',
+                       help='Embedding storage precision used for similarity (dense embeddings only)')
+    parser.add_argument('--precision-report', action='store_true',
+                       help='Report memory savings and pair recall of float16/int8, then exit')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Encoder processes for sentence-transformers (0 = one per CPU core)')
+    parser.add_argument('--batch-size', type=int, default=64,
+                       help='Texts per encoding batch')
+    parser.add_argument('--tfidf', choices=['fit', 'hashing'], default='fit',
+                       help='TF-IDF fallback: fit one vocabulary on the corpus, or hash terms without fitting')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='Overlap embedding and pair finding of later files with AI verification of earlier ones')
+    parser.add_argument('--queue-size', type=int, default=2,
+                       help='Pipeline queue capacity between stages (backpressure bound)')
+    parser.add_argument('--blocking', action='store_true',
+                       help='Compute similarity only for tips sharing a tag, category, command, option or key')
+    parser.add_argument('--max-block-share', type=float, default=0.1,
+                       help='Ignore blocking keys shared by more than this share of a file\'s tips')
+    parser.add_argument('--blocking-report', action='store_true',
+                       help='Report pairs saved and candidate-pair recall of --blocking, then exit')
+    parser.add_argument('--source-groups', action='store_true',
+                       help='First verify tips citing the same source page, across files, without embeddings')
+    parser.add_argument('--max-source-group', type=int, default=10,
+                       help='Skip source pages cited by more tips than this (hub pages)')
+    parser.add_argument('--shared-code', action='store_true',
+                       help='First verify tips whose vim/lua code overlaps, across files, by code fingerprints')
+    parser.add_argument('--min-code-similarity', type=float, default=0.5,
+                       help='Share of the smaller tip\'s code fingerprints that must be in common')
+    parser.add_argument('--schedule', action='store_true',
+                       help='Verify pairs from all files in expected-yield order and adapt the threshold')
+    parser.add_argument('--budget-calls', type=int, default=None,
+                       help='Stop scheduled verification after this many API calls (implies --schedule)')
+    parser.add_argument('--budget-tokens', type=int, default=None,
+                       help='Stop scheduled verification before exceeding this many tokens (implies --schedule)')
+    parser.add_argument('--min-yield', type=float, default=0.1,
+                       help='Stop scheduled verification when no pairs are expected to be duplicates this often')
+    parser.add_argument('--floor', type=float, default=0.5,
+                       help='Lowest similarity the scheduler may lower the threshold to')
+    parser.add_argument('--local-decisions', action='store_true',
+                       help='Decide clear duplicates and clear non-duplicates locally, without AI calls')
+    parser.add_argument('--audit', type=float, default=0.05,
+                       help='Share of locally decided pairs still verified with AI to measure agreement')
+    parser.add_argument('--local-log', type=str, default='scripts/local_decisions.jsonl',
+                       help='Signals, local and AI verdicts of every AI-verified pair (see local_decision.py)')
+    parser.add_argument('--duplicate-cosine', type=float, default=Cutoffs.duplicate_cosine,
+                       help='Cosine similarity from which matching code makes a local duplicate')
+    parser.add_argument('--different-cosine', type=float, default=Cutoffs.different_cosine,
+                       help='Cosine similarity below which disjoint tags make a local non-duplicate')
+    parser.add_argument('--timings', action='store_true',
+                       help='Print import, model load and per-stage times')
+    add_metrics_arguments(parser)
 
     args = parser.parse_args()
-
-    deduplicator = HybridDeduplicator(similarity_threshold=args.threshold)
-    results = []
+    METRICS = Metrics.from_args('dedup_hybrid', args)
+    schedule = args.schedule or args.budget_calls is not None or args.budget_tokens is not None
+    if schedule and args.pipeline:
+        parser.error('--schedule needs every file\'s candidates before verifying; drop --pipeline')
 
     if args.file:
         # Test on single file
-        file_path = Path(args.input_dir) / args.file
-        result = deduplicator.process_file(file_path)
-        results.append(result)
+        files = [Path(args.input_dir) / args.file]
     else:
         # Process all files
         files = sorted(Path(args.input_dir).glob('*.md'))
-        print(f"Processing {len(files)} files...\n")
 
-        for file_path in files:
-            result = deduplicator.process_file(file_path)
+    if args.precision_report:
+        print_precision_report(files, args.threshold, args.tfidf)
+        if args.timings:
+            print_timings()
+        METRICS.write()
+        return
+
+    if args.blocking_report:
+        print_blocking_report(files, args.threshold, args.precision, args.max_block_share, args.tfidf)
+        if args.timings:
+            print_timings()
+        METRICS.write()
+        return
+
+    baseline = None
+    if args.base:
+        baseline = load_git_baseline(args.base, Path(args.input_dir))
+        print(f"Delta mode: comparing against {args.base}")
+    elif args.delta:
+        baseline = load_manifest(Path(args.manifest))
+        if baseline is None:
+            print(f"⚠️  No manifest at {args.manifest}, running full comparison")
+        else:
+            print(f"Delta mode: comparing against {args.manifest}")
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    # Scheduled runs collect candidates down to the floor and let observed rates pick the threshold
+    deduplicator = HybridDeduplicator(similarity_threshold=args.floor if schedule else args.threshold,
+                                      precision=args.precision,
+                                      workers=workers, batch_size=args.batch_size, tfidf_mode=args.tfidf,
+                                      blocking=args.blocking, max_block_share=args.max_block_share)
+    if args.local_decisions:
+        deduplicator.local = LocalDecider(Cutoffs(duplicate_cosine=args.duplicate_cosine,
+                                                  different_cosine=args.different_cosine),
+                                          args.audit, Path(args.local_log))
+    results = []
+    deferred_files: Set[str] = set()
+
+    with METRICS.stage('parse'):
+        file_tips = {file_path: TipParser.parse_file(file_path) for file_path in files}
+
+    def baseline_for(file_path: Path) -> Optional[Set[str]]:
+        return baseline.get(file_path.name, set()) if baseline is not None else None
+
+    output_path = Path(args.output or f'scripts/dedup_report_hybrid.{args.format}')
+    if args.format == 'jsonl':
+        deduplicator.report = ReportWriter(output_path)
+        print(f"Streaming report to: {output_path}")
+
+    def record(result: Dict):
+        if deduplicator.report is not None:
+            deduplicator.report.write_file(result)
+        else:
             results.append(result)
 
+    if args.source_groups:
+        record(deduplicator.verify_source_groups(file_tips, baseline_for, args.max_source_group))
+    if args.shared_code:
+        record(deduplicator.verify_shared_code(file_tips, baseline_for, args.min_code_similarity))
+
+    if args.pipeline:
+        run_pipeline(deduplicator, files, file_tips, baseline_for, args.queue_size, record)
+    else:
+        # Encode every tip that will be compared up front, in shared batches; the
+        # model (and numpy) are never loaded when no file has anything to compare
+        pending = [tip for file_path, tips in file_tips.items()
+                   if needs_comparison(tips, baseline_for(file_path)) for tip in tips]
+        if pending:
+            with METRICS.stage('embed'):
+                deduplicator.embedding_gen.prime(pending)
+
+        print(f"Processing {len(files)} files...\n")
+        if schedule:
+            works = [deduplicator.prepare_file(file_path, baseline_for(file_path), file_tips[file_path])
+                     for file_path in files]
+            scheduled, scheduler = deduplicator.verify_scheduled(works, {
+                'threshold': args.threshold, 'floor': args.floor, 'min_yield': args.min_yield,
+                'max_calls': args.budget_calls, 'max_tokens': args.budget_tokens})
+            for result in scheduled:
+                record(result)
+                if result.get('pairs_deferred'):
+                    deferred_files.add(result['file'])
+        else:
+            for file_path in files:
+                record(deduplicator.process_file(file_path, baseline_for(file_path), file_tips[file_path]))
+
     # Save report
-    output_path = Path(args.output)
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    if deduplicator.report is not None:
+        deduplicator.report.close()
+    else:
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
 
     print(f"\n✓ Report saved to: {output_path}")
+
+    if not args.file:
+        write_manifest(Path(args.manifest), files,
+                       {f.name: baseline_for(f) for f in files if f.name in deferred_files})
+        print(f"✓ Manifest saved to: {args.manifest}")
+        if deferred_files:
+            print(f"  {len(deferred_files)} files with deferred pairs keep their previous entries")
+
+    deduplicator.close()
     deduplicator.print_summary()
+    if deduplicator.local is not None:
+        deduplicator.local.close()
+        print(f"✓ Local decision log saved to: {args.local_log}")
+        for tier, count in deduplicator.local.decided.items():
+            METRICS.count(f'local_{tier}', count)
+        for tier, rate in deduplicator.local.agreement().items():
+            if rate is not None:
+                METRICS.gauge(f'local_{tier}_agreement', round(rate, 4))
+    if schedule:
+        print("VERIFICATION SCHEDULE")
+        print(scheduler.report())
+        print(f"{'='*80}\n")
+        summary = scheduler.summary()
+        METRICS.count('pairs_deferred', summary['pairs_deferred'])
+        if summary['effective_threshold'] is not None:
+            METRICS.gauge('effective_threshold', summary['effective_threshold'])
+
+    METRICS.count('files', len(files))
+    METRICS.count('tips', sum(len(tips) for tips in file_tips.values()))
+    if args.blocking:
+        METRICS.count('blocking_pairs_compared', deduplicator.blocking_stats['compared'])
+        METRICS.gauge('blocking_reduction', round(blocking_reduction(deduplicator.blocking_stats), 4))
+    METRICS.count('api_calls', deduplicator.total_calls)
+    METRICS.count('input_tokens', deduplicator.total_input_tokens)
+    METRICS.count('output_tokens', deduplicator.total_output_tokens)
+    if args.timings:
+        print_timings()
+    if METRICS.write():
+        print(f"✓ Metrics saved to: {METRICS.output}")
 
 
 if __name__ == '__main__':
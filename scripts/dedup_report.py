@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL reports for dedup_hybrid.py.
+
+Each line is one JSON record, written (and flushed) as soon as it exists:
+
+- {"type": "pair", "file": ..., "relationship": ..., "confidence": ..., ...}
+  one per AI-verified duplicate or similar pair, same fields as in the
+  JSON report's "duplicates"/"similar" lists
+- {"type": "file", "file": ..., "tips": ..., "duplicates": <count>, ...}
+  one per processed file, after its pairs
+
+Readers go line by line, so filtering a report never loads it whole:
+
+    for pair in iter_pairs(Path('scripts/dedup_report_hybrid.jsonl'),
+                           relationship='duplicate', min_confidence=0.8):
+        print(pair['tip1_title'], '<->', pair['tip2_title'])
+
+The classic single-document JSON report is accepted by every reader too.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+RELATIONSHIPS = ('duplicate', 'similar')
+
+
+class ReportWriter:
+    """Append pair and file records to a JSONL report as they are produced"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pairs = 0
+        self.files = 0
+        self._f = open(path, 'w', encoding='utf-8')
+
+    def _write(self, record: Dict):
+        self._f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._f.flush()
+
+    def write_pair(self, file_name: str, result: Dict):
+        self._write({'type': 'pair', 'file': file_name, **result})
+        self.pairs += 1
+
+    def write_file(self, result: Dict):
+        """Per-file summary: pair lists are already streamed, so only counts are kept"""
+        self._write(_file_record(result))
+        self.files += 1
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self) -> 'ReportWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _file_record(result: Dict) -> Dict:
+    """File summary record, with the pair lists replaced by their counts"""
+    return {'type': 'file', **{key: len(value) if key in ('duplicates', 'similar') else value
+                               for key, value in result.items()}}
+
+
+def _jsonl_records(path: Path, needle: Optional[str] = None) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            # Cheap substring test first; json.dumps always writes '"key": "value"'
+            if not line.strip() or (needle and needle not in line):
+                continue
+            yield json.loads(line)
+
+
+def _legacy_records(path: Path) -> Iterator[Dict]:
+    """Records equivalent to a JSONL report, from a single-document JSON report"""
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    for result in results:
+        for key in ('duplicates', 'similar'):
+            for pair in result.get(key, []):
+                yield {'type': 'pair', 'file': result['file'], **pair}
+        yield _file_record(result)
+
+
+def iter_records(path: Path, record_type: Optional[str] = None) -> Iterator[Dict]:
+    """Records of a report, optionally only 'pair' or 'file' records"""
+    if path.suffix == '.json':
+        records = _legacy_records(path)
+    else:
+        records = _jsonl_records(path, f'"type": "{record_type}"' if record_type else None)
+    for record in records:
+        if record_type is None or record.get('type') == record_type:
+            yield record
+
+
+def iter_pairs(path: Path, relationship: Optional[str] = None, min_confidence: float = 0.0,
+               file_name: Optional[str] = None) -> Iterator[Dict]:
+    """Verified pairs filtered by relationship, minimum confidence and file"""
+    for pair in iter_records(path, 'pair'):
+        if relationship and pair.get('relationship') != relationship:
+            continue
+        if pair.get('confidence', 0.0) < min_confidence:
+            continue
+        if file_name and pair.get('file') != file_name:
+            continue
+        yield pair
+
+
+def file_summaries(path: Path) -> Iterator[Dict]:
+    """Per-file summary records"""
+    return iter_records(path, 'file')
+
+
+def load_report(path: Path) -> List[Dict]:
+    """The report as the classic JSON structure (one dict per file with pair lists)"""
+    pairs: Dict[str, Dict[str, List[Dict]]] = {}
+    results = []
+    for record in iter_records(path):
+        record = dict(record)
+        kind = record.pop('type')
+        if kind == 'pair':
+            file_name = record.pop('file')
+            bucket = 'duplicates' if record.get('relationship') == 'duplicate' else 'similar'
+            pairs.setdefault(file_name, {'duplicates': [], 'similar': []})[bucket].append(record)
+        else:
+            lists = pairs.pop(record['file'], {'duplicates': [], 'similar': []})
+            record.update(lists)
+            results.append(record)
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Filter a dedup_hybrid report (JSONL or JSON)')
+    parser.add_argument('report', type=Path, help='Report file')
+    parser.add_argument('--relationship', choices=RELATIONSHIPS, default=None,
+                        help='Only pairs with this relationship')
+    parser.add_argument('--min-confidence', type=float, default=0.0,
+                        help='Only pairs with at least this AI confidence')
+    parser.add_argument('--file', type=str, default=None,
+                        help='Only pairs from this file')
+    parser.add_argument('--to-json', type=Path, default=None,
+                        help='Write the report as a classic JSON document instead')
+
+    args = parser.parse_args()
+
+    if args.to_json:
+        with open(args.to_json, 'w', encoding='utf-8') as f:
+            json.dump(load_report(args.report), f, indent=2)
+        print(f"✓ Wrote {args.to_json}")
+    else:
+        count = 0
+        for pair in iter_pairs(args.report, args.relationship, args.min_confidence, args.file):
+            count += 1
+            print(f"{pair['relationship']:<9} {pair.get('confidence', 0.0):.2f}  {pair['file']}  "
+                  f"{pair['tip1_id']} {pair['tip1_title']}  <->  {pair['tip2_id']} {pair['tip2_title']}")
+        print(f"\n{count} pair(s)")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Batched, multi-process sentence-transformers encoding.
+
+Texts from any number of files are encoded together: they are sorted by
+length so each batch pads to similar sizes, split into batches of
+`batch_size`, and spread over a pool of worker processes. Each worker loads
+the model once (pool initializer) and keeps it warm for every batch it gets.
+With workers=1 everything runs in-process with a single lazily loaded model.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+# Per-process model, loaded once by _init_worker (or lazily in-process)
+_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    global _model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from sentence_transformers import SentenceTransformer
+    _model = SentenceTransformer(model_name)
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return _model.encode(texts, batch_size=len(texts), show_progress_bar=False,
+                         convert_to_numpy=True)
+
+
+class EmbeddingService:
+    """Encode texts in length-sorted batches over a warm process pool"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, workers: Optional[int] = None,
+                 batch_size: int = 64):
+        self.model_name = model_name
+        self.workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        self.batch_size = max(1, batch_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Throughput accounting
+        self.texts_encoded = 0
+        self.seconds = 0.0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Split the cores between workers so torch threads don't oversubscribe
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, threads),
+            )
+        return self._pool
+
+    @property
+    def warm(self) -> bool:
+        """Whether the model is loaded (workers=1) or the worker pool is running"""
+        return _model is not None if self.workers == 1 else self._pool is not None
+
+    def warm_up(self):
+        """Load the in-process model now (workers=1) instead of on first encode"""
+        if self.workers == 1 and _model is None:
+            _init_worker(self.model_name, os.cpu_count() or 1)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for texts, in input order"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        start = time.perf_counter()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        batch_texts = [[texts[i] for i in batch] for batch in batches]
+
+        if self.workers == 1:
+            self.warm_up()
+            results = [_encode_batch(b) for b in batch_texts]
+        else:
+            results = list(self._executor().map(_encode_batch, batch_texts))
+
+        embeddings = np.empty((len(texts), results[0].shape[1]), dtype=results[0].dtype)
+        for batch, result in zip(batches, results):
+            embeddings[batch] = result
+
+        self.texts_encoded += len(texts)
+        self.seconds += time.perf_counter() - start
+        return embeddings
+
+    @property
+    def tips_per_second(self) -> float:
+        return self.texts_encoded / self.seconds if self.seconds else 0.0
+
+    def report(self) -> str:
+        return (f"Encoded {self.texts_encoded:,} tips in {self.seconds:.1f}s "
+                f"({self.tips_per_second:,.1f} tips/s, {self.workers} worker(s), "
+                f"batch size {self.batch_size})")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Export every tip as Vim help, with one *tag* per tip and a sorted tags file.
+
+Each data file becomes doc/neovim-tips-<category>.txt. Every tip gets a
+unique tag, nt-<title alias> (or nt-<alias>-<id> when two titles share an
+alias), so `:help nt-delete-without<Tab>` finds a tip by the same binary
+search Vim uses for its own help instead of a picker scan.
+
+doc/tags is rewritten in byte order (LC_ALL=C), as Vim's binary search
+requires. The plugin's own entries from doc/neovim-tips.txt are kept.
+
+Files are rendered in a single streaming pass, one category at a time.
+scripts/help_manifest.json records each source file's hash and tip tags,
+so a re-run parses and renders only changed categories. Tags of unchanged
+files come from the manifest, and a category whose tags were renamed by a
+new alias collision is re-rendered as well.
+
+Markdown is converted to help syntax:
+- code fences become >lang example blocks
+- emphasis markers are dropped, since *word* would define a tag
+- links become "text <url>"
+- any other *word* that :helptags would take as a tag, as in code that
+  writes a help file, is rendered as `*word*`, so the tags :helptags
+  generates match doc/tags
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import CorpusTip, data_file_stamps, parse_tip_blocks
+
+MANIFEST_VERSION = 2
+TEXT_WIDTH = 78
+TAG_PREFIX = 'nt-'
+
+_FENCE_RE = re.compile(r'^```\s*([\w+-]*)\s*$')
+_LINK_RE = re.compile(r'\[([^\]]*)\]\(([^)\s]+(?:\([^)\s]*\))?[^)\s]*)\)')
+_EMPHASIS_RE = re.compile(r'(\*\*|__|\*)(?=\S)(.+?)(?<=\S)\1')
+
+
+def help_file_name(data_file: str) -> str:
+    return 'neovim-tips-' + Path(data_file).stem.replace('_', '-') + '.txt'
+
+
+def right_align(left: str, right: str) -> List[str]:
+    """left and right on one line, or right on its own line above when too long"""
+    gap = TEXT_WIDTH - len(left) - len(right)
+    if gap >= 1:
+        return [left + ' ' * gap + right]
+    return [right.rjust(TEXT_WIDTH), left]
+
+
+def prose_line(line: str) -> str:
+    """A markdown prose line as help text (no accidental *tags*)"""
+    line = _LINK_RE.sub(lambda m: m.group(2) if m.group(1) in m.group(2) or not m.group(1)
+                        else f'{m.group(1)} <{m.group(2)}>', line)
+    if line.startswith('**Source:**'):
+        line = 'Source:' + line[len('**Source:**'):]
+    line = _EMPHASIS_RE.sub(r'\2', line)
+    if line.startswith('#'):
+        line = line.lstrip('#').strip().upper() + ' ~'
+    if line.endswith(' >') or line == '>':
+        line += '.'  # would open an example block
+    return line
+
+
+def body_lines(description: str) -> Iterator[str]:
+    """Tip description as help lines; code fences become example blocks"""
+    in_code = False
+    for line in description.split('\n'):
+        fence = _FENCE_RE.match(line)
+        if fence:
+            if in_code:
+                yield '<'
+            else:
+                yield f'>{fence.group(1)}' if fence.group(1) else '>'
+            in_code = not in_code
+        elif in_code:
+            yield '    ' + line if line else ''
+        else:
+            yield prose_line(line)
+    if in_code:
+        yield '<'
+
+
+def render_tip(tip: CorpusTip, tag: str) -> List[str]:
+    lines = ['=' * TEXT_WIDTH]
+    lines.extend(right_align(tip.title, f'*{tag}*'))
+    meta = []
+    if tip.category:
+        meta.append(f'Category: {tip.category}')
+    if tip.tags:
+        meta.append(f"Tags: {', '.join(tip.tags)}")
+    if meta:
+        lines.append('    '.join(meta))
+    lines.append('')
+    lines.extend(body_lines(tip.description))
+    lines.append('')
+    return lines
+
+
+def render_file(data_file: str, tips: List[CorpusTip], tags: List[str]) -> str:
+    """Help file for one data file; the header line is the file's own tag"""
+    name = help_file_name(data_file)
+    category = Path(data_file).stem.replace('_', ' ').capitalize()
+    out = right_align(f'*{name}*', f'{category} tips')
+    out.append('')
+    out.append(f'Generated by scripts/export_help.py from data/{data_file}. Do not edit.')
+    out.append(f'{len(tips)} tips. See |neovim-tips| for the plugin itself.')
+    out.append('')
+    for tip, tag in zip(tips, tags):
+        out.extend(render_tip(tip, tag))
+    out.append('vim:tw=78:ts=8:ft=help:norl:')
+    return '\n'.join(out) + '\n'
+
+
+def tag_spans(line: str) -> Iterator[Tuple[int, int]]:
+    """(start, end) of each *tag* in line, scanned the way :helptags does"""
+    p1 = line.find('*')
+    while p1 != -1:
+        p2 = line.find('*', p1 + 1)
+        if p2 == -1:
+            break
+        # Not "**"; no blank or bar inside; blank (or line start) before, blank (or line end) after
+        if (p2 > p1 + 1 and not any(c in ' \t|' for c in line[p1 + 1:p2])
+                and (p1 == 0 or line[p1 - 1] in ' \t') and (p2 + 1 == len(line) or line[p2 + 1] in ' \t\r')):
+            yield p1, p2 + 1
+        p1 = p2
+
+
+def neutralize_stray_tags(text: str, expected: Set[str]) -> Tuple[str, List[str]]:
+    """
+    text with every *tag* other than the first definition of each expected
+    tag quoted as `*tag*`, and the quoted tags (a repeat would be E154)
+    """
+    stray = []
+    pending = set(expected)
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        spans = []
+        for start, end in tag_spans(line):
+            if line[start + 1:end - 1] in pending:
+                pending.discard(line[start + 1:end - 1])
+            else:
+                spans.append((start, end))
+        for start, end in reversed(spans):
+            stray.append(line[start + 1:end - 1])
+            line = line[:start] + '`' + line[start:end] + '`' + line[end:]
+        lines[i] = line
+    return '\n'.join(lines), stray
+
+
+def assign_tags(entries: Dict[str, List[Tuple[str, str]]]) -> Dict[str, List[str]]:
+    """
+    Unique tag per tip from (alias, tip id) pairs per file.
+
+    Aliases shared by several tips get the id appended; identical tips in two
+    files additionally get the file stem, in file order.
+    """
+    counts: Dict[str, int] = {}
+    for items in entries.values():
+        for alias, _ in items:
+            counts[alias] = counts.get(alias, 0) + 1
+
+    tags: Dict[str, List[str]] = {}
+    used = set()
+    for data_file in sorted(entries):
+        file_tags = []
+        for alias, tip_id in entries[data_file]:
+            tag = TAG_PREFIX + (alias or tip_id)
+            if counts[alias] > 1:
+                tag += '-' + tip_id[len('tip_'):len('tip_') + 6]
+            if tag in used:
+                tag += '-' + Path(data_file).stem.replace('_', '-')
+            used.add(tag)
+            file_tags.append(tag)
+        tags[data_file] = file_tags
+    return tags
+
+
+def load_manifest(path: Path) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding='utf-8'))
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data['files']
+
+
+def tags_file_lines(tags_path: Path, generated: Dict[str, List[str]]) -> List[str]:
+    """Entries of the tags file: kept plugin entries plus one per generated tag"""
+    lines = []
+    if tags_path.exists():
+        for line in tags_path.read_text(encoding='utf-8').splitlines():
+            parts = line.split('\t')
+            if line.startswith('!_TAG_') or len(parts) < 3:
+                continue
+            # Generated entries, including those of removed categories, are rebuilt below
+            if not parts[1].startswith('neovim-tips-'):
+                lines.append(line)
+    for help_file, file_tags in generated.items():
+        lines.append(f'{help_file}\t{help_file}\t/*{help_file}*')
+        lines.extend(f'{tag}\t{help_file}\t/*{tag}*' for tag in file_tags)
+    # Vim binary-searches tags by byte value
+    return sorted(set(lines), key=lambda line: line.encode('utf-8'))
+
+
+def export_help(data_dir: Path, doc_dir: Path, manifest_path: Path, full: bool = False,
+                metrics: Optional[Metrics] = None, file_stamps: Optional[Dict[str, Dict[str, object]]] = None,
+                file_tips: Optional[Dict[str, List[CorpusTip]]] = None) -> Dict[str, int]:
+    """
+    Write changed help files and the tags file, returning counts.
+
+    A caller holding the corpus in memory may pass `file_stamps`
+    (data_file_stamps) and `file_tips` (each file's own parse_tip_blocks);
+    otherwise files are hashed here and only the changed ones are parsed.
+    """
+    metrics = metrics or Metrics('export_help')
+    previous = {} if full else load_manifest(manifest_path)
+    doc_dir.mkdir(parents=True, exist_ok=True)
+
+    def file_tips_of(name: str) -> List[CorpusTip]:
+        if file_tips is not None:
+            return file_tips[name]
+        return parse_tip_blocks((data_dir / name).read_text(encoding='utf-8'), name)
+
+    # Pass 1: hash every file; parse only the changed ones
+    sources: Dict[str, Dict] = {}
+    parsed: Dict[str, List[CorpusTip]] = {}
+    with metrics.stage('parse'):
+        if file_stamps is None:
+            file_stamps = data_file_stamps(data_dir)
+        for name, stamp in file_stamps.items():
+            old = previous.get(name)
+            if old is not None and old['sha256'] == stamp['sha256'] and (doc_dir / help_file_name(name)).exists():
+                sources[name] = old
+                continue
+            tips = file_tips_of(name)
+            parsed[name] = tips
+            sources[name] = {'sha256': stamp['sha256'], 'tips': [[tip.alias, tip.tip_id] for tip in tips]}
+
+    tags = assign_tags({name: [tuple(item) for item in entry['tips']] for name, entry in sources.items()})
+
+    # Pass 2: stream out each category that changed or whose tags were renamed
+    stats = {'files': len(sources), 'rendered': 0, 'tips': 0, 'stray_tags': 0}
+    with metrics.stage('render'):
+        for name, entry in sources.items():
+            stats['tips'] += len(tags[name])
+            if name not in parsed and entry.get('tags') == tags[name]:
+                continue
+            tips = parsed.get(name)
+            if tips is None:
+                tips = file_tips_of(name)
+            text, stray = neutralize_stray_tags(render_file(name, tips, tags[name]),
+                                                {help_file_name(name), *tags[name]})
+            for word in stray:
+                print(f"  {help_file_name(name)}: quoted *{word}* so :helptags doesn't take it as a tag")
+            stats['stray_tags'] += len(stray)
+            (doc_dir / help_file_name(name)).write_text(text, encoding='utf-8')
+            stats['rendered'] += 1
+            entry['tags'] = tags[name]
+
+    with metrics.stage('tags'):
+        for name in set(previous) - set(sources):
+            (doc_dir / help_file_name(name)).unlink(missing_ok=True)
+        generated = {help_file_name(name): tags[name] for name in sources}
+        tags_path = doc_dir / 'tags'
+        tags_path.write_text('\n'.join(tags_file_lines(tags_path, generated)) + '\n', encoding='utf-8')
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps({'version': MANIFEST_VERSION, 'files': sources}, indent=1),
+                             encoding='utf-8')
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export tips as Vim help files with a sorted tags file')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--doc-dir', type=Path, default=Path('doc'),
+                        help='Help directory (holds the tags file)')
+    parser.add_argument('--manifest', type=Path, default=Path('scripts/help_manifest.json'),
+                        help='Source hashes and tags per category, for incremental runs')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the manifest and render every category')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('export_help', args)
+
+    stats = export_help(args.data_dir, args.doc_dir, args.manifest, args.full, metrics)
+    for key, value in stats.items():
+        metrics.count(key, value)
+    print(f"✓ {stats['tips']} tips in {stats['files']} help files ({stats['rendered']} rendered), "
+          f"tags written to {args.doc_dir / 'tags'}")
+    metrics.write()
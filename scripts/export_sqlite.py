@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Export the tip corpus to a local SQLite database with FTS5 full-text search.
+
+Tables:
+- tips (one row per tip, keyed by title, with its stable tip id and a content hash)
+- categories, tags, tip_tags (normalized lookups)
+- tips_fts (FTS5 over title/body/code, kept in sync by triggers)
+
+Re-running the export only rewrites tips whose content hash changed and
+removes tips that no longer exist; all writes happen in one transaction.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+from tip_corpus import CorpusTip, code_blocks, load_corpus, strip_code_blocks
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS tips (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    tip_id TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    category_id INTEGER REFERENCES categories(id),
+    file TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    code TEXT NOT NULL,
+    description TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tip_tags (
+    tip_id INTEGER NOT NULL REFERENCES tips(id) ON DELETE CASCADE,
+    tag_id INTEGER NOT NULL REFERENCES tags(id),
+    PRIMARY KEY (tip_id, tag_id)
+);
+
+CREATE INDEX IF NOT EXISTS tip_tags_tag ON tip_tags(tag_id);
+CREATE INDEX IF NOT EXISTS tips_category ON tips(category_id);
+CREATE INDEX IF NOT EXISTS tips_tip_id ON tips(tip_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tips_fts USING fts5(
+    title, body, code,
+    content='tips', content_rowid='id',
+    tokenize='unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS tips_ai AFTER INSERT ON tips BEGIN
+    INSERT INTO tips_fts(rowid, title, body, code) VALUES (new.id, new.title, new.body, new.code);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tips_ad AFTER DELETE ON tips BEGIN
+    INSERT INTO tips_fts(tips_fts, rowid, title, body, code) VALUES ('delete', old.id, old.title, old.body, old.code);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tips_au AFTER UPDATE OF title, body, code ON tips BEGIN
+    INSERT INTO tips_fts(tips_fts, rowid, title, body, code) VALUES ('delete', old.id, old.title, old.body, old.code);
+    INSERT INTO tips_fts(rowid, title, body, code) VALUES (new.id, new.title, new.body, new.code);
+END;
+"""
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open the database and make sure the current schema exists"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+        # Derived data only: rebuild instead of migrating
+        conn.executescript("""
+            DROP TABLE IF EXISTS tips_fts;
+            DROP TABLE IF EXISTS tip_tags;
+            DROP TABLE IF EXISTS tips;
+            DROP TABLE IF EXISTS tags;
+            DROP TABLE IF EXISTS categories;
+        """)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _lookup_ids(conn: sqlite3.Connection, table: str, names: set) -> Dict[str, int]:
+    """Ensure names exist in a lookup table and return name -> id"""
+    conn.executemany(f'INSERT OR IGNORE INTO {table}(name) VALUES (?)', [(n,) for n in names])
+    return {name: row_id for row_id, name in conn.execute(f'SELECT id, name FROM {table}')}
+
+
+def export_tips(conn: sqlite3.Connection, tips: List[CorpusTip]) -> Dict[str, int]:
+    """Upsert tips by content hash in a single transaction, returning counts"""
+    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    existing = {title: (row_id, content_hash) for row_id, title, content_hash
+                in conn.execute('SELECT id, title, content_hash FROM tips')}
+
+    with conn:
+        category_ids = _lookup_ids(conn, 'categories', {t.category for t in tips if t.category})
+        tag_ids = _lookup_ids(conn, 'tags', {tag for t in tips for tag in (t.tags or [])})
+
+        new_rows, changed_rows, moved_rows, tag_rows = [], [], [], []
+        for tip in tips:
+            content_hash = tip.content_hash()
+            category_id = category_ids.get(tip.category) if tip.category else None
+            current = existing.pop(tip.title, None)
+
+            if current and current[1] == content_hash:
+                moved_rows.append((tip.file, tip.line, current[0]))
+                stats['unchanged'] += 1
+                continue
+
+            row = (tip.tip_id, tip.alias, category_id, tip.file, tip.line,
+                   strip_code_blocks(tip.description).strip(),
+                   '\n'.join(code for _, code in code_blocks(tip.description)),
+                   tip.description, content_hash)
+            if current:
+                changed_rows.append(row + (current[0],))
+                stats['updated'] += 1
+            else:
+                new_rows.append((tip.title,) + row)
+                stats['inserted'] += 1
+            tag_rows.append((tip.title, [tag_ids[t] for t in dict.fromkeys(tip.tags or [])]))
+
+        # Anything left in `existing` is gone from the corpus
+        conn.executemany('DELETE FROM tips WHERE id = ?', [(row_id,) for row_id, _ in existing.values()])
+        stats['deleted'] = len(existing)
+
+        conn.executemany('UPDATE tips SET file = ?, line = ? WHERE id = ?', moved_rows)
+        conn.executemany('''UPDATE tips SET tip_id = ?, alias = ?, category_id = ?, file = ?, line = ?,
+                            body = ?, code = ?, description = ?, content_hash = ? WHERE id = ?''', changed_rows)
+        conn.executemany('''INSERT INTO tips(title, tip_id, alias, category_id, file, line, body, code,
+                            description, content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', new_rows)
+
+        # Replace tag links for written tips
+        tip_ids = {title: row_id for row_id, title in conn.execute('SELECT id, title FROM tips')}
+        conn.executemany('DELETE FROM tip_tags WHERE tip_id = ?', [(tip_ids[title],) for title, _ in tag_rows])
+        conn.executemany('INSERT INTO tip_tags(tip_id, tag_id) VALUES (?, ?)',
+                         [(tip_ids[title], tag_id) for title, ids in tag_rows for tag_id in ids])
+
+        # Drop lookups no tip references anymore
+        conn.execute('DELETE FROM tags WHERE id NOT IN (SELECT tag_id FROM tip_tags)')
+        conn.execute('DELETE FROM categories WHERE id NOT IN '
+                     '(SELECT category_id FROM tips WHERE category_id IS NOT NULL)')
+
+    return stats
+
+
+def quote_terms(text: str) -> str:
+    """Quote every term as an FTS5 string, keeping AND/OR/NOT (for text like vim.keymap.set)"""
+    return ' '.join(term if term in ('AND', 'OR', 'NOT') else '"' + term.replace('"', '""') + '"'
+                    for term in text.split())
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = 10,
+           category: Optional[str] = None, tag: Optional[str] = None) -> List[tuple]:
+    """Ranked full-text search (bm25, title weighted highest)"""
+    sql = '''SELECT t.tip_id, t.title, c.name, t.file, t.line, bm25(tips_fts, 10.0, 1.0, 2.0) AS rank,
+                    snippet(tips_fts, 1, '[', ']', '…', 12)
+             FROM tips_fts
+             JOIN tips t ON t.id = tips_fts.rowid
+             LEFT JOIN categories c ON c.id = t.category_id
+             WHERE tips_fts MATCH ?'''
+    params: list = [text]
+    if category:
+        sql += ' AND c.name = ? COLLATE NOCASE'
+        params.append(category)
+    if tag:
+        sql += ''' AND t.id IN (SELECT tt.tip_id FROM tip_tags tt JOIN tags g ON g.id = tt.tag_id
+                               WHERE g.name = ? COLLATE NOCASE)'''
+        params.append(tag)
+    sql += ' ORDER BY rank LIMIT ?'
+    params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export tips to SQLite with FTS5 search')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--db', type=Path, default=Path('scripts/tips.db'),
+                        help='SQLite database file')
+    parser.add_argument('--query', type=str, default=None,
+                        help='FTS5 query to run instead of exporting (e.g. "register NOT macro")')
+    parser.add_argument('--category', type=str, default=None,
+                        help='Restrict --query to a category')
+    parser.add_argument('--tag', type=str, default=None,
+                        help='Restrict --query to a tag')
+    parser.add_argument('--limit', type=int, default=10,
+                        help='Maximum number of results for --query')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('export_sqlite', args)
+
+    conn = connect(args.db)
+    if args.query is not None:
+        with metrics.stage('search'):
+            try:
+                results = search(conn, args.query, args.limit, args.category, args.tag)
+            except sqlite3.OperationalError as e:
+                # Not valid FTS5 syntax (e.g. '.' or ':' in a term): search the terms literally
+                quoted = quote_terms(args.query)
+                print(f"⚠️  {e}; searching for {quoted}")
+                try:
+                    results = search(conn, quoted, args.limit, args.category, args.tag)
+                except sqlite3.OperationalError as e:
+                    print(f"❌ Query failed: {e}")
+                    results = []
+        metrics.count('results', len(results))
+        for tip_id, title, category, file, line, rank, snippet in results:
+            print(f"{rank:7.2f}  {tip_id}  {title}  [{category or '-'}]  {file}:{line}")
+            print(f"         {snippet}")
+        print(f"\n{len(results)} result(s)")
+    else:
+        with metrics.stage('load'):
+            tips = load_corpus(args.data_dir)
+        with metrics.stage('export'):
+            stats = export_tips(conn, tips)
+        for key, value in stats.items():
+            metrics.count(key, value)
+        print(f"✓ Exported to {args.db}: {stats['inserted']} inserted, {stats['updated']} updated, "
+              f"{stats['unchanged']} unchanged, {stats['deleted']} deleted")
+    conn.close()
+    metrics.write()
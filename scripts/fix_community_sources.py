@@ -7,12 +7,21 @@ To: **Source:** Community contributed
 
 import re
 from pathlib import Path
+from typing import Tuple
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+
+PATTERN = re.compile(r'\*\*Source:\*\* \*\* Community contributed')
+
+
+def fix_lines(content: str) -> Tuple[str, int]:
+    """Content with community source lines fixed, and the number of lines fixed"""
+    return PATTERN.subn('**Source:** Community contributed', content)
+
 
 def fix_community_sources(data_dir: Path, dry_run: bool = False):
     """Fix community contributed source lines"""
 
-    pattern = re.compile(r'\*\*Source:\*\* \*\* Community contributed')
-
     files_modified = 0
     lines_fixed = 0
 
@@ -20,23 +29,20 @@ def fix_community_sources(data_dir: Path, dry_run: bool = False):
         with open(md_file, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        # Find all matches
-        matches = pattern.findall(content)
-        if not matches:
-            continue
-
         # Replace with clean format
-        new_content = pattern.sub('**Source:** Community contributed', content)
+        new_content, fixed = fix_lines(content)
+        if not fixed:
+            continue
 
         if dry_run:
-            print(f"Would fix {len(matches)} line(s) in {md_file.name}")
+            print(f"Would fix {fixed} line(s) in {md_file.name}")
         else:
             with open(md_file, 'w', encoding='utf-8') as f:
                 f.write(new_content)
-            print(f"✓ Fixed {len(matches)} line(s) in {md_file.name}")
+            print(f"✓ Fixed {fixed} line(s) in {md_file.name}")
 
         files_modified += 1
-        lines_fixed += len(matches)
+        lines_fixed += fixed
 
     print(f"\n{'Would fix' if dry_run else 'Fixed'} {lines_fixed} lines across {files_modified} files")
 
@@ -48,7 +54,11 @@ if __name__ == '__main__':
                         help='Directory containing tip files')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be changed without modifying files')
+    add_metrics_arguments(parser)
 
     args = parser.parse_args()
+    metrics = Metrics.from_args('fix_community_sources', args)
 
-    fix_community_sources(args.data_dir, dry_run=args.dry_run)
+    with metrics.stage('fix_community_sources'):
+        fix_community_sources(args.data_dir, dry_run=args.dry_run)
+    metrics.write()
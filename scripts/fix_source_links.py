@@ -7,13 +7,22 @@ To: **Source:** [vim.fandom.com](https://vim.fandom.com/wiki/...)
 
 import re
 from pathlib import Path
+from typing import Tuple
+
+from metrics import Metrics, add_arguments as add_metrics_arguments
+
+# Pattern to match: **Source:** ** https://vim.fandom.com/wiki/...
+PATTERN = re.compile(r'\*\*Source:\*\* \*\* (https://vim\.fandom\.com/wiki/\S+)')
+
+
+def fix_links(content: str) -> Tuple[str, int]:
+    """Content with source links fixed, and the number of links fixed"""
+    return PATTERN.subn(r'**Source:** [vim.fandom.com](\1)', content)
+
 
 def fix_source_links(data_dir: Path, dry_run: bool = False):
     """Fix all source links to use proper markdown format"""
 
-    # Pattern to match: **Source:** ** https://vim.fandom.com/wiki/...
-    pattern = re.compile(r'\*\*Source:\*\* \*\* (https://vim\.fandom\.com/wiki/\S+)')
-
     files_modified = 0
     links_fixed = 0
 
@@ -21,23 +30,20 @@ def fix_source_links(data_dir: Path, dry_run: bool = False):
         with open(md_file, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        # Find all matches
-        matches = pattern.findall(content)
-        if not matches:
-            continue
-
         # Replace with proper markdown links
-        new_content = pattern.sub(r'**Source:** [vim.fandom.com](\1)', content)
+        new_content, fixed = fix_links(content)
+        if not fixed:
+            continue
 
         if dry_run:
-            print(f"Would fix {len(matches)} link(s) in {md_file.name}")
+            print(f"Would fix {fixed} link(s) in {md_file.name}")
         else:
             with open(md_file, 'w', encoding='utf-8') as f:
                 f.write(new_content)
-            print(f"✓ Fixed {len(matches)} link(s) in {md_file.name}")
+            print(f"✓ Fixed {fixed} link(s) in {md_file.name}")
 
         files_modified += 1
-        links_fixed += len(matches)
+        links_fixed += fixed
 
     print(f"\n{'Would fix' if dry_run else 'Fixed'} {links_fixed} links across {files_modified} files")
 
@@ -49,7 +55,11 @@ if __name__ == '__main__':
                         help='Directory containing tip files')
     parser.add_argument('--dry-run', action='store_true',
                         help='Show what would be changed without modifying files')
+    add_metrics_arguments(parser)
 
     args = parser.parse_args()
+    metrics = Metrics.from_args('fix_source_links', args)
 
-    fix_source_links(args.data_dir, dry_run=args.dry_run)
+    with metrics.stage('fix_source_links'):
+        fix_source_links(args.data_dir, dry_run=args.dry_run)
+    metrics.write()
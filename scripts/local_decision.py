@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Local decision tier: settle clear-cut pairs without an AI call.
+
+Every candidate pair is scored on four signals:
+- cosine: embedding similarity from the candidate search
+- title: difflib ratio of the lowercased titles
+- code: containment of winnowed code fingerprints (code_fingerprints.py),
+  None unless both tips have vim or lua code
+- tags: Jaccard index of the tag sets, None unless both tips have tags
+
+A pair is a duplicate when cosine >= duplicate_cosine and the code matches,
+or neither tip has code and the titles nearly match. It is different when
+cosine < different_cosine, the tags are disjoint, the code (if any) barely
+overlaps and the titles differ. Everything else is left to AI verification.
+
+Each pair that reaches the AI is logged with its signals, the local verdict
+(or null) and the AI's verdict. A sample of locally decided pairs (--audit)
+is verified anyway, so the log measures how often the tier agrees with the
+AI. The log is appended to, so it accumulates across runs; the latest
+verdict per pair is used. Run this module on the log to see agreement per
+tier and how other cutoffs would have done:
+
+    python scripts/local_decision.py --log scripts/local_decisions.jsonl
+"""
+
+import difflib
+import json
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Hashable, Iterator, List, Optional, Set
+
+from code_fingerprints import fingerprint
+
+
+@dataclass
+class Cutoffs:
+    duplicate_cosine: float = 0.97
+    duplicate_code: float = 0.8
+    duplicate_title: float = 0.85
+    different_cosine: float = 0.8
+    different_code: float = 0.2
+    different_title: float = 0.5
+
+
+def title_similarity(title1: str, title2: str) -> float:
+    return difflib.SequenceMatcher(None, title1.lower(), title2.lower()).ratio()
+
+
+def tag_jaccard(tags1: List[str], tags2: List[str]) -> Optional[float]:
+    set1 = {tag.lower() for tag in tags1}
+    set2 = {tag.lower() for tag in tags2}
+    if not set1 or not set2:
+        return None
+    return len(set1 & set2) / len(set1 | set2)
+
+
+def code_overlap(prints1: Set[int], prints2: Set[int]) -> Optional[float]:
+    """Shared fingerprints over those of the tip with less code"""
+    if not prints1 or not prints2:
+        return None
+    return len(prints1 & prints2) / min(len(prints1), len(prints2))
+
+
+def decide(signals: Dict, cutoffs: Cutoffs) -> Optional[str]:
+    """'duplicate', 'different', or None when the pair needs AI verification"""
+    cosine, title, code, tags = signals['cosine'], signals['title'], signals['code'], signals['tags']
+    if cosine is None:
+        return None
+    if cosine >= cutoffs.duplicate_cosine:
+        if code is not None and code >= cutoffs.duplicate_code:
+            return 'duplicate'
+        if code is None and not signals['has_code'] and title >= cutoffs.duplicate_title:
+            return 'duplicate'
+    if (cosine < cutoffs.different_cosine and tags == 0.0 and title < cutoffs.different_title
+            and (code is None or code < cutoffs.different_code)):
+        return 'different'
+    return None
+
+
+class LocalDecider:
+    """Scores pairs, decides clear cases, and logs agreement with AI verdicts"""
+
+    def __init__(self, cutoffs: Optional[Cutoffs] = None, audit: float = 0.0,
+                 log_path: Optional[Path] = None):
+        self.cutoffs = cutoffs or Cutoffs()
+        self.audit = audit
+        self.fingerprints: Dict[Hashable, Set[int]] = {}
+        self.decided = {'duplicate': 0, 'different': 0}
+        self.audited = {'duplicate': [0, 0], 'different': [0, 0]}  # [agreed, total]
+        self._log = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+    def code_prints(self, tip) -> Set[int]:
+        if tip.id not in self.fingerprints:
+            self.fingerprints[tip.id] = fingerprint([('vim', tip.vimscript), ('lua', tip.lua)])
+        return self.fingerprints[tip.id]
+
+    def signals(self, tip1, tip2, cosine: Optional[float]) -> Dict:
+        prints1, prints2 = self.code_prints(tip1), self.code_prints(tip2)
+        code = code_overlap(prints1, prints2)
+        tags = tag_jaccard(tip1.tags, tip2.tags)
+        return {
+            'cosine': round(cosine, 4) if cosine is not None else None,
+            'title': round(title_similarity(tip1.title, tip2.title), 4),
+            'code': round(code, 4) if code is not None else None,
+            'tags': round(tags, 4) if tags is not None else None,
+            'has_code': bool(prints1 or prints2),
+        }
+
+    def should_audit(self, tip1, tip2) -> bool:
+        """Deterministic sample of decided pairs, stable across runs"""
+        if self.audit <= 0:
+            return False
+        key = '\x1f'.join(sorted((tip1.id, tip2.id)))
+        return zlib.crc32(key.encode('utf-8')) % 10_000 < self.audit * 10_000
+
+    def record(self, tip1, tip2, signals: Dict, local: Optional[str], remote: Dict):
+        """Log an AI-verified pair; audited local decisions count toward agreement"""
+        if local is not None:
+            # 'similar' is not a duplicate, so it agrees with 'different'
+            agreed = (remote['relationship'] == 'duplicate') == (local == 'duplicate')
+            self.audited[local][0] += int(agreed)
+            self.audited[local][1] += 1
+        if self._log is not None:
+            self._log.write(json.dumps({'tip1_id': tip1.id, 'tip2_id': tip2.id, **signals,
+                                        'local': local, 'remote': remote['relationship']}) + '\n')
+            self._log.flush()
+
+    def local_result(self, relationship: str, signals: Dict) -> Dict:
+        """A verify_with_ai-shaped result for a locally decided pair"""
+        self.decided[relationship] += 1
+        if relationship == 'duplicate':
+            reason = f"cosine {signals['cosine']}, code {signals['code']}, title {signals['title']}"
+        else:
+            reason = f"cosine {signals['cosine']}, disjoint tags, title {signals['title']}"
+        return {
+            'relationship': relationship,
+            'confidence': signals['cosine'] if relationship == 'duplicate' else round(1 - signals['cosine'], 4),
+            'reason': f'Decided locally: {reason}',
+            'recommendation': 'keep_first' if relationship == 'duplicate' else 'keep_both',
+            'decided_by': 'local',
+            'signals': signals,
+        }
+
+    def agreement(self) -> Dict[str, Optional[float]]:
+        return {tier: agreed / total if total else None for tier, (agreed, total) in self.audited.items()}
+
+    def report(self) -> str:
+        lines = [f"Decided locally: {self.decided['duplicate']} duplicate, {self.decided['different']} different"]
+        for tier, rate in self.agreement().items():
+            agreed, total = self.audited[tier]
+            if total:
+                lines.append(f"Audited {tier}: {agreed}/{total} agree with AI ({rate:.0%})")
+        return '\n'.join(lines)
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+
+
+def iter_log(path: Path) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def latest_records(records: Iterator[Dict]) -> List[Dict]:
+    """The last logged record of each pair, so repeated runs don't count a pair twice"""
+    latest = {}
+    for record in records:
+        latest[tuple(sorted((record['tip1_id'], record['tip2_id'])))] = record
+    return list(latest.values())
+
+
+def calibrate(records: List[Dict], cutoffs: Cutoffs) -> Dict[str, Dict[str, int]]:
+    """
+    How `cutoffs` would have decided the logged AI-verified pairs.
+
+    Only pairs that reached the AI are logged: locally decided pairs outside
+    the audit sample never are. Cutoffs looser than those of the logged runs
+    are therefore replayed on a biased sample, missing most of the pairs
+    they would newly decide; raise --audit before trusting them.
+    """
+    outcome = {tier: {'decided': 0, 'agreed': 0} for tier in ('duplicate', 'different')}
+    for record in records:
+        local = decide(record, cutoffs)
+        if local is None:
+            continue
+        outcome[local]['decided'] += 1
+        outcome[local]['agreed'] += int((record['remote'] == 'duplicate') == (local == 'duplicate'))
+    return outcome
+
+
+if __name__ == '__main__':
+    import argparse
+
+    defaults = Cutoffs()
+    parser = argparse.ArgumentParser(description='Agreement of local decisions with AI verdicts')
+    parser.add_argument('--log', type=Path, default=Path('scripts/local_decisions.jsonl'),
+                        help='Log written by dedup_hybrid.py --local-decisions')
+    for name, value in asdict(defaults).items():
+        parser.add_argument('--' + name.replace('_', '-'), type=float, default=value,
+                            help=f'Cutoff to evaluate (default: {value})')
+
+    args = parser.parse_args()
+    cutoffs = Cutoffs(**{name: getattr(args, name) for name in asdict(defaults)})
+
+    records = latest_records(iter_log(args.log))
+    logged = [record for record in records if record['local'] is not None]
+    print(f"✓ {len(records)} AI-verified pairs logged, {len(logged)} of them audited local decisions")
+    for tier in ('duplicate', 'different'):
+        audited = [record for record in logged if record['local'] == tier]
+        if audited:
+            agreed = sum(1 for r in audited if (r['remote'] == 'duplicate') == (tier == 'duplicate'))
+            print(f"  Logged {tier}: {agreed}/{len(audited)} agree ({agreed / len(audited):.0%})")
+
+    print(f"\nWith cutoffs {asdict(cutoffs)}:")
+    for tier, counts in calibrate(records, cutoffs).items():
+        rate = counts['agreed'] / counts['decided'] if counts['decided'] else 0.0
+        print(f"  {tier:<10} would decide {counts['decided']:>5} pairs, {counts['agreed']} agreeing ({rate:.0%})")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared run instrumentation: stage timers, counters, memory and profiles.
+
+    metrics = Metrics('build_search_index')
+    with metrics.stage('load'):
+        tips = load_corpus(data_dir)
+    metrics.count('tips', len(tips))
+    metrics.write(Path('metrics/build_search_index.json'))
+
+- stage(name): wall time and call count per named stage (nesting is fine;
+  a stage's time and memory peak include its children). With trace_memory,
+  the tracemalloc peak above the stage's starting allocation is recorded.
+  Stages may run in several threads at once (the dedup pipeline does). The
+  tracemalloc peak is process-wide, so a stage's peak then includes what
+  concurrent stages allocated.
+- count(name, n) / gauge(name, value): run counters and point values.
+- Peak RSS of the process is read from resource.getrusage where available.
+- profile_stages: stages to run under cProfile. Each writes a .prof file next
+  to the metrics file (load it with pstats or snakeviz) and its top functions
+  go into the JSON. Only one profiler runs at a time: a profiled stage that
+  starts while another is being profiled, nested or in another thread, runs
+  unprofiled.
+
+Scripts wire it up with add_arguments(parser) and Metrics.from_args(...),
+which adds --metrics PATH, --profile STAGE and --trace-memory. One JSON file
+per run lets runs be compared over time.
+"""
+
+import cProfile
+import io
+import json
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Metrics:
+    """Collect timings, counters and memory for one script run"""
+
+    def __init__(self, name: str, profile_stages: Iterable[str] = (), trace_memory: bool = False,
+                 output: Optional[Path] = None):
+        self.name = name
+        self.output = output
+        self.profile_stages = set(profile_stages)
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+
+        self.stages: Dict[str, Dict] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self._profilers: Dict[str, cProfile.Profile] = {}
+        # Thread whose stage owns the active profiler, if any
+        self._profiling_thread: Optional[int] = None
+        self._memory_stack: list = []
+        self._peak_traced = 0
+        self._lock = threading.Lock()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_args(cls, name: str, args) -> 'Metrics':
+        """Metrics configured by the options add_arguments() defines"""
+        return cls(name, profile_stages=args.profile or (), trace_memory=args.trace_memory,
+                   output=args.metrics)
+
+    @contextmanager
+    def stage(self, name: str):
+        profiler = None
+        if name in self.profile_stages:
+            # Only one cProfile can be active at a time: nested or concurrent requests are skipped
+            with self._lock:
+                if self._profiling_thread is None:
+                    self._profiling_thread = threading.get_ident()
+                    profiler = self._profilers.setdefault(name, cProfile.Profile())
+            if profiler is not None:
+                profiler.enable()
+        frame = None
+        if self.trace_memory:
+            frame = self._push_memory_frame()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                # Only the stage that enabled the profiler stops it
+                profiler.disable()
+                with self._lock:
+                    self._profiling_thread = None
+            peak = self._pop_memory_frame(frame) if frame is not None else None
+            with self._lock:
+                entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+                entry['seconds'] += elapsed
+                entry['calls'] += 1
+                if peak is not None:
+                    entry['peak_traced_bytes'] = max(entry.get('peak_traced_bytes', 0), peak)
+
+    def _fold_peak(self, peak: int):
+        # Open frames may belong to other threads and close in any order, so
+        # every one of them records the peak, not just the innermost
+        for frame in self._memory_stack:
+            frame[1] = max(frame[1], peak)
+
+    def _push_memory_frame(self) -> list:
+        # tracemalloc has one global peak: fold it into the open stages
+        # before resetting it for this one
+        with self._lock:
+            self._fold_peak(tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            frame = [tracemalloc.get_traced_memory()[0], 0]
+            self._memory_stack.append(frame)
+        return frame
+
+    def _pop_memory_frame(self, frame: list) -> int:
+        """Peak traced bytes above the stage's starting point"""
+        with self._lock:
+            peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+            self._peak_traced = max(self._peak_traced, peak)
+            self._memory_stack = [f for f in self._memory_stack if f is not frame]
+            self._fold_peak(peak)
+        return peak - frame[0]
+
+    def count(self, name: str, n: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def _profile_summary(self, name: str, profiler: cProfile.Profile, output: Optional[Path]) -> Dict:
+        """Top functions by cumulative time, dumping a .prof file next to `output`"""
+        entry: Dict = {}
+        if output is not None:
+            path = output.with_name(f'{output.stem}.{name}.prof')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            entry['file'] = str(path)
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        stats.sort_stats('cumulative')
+        entry['top'] = [
+            {'function': f'{file}:{line}({func})', 'calls': nc, 'total': round(tt, 6), 'cumulative': round(ct, 6)}
+            for (file, line, func), (_, nc, tt, ct, _) in
+            sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+        ]
+        return entry
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_dict(self, output: Optional[Path] = None) -> Dict:
+        data = {
+            'script': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'argv': sys.argv[1:],
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seconds': round(self.elapsed, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': {name: {**entry, 'seconds': round(entry['seconds'], 6)}
+                       for name, entry in self.stages.items()},
+            'counters': self.counters,
+            'gauges': self.gauges,
+        }
+        if self.trace_memory:
+            data['peak_traced_bytes'] = max(self._peak_traced, tracemalloc.get_traced_memory()[1])
+        if self._profilers:
+            data['profiles'] = {name: self._profile_summary(name, profiler, output)
+                                for name, profiler in self._profilers.items()}
+        return data
+
+    def write(self, path: Optional[Path] = None) -> Optional[Path]:
+        """Write the JSON metrics file (to `path` or the configured output)"""
+        path = path or self.output
+        if path is None:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(path), f, indent=2)
+        return path
+
+    def report(self) -> str:
+        lines = [f"{'Stage':<40} {'Calls':>6} {'Seconds':>10}"]
+        for name, entry in self.stages.items():
+            lines.append(f"{name:<40} {entry['calls']:>6} {entry['seconds']:>9.3f}s")
+        lines.append(f"{'total':<40} {'':>6} {self.elapsed:>9.3f}s")
+        for name, value in {**self.counters, **self.gauges}.items():
+            lines.append(f"{name:<40} {value:>17,}")
+        rss = peak_rss_bytes()
+        if rss is not None:
+            lines.append(f"{'peak RSS':<40} {rss / 2 ** 20:>15.1f}MB")
+        return '\n'.join(lines)
+
+
+def add_arguments(parser):
+    """Add --metrics, --profile and --trace-memory to a script's argparse parser"""
+    parser.add_argument('--metrics', type=Path, default=None,
+                        help='Write run metrics (stage times, counters, memory) to this JSON file')
+    parser.add_argument('--profile', action='append', default=None, metavar='STAGE',
+                        help='Run a named stage under cProfile (repeatable; needs --metrics to keep .prof files)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Record tracemalloc peaks per stage (slows the run down)')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline over bounded queues.
+
+Each stage runs in its own thread and hands its output to the next stage
+through a queue of `queue_size` items, so a fast stage blocks (backpressure)
+instead of running ahead of a slow one. Every stage handles one item at a
+time, so results come out in input order. The last stage runs in the
+caller's thread as the results are iterated.
+
+    pipeline = Pipeline([('embed', embed), ('pairs', find_pairs), ('verify', verify)])
+    for result in pipeline.run(groups):
+        ...
+    print(pipeline.report())
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """Items handled and where a stage's time went"""
+    name: str
+    items: int = 0
+    busy: float = 0.0     # running the stage function
+    starved: float = 0.0  # waiting for input from the previous stage
+    blocked: float = 0.0  # waiting for room in the next stage's queue (backpressure)
+
+    @property
+    def throughput(self) -> float:
+        """Items per busy second"""
+        return self.items / self.busy if self.busy else 0.0
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Pipeline:
+    """Run items through named stage functions, overlapping the stages"""
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any]]], queue_size: int = 2):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.metrics = [StageMetrics(name) for name, _ in stages]
+
+    def _worker(self, fn, metrics: StageMetrics, inbox: queue.Queue, outbox: queue.Queue,
+                stop: threading.Event):
+        while True:
+            start = time.perf_counter()
+            item = inbox.get()
+            metrics.starved += time.perf_counter() - start
+            if item is _DONE or isinstance(item, _Failure) or stop.is_set():
+                outbox.put(item)
+                return
+            start = time.perf_counter()
+            try:
+                output = fn(item)
+            except BaseException as e:
+                outbox.put(_Failure(e))
+                return
+            metrics.busy += time.perf_counter() - start
+            metrics.items += 1
+            start = time.perf_counter()
+            outbox.put(output)
+            metrics.blocked += time.perf_counter() - start
+
+    def _feed(self, items: Iterable, first: queue.Queue, stop: threading.Event):
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                first.put(item)
+        except BaseException as e:
+            first.put(_Failure(e))
+            return
+        first.put(_DONE)
+
+    def run(self, items: Iterable) -> Iterator:
+        """Yield the last stage's output for each item, in input order"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], stop), daemon=True)]
+        for k, (_, fn) in enumerate(self.stages[:-1]):
+            threads.append(threading.Thread(
+                target=self._worker, args=(fn, self.metrics[k], queues[k], queues[k + 1], stop),
+                daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # Last stage in the caller's thread
+        _, last = self.stages[-1]
+        metrics = self.metrics[-1]
+        try:
+            while True:
+                start = time.perf_counter()
+                item = queues[-1].get()
+                metrics.starved += time.perf_counter() - start
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                start = time.perf_counter()
+                output = last(item)
+                metrics.busy += time.perf_counter() - start
+                metrics.items += 1
+                yield output
+        finally:
+            stop.set()
+            # Unblock upstream threads waiting on a full queue
+            for q in queues:
+                while not q.empty():
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+            for thread in threads:
+                thread.join(timeout=1.0)
+
+    def report(self) -> str:
+        lines = [f"{'Stage':<12} {'Items':>7} {'Busy':>9} {'Starved':>9} {'Blocked':>9} {'Items/s':>9}"]
+        for m in self.metrics:
+            lines.append(f"{m.name:<12} {m.items:>7,} {m.busy:>8.2f}s {m.starved:>8.2f}s "
+                         f"{m.blocked:>8.2f}s {m.throughput:>9,.1f}")
+        return '\n'.join(lines)
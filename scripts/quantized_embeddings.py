@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Compact embedding storage and quantized cosine similarity.
+
+Embeddings are L2-normalized once, so cosine similarity is a plain dot
+product, and then stored as:
+
+- float32: reference precision (what sklearn's cosine_similarity sees)
+- float16: half the memory, upcast per block when computing similarity
+- int8:    a quarter of the memory; each row is scaled to [-127, 127] and
+           dot products are computed exactly, then rescaled
+
+Similarity is computed block by block: only one block of rows and one of
+columns is upcast at a time, so the savings hold while computing, not just
+at rest. similar() keeps only the pairs above a threshold.
+
+Sparse TF-IDF vectors (dedup_hybrid's fallback without a model) get the same
+storage precisions on their non-zero values; see quantize_sparse().
+"""
+
+from typing import Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+
+class QuantizedEmbeddings:
+    """Row-normalized embedding matrix in float32, float16 or int8"""
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray], precision: str):
+        self.data = data
+        self.scales = scales
+        self.precision = precision
+
+    @classmethod
+    def from_embeddings(cls, embeddings, precision: str = 'float32') -> 'QuantizedEmbeddings':
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision} (expected one of {', '.join(PRECISIONS)})")
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        unit = matrix / norms
+
+        if precision == 'float32':
+            return cls(unit, None, precision)
+        if precision == 'float16':
+            return cls(unit.astype(np.float16), None, precision)
+
+        peak = np.abs(unit).max(axis=1, keepdims=True)
+        peak[peak == 0] = 1.0
+        quantized = np.rint(unit / peak * 127).astype(np.int8)
+        return cls(quantized, (peak / 127).astype(np.float32).ravel(), precision)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the stored vectors (and int8 scales)"""
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    @property
+    def _dot_dtype(self):
+        if self.precision == 'int8':
+            # Sums of d products of at most 127^2 stay exact in float32 below 2^24,
+            # so int8 blocks can use BLAS instead of numpy's integer matmul
+            return np.float32 if self.data.shape[1] * 127 * 127 < 2 ** 24 else np.float64
+        return np.float32
+
+    def _blocks(self, rows: np.ndarray, block: int) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """(row offset, column offset, similarity block) over rows x every vector
+
+        Only one block of each side is upcast at a time, so peak memory stays
+        near the stored size plus two blocks.
+        """
+        dtype = self._dot_dtype
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            left = self.data[chunk].astype(dtype)
+            for col in range(0, len(self), block):
+                dots = left @ self.data[col:col + block].astype(dtype).T
+                if self.precision == 'int8':
+                    dots *= self.scales[chunk, None]
+                    dots *= self.scales[None, col:col + block]
+                yield start, col, dots.astype(np.float32, copy=False)
+
+    def similarity(self, rows: Optional[Sequence[int]] = None, block: int = 1024) -> np.ndarray:
+        """Cosine similarity of `rows` (default: all) against every vector, as float32
+
+        The result is dense; use similar() to keep only pairs above a threshold.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        result = np.empty((len(rows), len(self)), dtype=np.float32)
+        for start, col, sims in self._blocks(rows, block):
+            result[start:start + sims.shape[0], col:col + sims.shape[1]] = sims
+        return result
+
+    def similar(self, threshold: float, rows: Optional[Sequence[int]] = None,
+                block: int = 1024) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(row positions, columns, similarities) at or above threshold, block by block
+
+        Row positions index `rows` (default: all). No similarity matrix is kept.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        hit_rows, hit_cols, hit_sims = [], [], []
+        for start, col, sims in self._blocks(rows, block):
+            r, c = np.nonzero(sims >= threshold)
+            hit_rows.append(r + start)
+            hit_cols.append(c + col)
+            hit_sims.append(sims[r, c])
+        if not hit_rows:
+            return np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0, np.float32)
+        return np.concatenate(hit_rows), np.concatenate(hit_cols), np.concatenate(hit_sims)
+
+    def pair_similarity(self, left: Sequence[int], right: Sequence[int], block: int = 65536) -> np.ndarray:
+        """Cosine similarity of each (left[k], right[k]) pair only, as float32"""
+        left = np.asarray(left, dtype=np.intp)
+        right = np.asarray(right, dtype=np.intp)
+        result = np.empty(len(left), dtype=np.float32)
+
+        for start in range(0, len(left), block):
+            a, b = left[start:start + block], right[start:start + block]
+            if self.precision == 'int8':
+                dots = np.einsum('ij,ij->i', self.data[a].astype(np.int32), self.data[b].astype(np.int32))
+                result[start:start + len(a)] = dots * self.scales[a] * self.scales[b]
+            else:
+                result[start:start + len(a)] = np.einsum('ij,ij->i', self.data[a].astype(np.float32),
+                                                         self.data[b].astype(np.float32))
+        return result
+
+
+def pairs_above(similarity: np.ndarray, threshold: float) -> Set[Tuple[int, int]]:
+    """Index pairs (i < j) of a square similarity matrix at or above threshold"""
+    upper = np.triu(similarity >= threshold, k=1)
+    return set(zip(*map(lambda a: a.tolist(), np.nonzero(upper))))
+
+
+def similar_pairs(store: QuantizedEmbeddings, threshold: float) -> Set[Tuple[int, int]]:
+    """Index pairs (i < j) of a store at or above threshold, without the full matrix"""
+    rows, cols, _ = store.similar(threshold)
+    upper = rows < cols
+    return set(zip(rows[upper].tolist(), cols[upper].tolist()))
+
+
+def quantize_sparse(matrix, precision: str):
+    """
+    A row-normalized sparse matrix with its values stored at `precision`.
+
+    Returns the matrix with those values upcast back to float32 (only the n x n
+    product is ever made dense) and the bytes the stored form would take.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision} (expected one of {', '.join(PRECISIONS)})")
+
+    matrix = matrix.tocsr().astype(np.float32)
+    row_of = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=matrix.data.astype(np.float64) ** 2, minlength=matrix.shape[0]))
+    norms[norms == 0] = 1.0
+    matrix.data /= norms[row_of].astype(np.float32)
+    index_bytes = matrix.indices.nbytes + matrix.indptr.nbytes
+
+    if precision == 'float32':
+        return matrix, matrix.data.nbytes + index_bytes
+    if precision == 'float16':
+        stored = matrix.data.astype(np.float16)
+        matrix.data = stored.astype(np.float32)
+        return matrix, stored.nbytes + index_bytes
+
+    peak = np.zeros(matrix.shape[0], dtype=np.float32)
+    np.maximum.at(peak, row_of, np.abs(matrix.data))
+    peak[peak == 0] = 1.0
+    scales = (peak / 127).astype(np.float32)
+    stored = np.rint(matrix.data / scales[row_of]).astype(np.int8)
+    matrix.data = stored.astype(np.float32) * scales[row_of]
+    return matrix, stored.nbytes + scales.nbytes + index_bytes
+
+
+def compare_precisions(embeddings, threshold: float) -> List[dict]:
+    """Memory and candidate-pair recall of each precision against float32"""
+    reference = QuantizedEmbeddings.from_embeddings(embeddings, 'float32')
+    expected = similar_pairs(reference, threshold)
+
+    rows = []
+    for precision in PRECISIONS:
+        store = QuantizedEmbeddings.from_embeddings(embeddings, precision)
+        found = similar_pairs(store, threshold)
+        rows.append({
+            'precision': precision,
+            'bytes': store.nbytes,
+            'pairs': len(found),
+            'missed': len(expected - found),
+            'extra': len(found - expected),
+            'expected': len(expected),
+        })
+    return rows
+
+
+def compare_sparse_precisions(matrix, threshold: float) -> List[dict]:
+    """
+    compare_precisions for sparse (TF-IDF) vectors.
+
+    Hashed TF-IDF has 2^20 columns, so the vectors stay sparse and only the
+    n x n similarity product is made dense.
+    """
+    reference, _ = quantize_sparse(matrix, 'float32')
+    expected = pairs_above((reference @ reference.T).toarray(), threshold)
+
+    rows = []
+    for precision in PRECISIONS:
+        store, nbytes = quantize_sparse(matrix, precision)
+        found = pairs_above((store @ store.T).toarray(), threshold)
+        rows.append({
+            'precision': precision,
+            'bytes': nbytes,
+            'pairs': len(found),
+            'missed': len(expected - found),
+            'extra': len(found - expected),
+            'expected': len(expected),
+        })
+    return rows
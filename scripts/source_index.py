@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Canonical source-URL index: which tips were taken from the same page.
+
+Source URLs are normalized so links to one page compare equal:
+- scheme becomes https, the host is lowercased with any "www." and default
+  port dropped, and vim.wikia.com becomes vim.fandom.com
+- the fragment is dropped; the query is dropped for wiki pages, and sorted
+  with tracking parameters removed elsewhere
+- the path is unquoted and re-quoted, and trailing slashes are dropped.
+  MediaWiki titles also get spaces turned into underscores and a capital
+  first letter, and /index.php?title=X becomes /wiki/X
+
+Tips that share a canonical URL are strong duplicate candidates. The index is
+built in one pass, and candidate_pairs() yields them for verification
+without any embedding work.
+"""
+
+import re
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+_SOURCE_LINE_RE = re.compile(r'^\*\*Source:?\*\*:?(.*)$', re.MULTILINE)
+# Balanced parentheses stay in the URL: wiki titles like Easy_(un)commenting
+_URL_RE = re.compile(r'https?://(?:[^\s()<>\[\]"\']|\([^\s()]*\))+', re.IGNORECASE)
+
+HOST_ALIASES = {
+    'vim.wikia.com': 'vim.fandom.com',
+}
+WIKI_HOSTS = {'vim.fandom.com'}
+_TRACKING_PARAMS = re.compile(r'^(utm_.*|fbclid|gclid|ref)$')
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonical_url(url: str) -> str:
+    """Normalized form of a URL; links to the same page compare equal"""
+    parts = urlsplit(url.strip().rstrip('.,;'))
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    host = HOST_ALIASES.get(host, host)
+    if parts.port and parts.port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f'{host}:{parts.port}'
+
+    path = unquote(parts.path)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    if host in WIKI_HOSTS:
+        if path.rstrip('/').endswith('/index.php'):
+            title = dict(query).get('title')
+            if title:
+                path = f'/wiki/{title}'
+        query = []
+        if path.startswith('/wiki/'):
+            title = path[len('/wiki/'):].replace(' ', '_').strip('_')
+            path = '/wiki/' + title[:1].upper() + title[1:]
+    else:
+        query = sorted((k, v) for k, v in query if not _TRACKING_PARAMS.match(k))
+
+    path = re.sub(r'/{2,}', '/', path).rstrip('/') or ''
+    path = quote(path, safe="/:_-.,()~!*'@+")
+    return f'https://{host}{path}' + (f'?{urlencode(query)}' if query else '')
+
+
+def source_urls(text: str) -> List[str]:
+    """Canonical URLs on a tip's **Source:** lines (or in a bare source value)"""
+    lines = _SOURCE_LINE_RE.findall(text) or [text]
+    urls = []
+    for line in lines:
+        for url in _URL_RE.findall(line):
+            canonical = canonical_url(url)
+            if canonical not in urls:
+                urls.append(canonical)
+    return urls
+
+
+class SourceIndex:
+    """Canonical URL -> tips citing it, and the reverse"""
+
+    def __init__(self):
+        self.by_url: Dict[str, List[Hashable]] = defaultdict(list)
+        self.by_tip: Dict[Hashable, List[str]] = {}
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[Hashable, str]]) -> 'SourceIndex':
+        """Index (key, tip text or source value) pairs in one pass"""
+        index = cls()
+        for key, text in items:
+            index.add(key, text)
+        return index
+
+    def add(self, key: Hashable, text: str):
+        urls = source_urls(text)
+        self.by_tip[key] = urls
+        for url in urls:
+            self.by_url[url].append(key)
+
+    def groups(self, min_size: int = 2) -> Dict[str, List[Hashable]]:
+        """Tips grouped by the page they came from"""
+        return {url: keys for url, keys in self.by_url.items() if len(keys) >= min_size}
+
+    def candidate_pairs(self, max_group: Optional[int] = None,
+                        involving: Optional[Set[Hashable]] = None) -> Iterator[Tuple[Hashable, Hashable, str]]:
+        """
+        Each pair of tips sharing a source once, with the URL that links them.
+
+        Groups larger than max_group (hub pages cited everywhere) are skipped.
+        With `involving`, only pairs with at least one of those tips are yielded.
+        """
+        seen = set()
+        for url, keys in self.groups().items():
+            if max_group is not None and len(keys) > max_group:
+                continue
+            for a, b in combinations(keys, 2):
+                if a == b or (involving is not None and a not in involving and b not in involving):
+                    continue
+                pair = (a, b) if str(a) <= str(b) else (b, a)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield a, b, url
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from pathlib import Path
+
+    from tip_corpus import load_corpus
+
+    parser = argparse.ArgumentParser(description='Group tips by canonical source URL')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Write {url: [tip ids]} for shared sources as JSON')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Number of largest groups to list')
+
+    args = parser.parse_args()
+
+    tips = load_corpus(args.data_dir)
+    by_id = {tip.tip_id: tip for tip in tips}
+    index = SourceIndex.build((tip.tip_id, tip.description) for tip in tips)
+    groups = index.groups()
+    cross_file = [url for url, ids in groups.items() if len({by_id[i].file for i in ids}) > 1]
+
+    print(f"✓ {len(index.by_url)} distinct sources across {sum(1 for u in index.by_tip.values() if u)} tips")
+    print(f"✓ {len(groups)} sources cited by 2+ tips ({len(cross_file)} across files), "
+          f"{sum(1 for _ in index.candidate_pairs())} candidate pairs")
+    for url, ids in sorted(groups.items(), key=lambda item: -len(item[1]))[:args.top]:
+        print(f"\n  {url} ({len(ids)} tips)")
+        for tip_id in ids:
+            print(f"    {tip_id}  {by_id[tip_id].file}  {by_id[tip_id].title}")
+
+    if args.output:
+        args.output.write_text(json.dumps(groups, indent=2) + '\n', encoding='utf-8')
+        print(f"\n✓ Wrote {args.output}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Scale the real data/*.md corpus up for benchmarks.
+
+Copy k of the corpus keeps the original file format and tip bodies, but
+titles get a " [k]" suffix so they stay unique. Copy 0 is the corpus as is.
+Two knobs make the copies exercise the slow paths too:
+
+- duplicate_rate: fraction of tips in later copies that keep their
+  original title, giving remove_duplicates cross-file duplicates to resolve
+- broken_source_rate: fraction of source lines rewritten to the old
+  "**Source:** ** ..." forms that the fix_* scripts repair
+
+layout='files' writes one file per data file and copy, so a 10x corpus has
+10x the files. layout='tips' appends the copies to the original files
+instead, so each file is 10x larger and per-file pair finding grows
+quadratically.
+"""
+
+import random
+import re
+from pathlib import Path
+from typing import Dict
+
+from tip_corpus import tip_files
+
+_TITLE_RE = re.compile(r'^(# Title:.*?)[ \t]*$', re.MULTILINE)
+_FANDOM_SOURCE_RE = re.compile(r'^\*\*Source:\*\* \[vim\.fandom\.com\]\((\S+)\)$', re.MULTILINE)
+_COMMUNITY_SOURCE = '**Source:** Community contributed'
+
+LAYOUTS = ('files', 'tips')
+
+
+def scale_content(content: str, copy: int, rng: random.Random,
+                  duplicate_rate: float = 0.02, broken_source_rate: float = 0.05) -> str:
+    """One copy of a data file; copy 0 is returned unchanged"""
+    if copy == 0:
+        return content
+
+    def title(match: re.Match) -> str:
+        if rng.random() < duplicate_rate:
+            return match.group(1)
+        return f'{match.group(1)} [{copy}]'
+
+    def fandom(match: re.Match) -> str:
+        if rng.random() < broken_source_rate:
+            return f'**Source:** ** {match.group(1)}'
+        return match.group(0)
+
+    content = _TITLE_RE.sub(title, content)
+    content = _FANDOM_SOURCE_RE.sub(fandom, content)
+    lines = content.split('\n')
+    for i, line in enumerate(lines):
+        if line == _COMMUNITY_SOURCE and rng.random() < broken_source_rate:
+            lines[i] = '**Source:** ** Community contributed'
+    return '\n'.join(lines)
+
+
+def generate_corpus(data_dir: Path, output_dir: Path, scale: int, layout: str = 'files',
+                    duplicate_rate: float = 0.02, broken_source_rate: float = 0.05,
+                    seed: int = 0) -> Dict[str, int]:
+    """Write a corpus `scale` times the size of data_dir, returning file/tip/byte counts"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout} (expected one of {', '.join(LAYOUTS)})")
+
+    rng = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stats = {'files': 0, 'tips': 0, 'bytes': 0}
+
+    for path in tip_files(data_dir):
+        content = path.read_text(encoding='utf-8')
+        copies = [scale_content(content, k, rng, duplicate_rate, broken_source_rate)
+                  for k in range(scale)]
+
+        if layout == 'files':
+            outputs = {path.name if k == 0 else f'{path.stem}_x{k}.md': text
+                       for k, text in enumerate(copies)}
+        else:
+            separator = '' if content.endswith('\n') else '\n'
+            outputs = {path.name: separator.join(copies)}
+
+        for name, text in outputs.items():
+            data = text.encode('utf-8')
+            (output_dir / name).write_bytes(data)
+            stats['files'] += 1
+            stats['tips'] += len(_TITLE_RE.findall(text))
+            stats['bytes'] += len(data)
+
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a scaled-up synthetic tip corpus')
+    parser.add_argument('output_dir', type=Path, help='Directory to write the corpus to')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--scale', type=int, default=10,
+                        help='Corpus size as a multiple of data/ (e.g. 10 or 100)')
+    parser.add_argument('--layout', choices=LAYOUTS, default='files',
+                        help='files: more files of the same size; tips: same files, more tips each')
+    parser.add_argument('--duplicate-rate', type=float, default=0.02,
+                        help='Fraction of copied tips that keep their original title')
+    parser.add_argument('--broken-source-rate', type=float, default=0.05,
+                        help='Fraction of source lines written in the old broken format')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed')
+
+    args = parser.parse_args()
+
+    stats = generate_corpus(args.data_dir, args.output_dir, args.scale, args.layout,
+                            args.duplicate_rate, args.broken_source_rate, args.seed)
+    print(f"✓ Wrote {stats['files']} files with {stats['tips']:,} tips "
+          f"({stats['bytes']:,} bytes) to {args.output_dir}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Shared tip corpus parser for build-time tooling.
+
+Parses data/*.md exactly the way the plugin's Lua loader does
+(lua/neovim_tips/loader.lua, parse_tip_blocks), so anything generated
+from this module has the same shape and contents the editor would build.
+"""
+
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Lua's %s class (no unicode whitespace)
+_WS = '[ \\t\\n\\r\\f\\v]'
+_TITLE_RE = re.compile(rf'^#{_WS}*Title:{_WS}*(.+)')
+_CATEGORY_RE = re.compile(rf'^#{_WS}*Category:{_WS}*(.+)')
+_TAGS_RE = re.compile(rf'^#{_WS}*Tags:{_WS}*(.+)')
+_TAG_SPLIT_RE = re.compile(rf',{_WS}*')
+_LUA_WS = ' \t\n\r\f\v'
+_ALIAS_RE = re.compile(r'[^a-z0-9]+')
+_CODE_BLOCK_RE = re.compile(r'^```([^\n`]*)\n(.*?)^```', re.DOTALL | re.MULTILINE)
+
+
+@dataclass
+class CorpusTip:
+    """A tip in the shape the Lua loader produces"""
+    title: Optional[str]
+    category: Optional[str] = None
+    tags: Optional[List[str]] = None
+    description: str = ''
+    file: str = ''
+    line: int = 0
+
+    def to_plugin_dict(self) -> dict:
+        """Fields stored in the plugin's tips table"""
+        tip = {'title': self.title, 'is_user_tip': False}
+        if self.category is not None:
+            tip['category'] = self.category
+        if self.tags is not None:
+            tip['tags'] = list(self.tags)
+        tip['description'] = self.description
+        return tip
+
+    @property
+    def tip_id(self) -> str:
+        """Stable content-addressed id (see stable_tip_id)"""
+        return stable_tip_id(self.title or '', self.description)
+
+    @property
+    def alias(self) -> str:
+        """Human-readable id derived from the title"""
+        return title_alias(self.title or '')
+
+    def content_hash(self) -> str:
+        """Hash of everything the plugin shows for this tip"""
+        text = '\x1f'.join([self.title or '', self.category or '',
+                            ','.join(self.tags or []), self.description])
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def normalize_content(text: str) -> str:
+    """Canonical form used for ids: NFC, LF line ends, no trailing or repeated blank space"""
+    text = unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n')
+    lines = []
+    for line in text.split('\n'):
+        line = line.rstrip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return '\n'.join(lines).strip()
+
+
+def stable_tip_id(title: str, description: str) -> str:
+    """
+    Content-addressed tip id.
+
+    Derived from the normalized title and description only, so it survives
+    moving a tip, reordering a file, retagging or recategorizing it, and
+    changes only when the tip's own text does. Exact duplicates share an id.
+    """
+    text = normalize_content(title) + '\n\x1f\n' + normalize_content(description)
+    return 'tip_' + hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def title_alias(title: str) -> str:
+    """Slug of the title, e.g. 'Delete without affecting register' -> 'delete-without-affecting-register'"""
+    folded = unicodedata.normalize('NFKD', title).encode('ascii', 'ignore').decode('ascii')
+    return _ALIAS_RE.sub('-', folded.lower()).strip('-')
+
+
+def tip_identity(section: str) -> Tuple[str, str]:
+    """(tip_id, alias) for a raw tip section, as split by any of the scripts"""
+    tips = parse_tip_blocks(section + '\n***\n')
+    if tips:
+        return tips[0].tip_id, tips[0].alias
+    return stable_tip_id('', section), ''
+
+
+def code_blocks(text: str) -> List[Tuple[str, str]]:
+    """Fenced code blocks in text as (language, code) pairs"""
+    return [(lang.strip().lower(), code.rstrip('\n'))
+            for lang, code in _CODE_BLOCK_RE.findall(text)]
+
+
+def strip_code_blocks(text: str) -> str:
+    """Text with fenced code blocks removed"""
+    return _CODE_BLOCK_RE.sub('', text)
+
+
+def lua_trim(text: str) -> str:
+    """Equivalent of utils.trim (Lua %s whitespace only)"""
+    return text.strip(_LUA_WS)
+
+
+def split_lines(content: str) -> List[str]:
+    """Split like content:gmatch("([^\\r\\n]*)\\r?\\n?") in the loader"""
+    return content.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+
+
+def parse_tip_blocks(content: str, file_name: str = '',
+                     titles_seen: Optional[set] = None,
+                     duplicates: Optional[List[CorpusTip]] = None) -> List[CorpusTip]:
+    """
+    Parse tip blocks from markdown content.
+
+    titles_seen is shared across files, like the loader's module-level
+    table: a repeated title is skipped and, if given, recorded in duplicates.
+    """
+    if titles_seen is None:
+        titles_seen = set()
+
+    parsed_tips = []
+    # Mirrors the loader's `current` table: fields may be set before a title
+    current = CorpusTip(None)
+    body_lines: List[str] = []
+
+    for line_number, line in enumerate(split_lines(content), 1):
+        # Every field line starts with '#'; skip the regexes for body lines
+        is_field = line[:1] == '#'
+        title = _TITLE_RE.match(line) if is_field else None
+        category = _CATEGORY_RE.match(line) if is_field and not title else None
+        tags = _TAGS_RE.match(line) if is_field and not (title or category) else None
+
+        if title:
+            title_text = lua_trim(title.group(1))
+            if title_text in titles_seen:
+                if duplicates is not None:
+                    duplicates.append(CorpusTip(title_text, file=file_name, line=line_number))
+                current = CorpusTip(None)
+            else:
+                current.title = title_text
+                current.file = file_name
+                current.line = line_number
+                titles_seen.add(title_text)
+        elif category:
+            current.category = lua_trim(category.group(1))
+        elif tags:
+            tag_list = [lua_trim(t) for t in _TAG_SPLIT_RE.split(tags.group(1))]
+            current.tags = [t for t in tag_list if t != '']
+        elif line == '---':
+            body_lines = []
+        elif line == '***' or line == '===':
+            current.description = lua_trim('\n'.join(body_lines))
+            if current.title is not None:
+                parsed_tips.append(current)
+            current = CorpusTip(None)
+            body_lines = []
+        elif current.title is not None:
+            body_lines.append(line)
+
+    return parsed_tips
+
+
+def tip_files(data_dir: Path) -> List[Path]:
+    """Markdown tip files in a stable order"""
+    return sorted(p for p in data_dir.glob('*.md') if p.is_file())
+
+
+def file_stamp(data: bytes) -> Dict[str, object]:
+    """Size and SHA-256 of a data file's bytes, as the plugin checks them"""
+    return {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+
+
+def data_file_stamps(data_dir: Path) -> Dict[str, Dict[str, object]]:
+    """Stamp of every tip file, recorded in generated files to detect stale ones"""
+    return {p.name: file_stamp(p.read_bytes()) for p in tip_files(data_dir)}
+
+
+def load_corpus(data_dir: Path, duplicates: Optional[List[CorpusTip]] = None) -> List[CorpusTip]:
+    """Parse every tip file in data_dir with loader semantics"""
+    titles_seen = set()
+    tips = []
+    for file_path in tip_files(data_dir):
+        content = file_path.read_text(encoding='utf-8')
+        tips.extend(parse_tip_blocks(content, file_path.name, titles_seen, duplicates))
+    return tips
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Random-access store for single tips without parsing whole files.
+
+TipStore memory-maps every data/*.md file and keeps a byte-offset index of
+each tip (from its "# Title:" line up to the "***" separator). Looking a
+tip up returns a TipView over the mapped bytes; nothing is copied or decoded
+until .text (or .parse()) is used. Tip ids hash the whole tip, so they are
+computed on first lookup by id, not while indexing.
+
+refresh() re-indexes only files whose size or mtime changed, and drops or
+adds files that were removed or created. Views taken before a file changed
+are stale: they see whatever the mapping holds now.
+
+    store = TipStore(Path('data'))
+    view = store.get('Delete without affecting register')
+    print(view.text)
+"""
+
+import mmap
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from tip_corpus import CorpusTip, parse_tip_blocks, tip_identity, title_alias
+
+_TITLE_RE = re.compile(rb'^#[ \t]*Title:[ \t]*(.*?)[ \t\r]*$', re.MULTILINE)
+_SEPARATOR_RE = re.compile(rb'^\*\*\*\r?$', re.MULTILINE)
+
+
+@dataclass
+class TipSpan:
+    """Location of one tip inside a mapped file"""
+    title: str
+    alias: str
+    file: str
+    start: int
+    end: int
+    # Filled in by TipStore.tip_id()
+    tip_id: Optional[str] = None
+
+
+class TipView:
+    """Zero-copy view of a tip; bytes are decoded only on access"""
+
+    def __init__(self, span: TipSpan, buffer: memoryview):
+        self.span = span
+        self.raw = buffer
+
+    @property
+    def title(self) -> str:
+        return self.span.title
+
+    @property
+    def text(self) -> str:
+        return str(self.raw, 'utf-8')
+
+    def parse(self) -> CorpusTip:
+        """Parse the tip with the plugin loader's rules"""
+        tips = parse_tip_blocks(self.text + '\n***\n', self.span.file)
+        return tips[0] if tips else CorpusTip(self.span.title, file=self.span.file)
+
+    def release(self):
+        """Release the buffer so the file can be remapped"""
+        self.raw.release()
+
+
+class _MappedFile:
+    """One memory-mapped data file and the spans of its tips"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        stat = path.stat()
+        self.signature = (stat.st_size, stat.st_mtime_ns)
+        self.spans: List[TipSpan] = []
+        self.map: Optional[mmap.mmap] = None
+
+        if stat.st_size == 0:
+            return
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index()
+
+    def _index(self):
+        titles = list(_TITLE_RE.finditer(self.map))
+        for i, match in enumerate(titles):
+            start = match.start()
+            limit = titles[i + 1].start() if i + 1 < len(titles) else len(self.map)
+            separator = _SEPARATOR_RE.search(self.map, match.end(), limit)
+            end = separator.start() if separator else limit
+            title = match.group(1).decode('utf-8', errors='replace')
+            self.spans.append(TipSpan(title, title_alias(title), self.path.name, start, end))
+
+    def tip_id(self, span: TipSpan) -> str:
+        if span.tip_id is None:
+            span.tip_id, _ = tip_identity(self.map[span.start:span.end].decode('utf-8', errors='replace'))
+        return span.tip_id
+
+    def view(self, span: TipSpan) -> TipView:
+        return TipView(span, memoryview(self.map)[span.start:span.end])
+
+    def close(self):
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # Views are still alive; the mapping goes away with them
+                pass
+            self.map = None
+
+
+class TipStore:
+    """Byte-offset index over data/*.md with memory-mapped random access"""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self._files: Dict[str, _MappedFile] = {}
+        self._by_title: Dict[str, TipSpan] = {}
+        self._by_id: Optional[Dict[str, TipSpan]] = None
+        self._by_alias: Dict[str, TipSpan] = {}
+        self.refresh()
+
+    def refresh(self) -> List[str]:
+        """Re-index changed, new and removed files; returns their names"""
+        changed = []
+        current = {p.name: p for p in self.data_dir.glob('*.md') if p.is_file()}
+
+        for name in list(self._files):
+            if name not in current:
+                self._files.pop(name).close()
+                changed.append(name)
+
+        for name, path in sorted(current.items()):
+            mapped = self._files.get(name)
+            stat = path.stat()
+            if mapped and mapped.signature == (stat.st_size, stat.st_mtime_ns):
+                continue
+            if mapped:
+                mapped.close()
+            self._files[name] = _MappedFile(path)
+            changed.append(name)
+
+        if changed:
+            self._rebuild_lookups()
+        return changed
+
+    def _rebuild_lookups(self):
+        # First occurrence wins, as in the plugin loader
+        self._by_title, self._by_id, self._by_alias = {}, None, {}
+        for name in sorted(self._files):
+            for span in self._files[name].spans:
+                if self._by_title.setdefault(span.title, span) is not span:
+                    continue
+                if span.alias in self._by_alias:
+                    # Different titles, same slug: the later tip gets its id appended
+                    first = self._by_alias[span.alias]
+                    span.alias += '-' + self.tip_id(span)[len('tip_'):len('tip_') + 6]
+                    print(f"  ⚠️  Alias of {span.title!r} ({span.file}) clashes with {first.title!r} "
+                          f"({first.file}); use {span.alias}")
+                self._by_alias[span.alias] = span
+
+    def tip_id(self, span: TipSpan) -> str:
+        """Stable id of a tip, computed on first use"""
+        return self._files[span.file].tip_id(span)
+
+    def _ids(self) -> Dict[str, TipSpan]:
+        if self._by_id is None:
+            self._by_id = {}
+            for span in self._by_title.values():
+                self._by_id.setdefault(self.tip_id(span), span)
+        return self._by_id
+
+    def spans(self) -> Iterator[TipSpan]:
+        for name in sorted(self._files):
+            yield from self._files[name].spans
+
+    def titles(self) -> List[str]:
+        return list(self._by_title)
+
+    def __len__(self) -> int:
+        return len(self._by_title)
+
+    def __contains__(self, key: str) -> bool:
+        return self.locate(key) is not None
+
+    def locate(self, key: str) -> Optional[TipSpan]:
+        """Span for a title, tip id or title alias"""
+        span = self._by_title.get(key) or self._by_alias.get(key)
+        if span is None and key.startswith('tip_'):
+            span = self._ids().get(key)
+        return span
+
+    def get(self, key: str) -> Optional[TipView]:
+        """View of a tip by title, tip id or title alias, or None"""
+        span = self.locate(key)
+        if span is None:
+            return None
+        return self._files[span.file].view(span)
+
+    def close(self):
+        for mapped in self._files.values():
+            mapped.close()
+        self._files.clear()
+        self._by_title, self._by_id, self._by_alias = {}, None, {}
+
+    def __enter__(self) -> 'TipStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Print single tips using the byte-offset index')
+    parser.add_argument('keys', nargs='*', help='Tip titles, ids or aliases')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--list', action='store_true',
+                        help='List every indexed tip with its location')
+
+    args = parser.parse_args()
+
+    with TipStore(args.data_dir) as store:
+        if args.list:
+            for span in store.spans():
+                print(f"{store.tip_id(span)}  {span.file}:{span.start}-{span.end}  {span.alias}")
+        for key in args.keys:
+            view = store.get(key)
+            if view is None:
+                print(f"✗ Not found: {key}")
+                continue
+            print(f"# {view.span.file} [{view.span.start}:{view.span.end}] id={store.tip_id(view.span)}")
+            print(view.text)
+            view.release()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Budgeted, priority-ordered scheduling of AI verification.
+
+Instead of verifying every pair above a hand-tuned threshold, candidate pairs
+from all files are pooled and verified in order of expected yield: the
+estimated chance that a pair is a duplicate.
+
+Estimates are kept per similarity bucket (0.05 wide by default):
+- Each bucket starts from a prior that rises linearly from 0 at `floor` to 0.5
+  at `threshold` (the hand-tuned point) and 1.0 at similarity 1.0. It is
+  worth `prior_weight` observations.
+- Observed duplicates update the bucket they fall in. Unverified buckets
+  have their prior rescaled by how the observed duplicate count compares
+  with what the priors predicted. If pairs at 0.85 turn out to be
+  duplicates more often than expected, 0.75 is tried sooner.
+- Rates are then made non-decreasing in similarity (pool adjacent
+  violators), so a few lucky pairs low down don't jump the queue.
+
+The next pair is the most similar remaining pair of the bucket with the best
+estimate. Verification stops when the call or token budget would be
+exceeded, or when no bucket is expected to yield at least `min_yield`
+duplicates per call. The lowest verified bucket that still clears
+`min_yield` is reported as the effective threshold; buckets never verified
+only carry extrapolated priors, so they don't count.
+"""
+
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def pool_adjacent_violators(values: List[float], weights: List[float]) -> List[float]:
+    """Weighted least-squares non-decreasing fit of values (isotonic regression)"""
+    blocks: List[List[float]] = []  # [mean, weight, count]
+    for value, weight in zip(values, weights):
+        blocks.append([value, weight, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            mean2, weight2, count2 = blocks.pop()
+            mean1, weight1, count1 = blocks[-1]
+            total = weight1 + weight2
+            blocks[-1] = [(mean1 * weight1 + mean2 * weight2) / total, total, count1 + count2]
+    fitted = []
+    for mean, _, count in blocks:
+        fitted.extend([mean] * count)
+    return fitted
+
+
+class VerifyScheduler:
+    """Hands out candidate pairs in expected-yield order until budget or yield runs out"""
+
+    def __init__(self, candidates: Iterable[Tuple[float, Hashable]], threshold: float = 0.7,
+                 floor: float = 0.5, min_yield: float = 0.1, max_calls: Optional[int] = None,
+                 max_tokens: Optional[int] = None, bucket_width: float = 0.05, prior_weight: float = 2.0):
+        self.threshold = threshold
+        self.floor = floor
+        self.min_yield = min_yield
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.bucket_width = bucket_width
+        self.prior_weight = prior_weight
+
+        self.buckets = max(1, math.ceil((1.0 - floor) / bucket_width - 1e-9))
+        self.pending: List[List[Tuple[float, Hashable]]] = [[] for _ in range(self.buckets)]
+        for similarity, key in candidates:
+            self.pending[self.bucket(similarity)].append((similarity, key))
+        for queue in self.pending:
+            queue.sort(key=lambda item: item[0])  # most similar last, popped first
+        self.candidates = sum(len(queue) for queue in self.pending)
+
+        self.verified = [0] * self.buckets
+        self.duplicates = [0] * self.buckets
+        self.calls = 0
+        self.tokens = 0
+        self.stop_reason: Optional[str] = None
+
+    def bucket(self, similarity: float) -> int:
+        index = int((similarity - self.floor) / self.bucket_width + 1e-9)
+        return min(max(index, 0), self.buckets - 1)
+
+    def bucket_range(self, index: int) -> Tuple[float, float]:
+        low = self.floor + index * self.bucket_width
+        return low, min(1.0, low + self.bucket_width)
+
+    def prior(self, index: int) -> float:
+        """Prior duplicate rate at the bucket's midpoint"""
+        low, high = self.bucket_range(index)
+        similarity = (low + high) / 2
+        if similarity >= self.threshold:
+            span = 1.0 - self.threshold
+            return 0.5 + 0.5 * ((similarity - self.threshold) / span if span > 0 else 1.0)
+        span = self.threshold - self.floor
+        return 0.5 * max(0.0, similarity - self.floor) / span if span > 0 else 0.0
+
+    def rates(self) -> List[float]:
+        """Estimated duplicate rate per bucket, non-decreasing in similarity"""
+        priors = [self.prior(i) for i in range(self.buckets)]
+        expected = sum(p * n for p, n in zip(priors, self.verified))
+        calibration = (sum(self.duplicates) + 1) / (expected + 1)
+
+        estimates, weights = [], []
+        for i in range(self.buckets):
+            prior = min(1.0, priors[i] * calibration) if self.verified[i] == 0 else priors[i]
+            weight = self.prior_weight + self.verified[i]
+            estimates.append((prior * self.prior_weight + self.duplicates[i]) / weight)
+            weights.append(weight)
+        return pool_adjacent_violators(estimates, weights)
+
+    def effective_threshold(self) -> Optional[float]:
+        """Lowest similarity whose verified bucket is still expected to clear min_yield"""
+        passing = [i for i, rate in enumerate(self.rates())
+                   if self.verified[i] and rate >= self.min_yield]
+        return self.bucket_range(passing[0])[0] if passing else None
+
+    def tokens_per_call(self) -> float:
+        return self.tokens / self.calls if self.calls else 0.0
+
+    def next(self) -> Optional[Tuple[float, Hashable]]:
+        """The next pair to verify, or None (see stop_reason)"""
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            self.stop_reason = f'call budget spent ({self.calls} calls)'
+            return None
+        if self.max_tokens is not None and self.tokens + self.tokens_per_call() > self.max_tokens:
+            self.stop_reason = f'token budget spent ({self.tokens:,} tokens)'
+            return None
+
+        rates = self.rates()
+        best = None
+        for i in range(self.buckets):
+            if self.pending[i] and (best is None or rates[i] >= rates[best]):
+                best = i
+        if best is None:
+            self.stop_reason = 'all candidates verified'
+            return None
+        if rates[best] < self.min_yield:
+            self.stop_reason = f'expected yield {rates[best]:.2f} below {self.min_yield}'
+            return None
+        return self.pending[best].pop()
+
+    def record(self, similarity: float, duplicate: bool, tokens: int):
+        """Outcome of verifying a pair handed out by next()"""
+        index = self.bucket(similarity)
+        self.verified[index] += 1
+        self.duplicates[index] += int(duplicate)
+        self.calls += 1
+        self.tokens += tokens
+
+    @property
+    def deferred(self) -> int:
+        return sum(len(queue) for queue in self.pending)
+
+    def report(self) -> str:
+        """Per-bucket table of verified pairs, duplicates and final estimates"""
+        rates = self.rates()
+        lines = [f"{'Similarity':<12} {'Pairs':>6} {'Verified':>9} {'Dups':>5} {'Rate':>6}"]
+        for i in reversed(range(self.buckets)):
+            total = self.verified[i] + len(self.pending[i])
+            if not total:
+                continue
+            low, high = self.bucket_range(i)
+            lines.append(f"{low:.2f}-{high:.2f}    {total:>6} {self.verified[i]:>9} "
+                         f"{self.duplicates[i]:>5} {rates[i]:>6.2f}")
+        threshold = self.effective_threshold()
+        lines.append(f"Effective threshold: {threshold:.2f}" if threshold is not None
+                     else "Effective threshold: none (no verified bucket clears the minimum yield)")
+        lines.append(f"Stopped: {self.stop_reason}")
+        return '\n'.join(lines)
+
+    def summary(self) -> Dict:
+        threshold = self.effective_threshold()
+        return {
+            'candidates': self.candidates,
+            'pairs_verified': self.calls,
+            'pairs_deferred': self.deferred,
+            'duplicates_found': sum(self.duplicates),
+            'effective_threshold': round(threshold, 4) if threshold is not None else None,
+            'stop_reason': self.stop_reason,
+        }
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Watch data/*.md and keep the generated outputs up to date.
+
+Polls the data directory (stdlib only: file mtime and size), keeps every
+file's content and parsed tips in memory, and once a burst of saves has
+settled (--debounce) re-runs only what the change affects:
+
+- fix: the source-line fixers, on changed files only (opt-in; rewrites them)
+- lint: duplicate titles and tips without category or tags, in changed files
+- latex: the book's LaTeX, converting only changed files and reassembling
+  pdf/Tmp/Content.tex from cached per-file fragments
+- plugin-cache: lua/neovim_tips/builtin_tips.lua
+- search-index: lua/neovim_tips/search_index.json
+- bundles: only the shards of changed files, then the manifest
+- related: lua/neovim_tips/related_tips.lua, incrementally (opt-in; loads
+  the embedding stack)
+- sqlite: the incremental SQLite export (opt-in)
+- help: Vim help files and doc/tags, per changed category (opt-in)
+- site: the static HTML site, rendering only changed pages (opt-in; their
+  book-parser pass reads those files again)
+
+Every target works from the parsed tips and file hashes kept in memory;
+nothing re-reads or re-parses the whole corpus on a change.
+
+The first cycle builds every enabled output from scratch. Each cycle logs
+which files changed and how long each target took.
+
+    python scripts/watch_corpus.py
+    python scripts/watch_corpus.py --target fix --target sqlite --debounce 1
+"""
+
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'pdf'))
+
+from build_bundles import render_manifest, shard_layout, write_shard  # noqa: E402
+from build_plugin_cache import render_chunk  # noqa: E402
+from build_search_index import SearchIndex  # noqa: E402
+from build_tex import TipsParser  # noqa: E402
+from fix_community_sources import fix_lines  # noqa: E402
+from fix_source_links import fix_links  # noqa: E402
+from metrics import Metrics, add_arguments as add_metrics_arguments  # noqa: E402
+from tip_corpus import CorpusTip, file_stamp, parse_tip_blocks  # noqa: E402
+
+# (mtime_ns, size) of a data file
+Stamp = Tuple[int, int]
+
+
+@dataclass
+class FileState:
+    stamp: Stamp
+    content: str
+    # Size and SHA-256, as recorded in generated files (tip_corpus.file_stamp)
+    file_stamp: Dict[str, object]
+    # Parsed on its own; Corpus.tips() applies cross-file duplicate rules
+    tips: List[CorpusTip]
+
+
+@dataclass
+class Changes:
+    modified: Set[str] = field(default_factory=set)  # new or changed files
+    removed: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.modified or self.removed)
+
+    def describe(self) -> str:
+        names = sorted(self.modified) + [f'-{name}' for name in sorted(self.removed)]
+        shown = ', '.join(names[:5])
+        return shown + (f' (+{len(names) - 5} more)' if len(names) > 5 else '')
+
+
+class Corpus:
+    """Data files and their parsed tips, re-read only when a file's stamp changes"""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self.files: Dict[str, FileState] = {}
+        self.duplicates: List[CorpusTip] = []
+        self._tips: Optional[List[CorpusTip]] = None
+
+    def scan(self) -> Dict[str, Stamp]:
+        stamps = {}
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md') and entry.is_file():
+                    stat = entry.stat()
+                    stamps[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def stamps(self) -> Dict[str, Stamp]:
+        return {name: state.stamp for name, state in self.files.items()}
+
+    def update(self, stamps: Dict[str, Stamp]) -> Changes:
+        """Re-read files whose stamp differs; unreadable files keep their old state"""
+        changes = Changes(removed=set(self.files) - set(stamps))
+        for name in changes.removed:
+            del self.files[name]
+        for name, stamp in stamps.items():
+            state = self.files.get(name)
+            if state is not None and state.stamp == stamp:
+                continue
+            try:
+                data = (self.data_dir / name).read_bytes()
+                # Same newline translation as read_text()
+                content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            except (OSError, UnicodeDecodeError) as e:
+                # Mid-save or removed since the scan: picked up by a later poll
+                print(f"  ⚠️  Skipping {name}: {e}")
+                continue
+            self.files[name] = FileState(stamp, content, file_stamp(data), parse_tip_blocks(content, name))
+            changes.modified.add(name)
+        if changes:
+            self._tips = None
+        return changes
+
+    def tips(self) -> List[CorpusTip]:
+        """All tips with load_corpus semantics (a title seen in an earlier file is skipped)"""
+        if self._tips is None:
+            seen: Set[str] = set()
+            self._tips, self.duplicates = [], []
+            for name in sorted(self.files):
+                state = self.files[name]
+                tips = state.tips
+                if any(tip.title in seen for tip in tips):
+                    # Rare: re-parse against the earlier titles for exact loader behaviour
+                    tips = parse_tip_blocks(state.content, name, set(seen), self.duplicates)
+                # Repeats within the file were already dropped by its own parse
+                seen.update(tip.title for tip in tips)
+                self._tips.extend(tips)
+        return self._tips
+
+    def file_stamps(self) -> Dict[str, Dict[str, object]]:
+        return {name: self.files[name].file_stamp for name in sorted(self.files)}
+
+
+@dataclass
+class Target:
+    name: str
+    run: Callable[['Watcher', Changes], Optional[str]]  # returns a short note for the log
+    default: bool = True
+
+
+def run_fix(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    fixed = 0
+    for name in sorted(changes.modified):
+        content = watcher.corpus.files[name].content
+        content, links = fix_links(content)
+        content, lines = fix_lines(content)
+        if links or lines:
+            (watcher.corpus.data_dir / name).write_text(content, encoding='utf-8')
+            fixed += links + lines
+    if fixed:
+        # Pick the rewritten files up now, so this cycle's outputs use them
+        changes.modified |= watcher.corpus.update(watcher.corpus.scan()).modified
+    return f'{fixed} source lines fixed' if fixed else None
+
+
+def run_lint(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    watcher.corpus.tips()
+    warnings = [f"{dup.file}:{dup.line}: duplicate title skipped by the loader: {dup.title}"
+                for dup in watcher.corpus.duplicates if dup.file in changes.modified]
+    for name in sorted(changes.modified):
+        for tip in watcher.corpus.files[name].tips:
+            missing = [label for label, value in (('category', tip.category), ('tags', tip.tags)) if not value]
+            if missing:
+                warnings.append(f"{name}:{tip.line}: no {' or '.join(missing)}: {tip.title}")
+    for warning in warnings:
+        print(f"  ⚠️  {warning}")
+    return f'{len(warnings)} warnings' if warnings else None
+
+
+def run_latex(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    for name in changes.removed:
+        watcher.latex.pop(name, None)
+    for name in changes.modified:
+        watcher.latex[name] = TipsParser(str(watcher.corpus.data_dir / name)).toLatex()
+    watcher.outputs['latex'].parent.mkdir(parents=True, exist_ok=True)
+    watcher.outputs['latex'].write_text(''.join(watcher.latex[name] for name in sorted(watcher.latex)),
+                                        encoding='utf-8')
+    return f'{len(changes.modified)} of {len(watcher.latex)} files converted'
+
+
+def run_plugin_cache(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    output = watcher.outputs['plugin-cache']
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(render_chunk(watcher.corpus.tips(), watcher.corpus.file_stamps()), encoding='utf-8')
+    return None
+
+
+def run_search_index(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    output = watcher.outputs['search-index']
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(SearchIndex.build(watcher.corpus.tips(), watcher.corpus.file_stamps()).to_json(),
+                      encoding='utf-8')
+    return None
+
+
+def run_bundles(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    bundle_dir = watcher.outputs['bundles']
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    # Compare layouts, not just modified files: a new title in one file can
+    # drop a same-titled tip from a later file's shard (load_corpus semantics)
+    layout = shard_layout(watcher.corpus.tips())
+    written = 0
+    for shard_name, entries in layout.items():
+        if watcher.bundle_layout.get(shard_name) != entries or not (bundle_dir / shard_name).exists():
+            write_shard(bundle_dir, shard_name, entries)
+            written += 1
+    for stale in bundle_dir.glob('*.txt'):
+        if stale.name not in layout:
+            stale.unlink()
+    (bundle_dir / 'manifest.lua').write_text(render_manifest(layout, watcher.corpus.file_stamps()),
+                                             encoding='utf-8')
+    watcher.bundle_layout = layout
+    return f'{written} of {len(layout)} shards written'
+
+
+def run_related(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    from build_related_tips import build_related_tips
+    stats = build_related_tips(watcher.corpus.data_dir, watcher.outputs['related'],
+                               watcher.outputs['related-state'], metrics=watcher.metrics,
+                               tips=watcher.corpus.tips(), file_stamps=watcher.corpus.file_stamps())
+    return f"{stats['changed']} tips re-embedded"
+
+
+def run_sqlite(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    from export_sqlite import connect, export_tips
+    if watcher.db is None:
+        watcher.db = connect(watcher.outputs['sqlite'])
+    stats = export_tips(watcher.db, watcher.corpus.tips())
+    return f"{stats['inserted']} inserted, {stats['updated']} updated, {stats['deleted']} deleted"
+
+
+def run_help(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    from export_help import export_help
+    stats = export_help(watcher.corpus.data_dir, watcher.outputs['help'], watcher.outputs['help-manifest'],
+                        metrics=watcher.metrics, file_stamps=watcher.corpus.file_stamps(),
+                        file_tips={name: state.tips for name, state in watcher.corpus.files.items()})
+    return f"{stats['rendered']} of {stats['files']} help files written"
+
+
+def run_site(watcher: 'Watcher', changes: Changes) -> Optional[str]:
+    from build_site import build_site
+    # Changed pages are rendered by the book's parser, which reads its file
+    stats = build_site(watcher.corpus.data_dir, watcher.outputs['site'], watcher.outputs['site-manifest'],
+                       workers=os.cpu_count() or 1, metrics=watcher.metrics,
+                       tips=watcher.corpus.tips(), file_stamps=watcher.corpus.file_stamps())
+    return f"{stats['rendered']} of {stats['pages']} pages rendered"
+
+
+# In run order: fixers rewrite files before anything reads them
+TARGETS: List[Target] = [
+    Target('fix', run_fix, default=False),
+    Target('lint', run_lint),
+    Target('latex', run_latex),
+    Target('plugin-cache', run_plugin_cache),
+    Target('search-index', run_search_index),
+    Target('bundles', run_bundles),
+    Target('related', run_related, default=False),
+    Target('sqlite', run_sqlite, default=False),
+    Target('help', run_help, default=False),
+    Target('site', run_site, default=False),
+]
+
+
+class Watcher:
+    """Polls the corpus and runs the enabled targets after each settled change"""
+
+    def __init__(self, data_dir: Path, targets: List[Target], outputs: Dict[str, Path],
+                 interval: float = 0.5, debounce: float = 0.3, metrics: Optional[Metrics] = None):
+        self.corpus = Corpus(data_dir)
+        self.targets = targets
+        self.outputs = outputs
+        self.interval = interval
+        self.debounce = debounce
+        self.metrics = metrics or Metrics('watch_corpus')
+        self.latex: Dict[str, str] = {}
+        # Shard layout written by the last bundles run
+        self.bundle_layout: Dict[str, List[tuple]] = {}
+        self.db = None
+        self.cycles = 0
+
+    def cycle(self, changes: Changes):
+        """Run every enabled target for one set of changes, logging timings"""
+        self.cycles += 1
+        started = time.perf_counter()
+        print(f"[{datetime.now():%H:%M:%S}] {changes.describe()}")
+        for target in self.targets:
+            start = time.perf_counter()
+            try:
+                with self.metrics.stage(target.name):
+                    note = target.run(self, changes)
+            except Exception as e:
+                # Keep watching: the next save gets another chance
+                print(f"  ✗ {target.name:<13} failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            print(f"  ✓ {target.name:<13} {elapsed * 1000:8.1f} ms" + (f"  {note}" if note else ''))
+        print(f"  {len(self.corpus.tips())} tips, cycle {(time.perf_counter() - started) * 1000:.1f} ms")
+        self.metrics.count('cycles')
+
+    def settle(self, stamps: Dict[str, Stamp]) -> Dict[str, Stamp]:
+        """Wait until no file has changed for `debounce` seconds"""
+        while True:
+            time.sleep(self.debounce)
+            again = self.corpus.scan()
+            if again == stamps:
+                return stamps
+            stamps = again
+
+    def build(self):
+        """Parse everything and build every enabled output"""
+        with self.metrics.stage('parse'):
+            changes = self.corpus.update(self.corpus.scan())
+        self.cycle(changes)
+
+    def watch(self):
+        self.build()
+        print(f"Watching {self.corpus.data_dir} (every {self.interval}s, debounce {self.debounce}s). "
+              f"Ctrl-C to stop.")
+        while True:
+            time.sleep(self.interval)
+            stamps = self.corpus.scan()
+            if stamps == self.corpus.stamps():
+                continue
+            with self.metrics.stage('parse'):
+                changes = self.corpus.update(self.settle(stamps))
+            if changes:
+                self.cycle(changes)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+
+def main():
+    import argparse
+
+    names = [target.name for target in TARGETS]
+    parser = argparse.ArgumentParser(description='Watch data/*.md and incrementally rebuild generated outputs')
+    parser.add_argument('--data-dir', type=Path, default=Path('data'),
+                        help='Directory containing tip files')
+    parser.add_argument('--target', action='append', choices=names, default=None,
+                        help='Enable a target on top of the defaults (repeatable)')
+    parser.add_argument('--only', action='append', choices=names, default=None,
+                        help='Run only these targets (repeatable)')
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help='Seconds between polls')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help='Seconds without further changes before a rebuild starts')
+    parser.add_argument('--once', action='store_true',
+                        help='Build every enabled output once and exit')
+    parser.add_argument('--tex-output', type=Path, default=Path('pdf/Tmp/Content.tex'),
+                        help='LaTeX book content file')
+    parser.add_argument('--plugin-cache', type=Path, default=Path('lua/neovim_tips/builtin_tips.lua'),
+                        help='Precompiled tips chunk')
+    parser.add_argument('--search-index', type=Path, default=Path('lua/neovim_tips/search_index.json'),
+                        help='Search index file')
+    parser.add_argument('--bundle-dir', type=Path, default=Path('lua/neovim_tips/bundles'),
+                        help='Bundle shards and manifest')
+    parser.add_argument('--db', type=Path, default=Path('scripts/tips.db'),
+                        help='SQLite database (sqlite target)')
+    parser.add_argument('--doc-dir', type=Path, default=Path('doc'),
+                        help='Help directory (help target)')
+    parser.add_argument('--site-dir', type=Path, default=Path('site'),
+                        help='Static HTML site (site target)')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    metrics = Metrics.from_args('watch_corpus', args)
+
+    enabled = set(args.only or [t.name for t in TARGETS if t.default] + (args.target or []))
+    outputs = {
+        'latex': args.tex_output,
+        'plugin-cache': args.plugin_cache,
+        'search-index': args.search_index,
+        'bundles': args.bundle_dir,
+        'related': Path('lua/neovim_tips/related_tips.lua'),
+        'related-state': Path('scripts/related_tips_state.json'),
+        'sqlite': args.db,
+        'help': args.doc_dir,
+        'help-manifest': Path('scripts/help_manifest.json'),
+        'site': args.site_dir,
+        'site-manifest': Path('scripts/site_manifest.json'),
+    }
+    watcher = Watcher(args.data_dir, [t for t in TARGETS if t.name in enabled], outputs,
+                      args.interval, args.debounce, metrics)
+    try:
+        if args.once:
+            watcher.build()
+        else:
+            watcher.watch()
+    except KeyboardInterrupt:
+        print(f"\nStopped after {watcher.cycles} cycles")
+    finally:
+        watcher.close()
+        if metrics.write():
+            print(f"✓ Metrics saved to: {metrics.output}")
+
+
+if __name__ == '__main__':
+    main()